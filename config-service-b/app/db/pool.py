@@ -1,69 +1,78 @@
 """
 Database connection pool.
+
+Uses psycopg 3's natively async `AsyncConnectionPool`, so checking out a
+connection and running queries never blocks the event loop.
 """
+import asyncio
 import contextlib
-from concurrent.futures import ThreadPoolExecutor
-from typing import Iterator
+from typing import AsyncIterator, Optional
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
 
 from app.core.config import get_settings
 
 settings = get_settings()
 
 # Global connection pool
-_pool: ThreadedConnectionPool = None
+_pool: Optional[AsyncConnectionPool] = None
+_pool_lock = asyncio.Lock()
+
 
+def get_conninfo() -> str:
+    """Build the libpq connection string from settings."""
+    return make_conninfo(
+        host=settings.db_host,
+        port=settings.db_port,
+        dbname=settings.db_name,
+        user=settings.db_user,
+        password=settings.db_password,
+    )
 
-def get_pool() -> ThreadedConnectionPool:
-    """Get or create connection pool."""
+
+async def get_pool() -> AsyncConnectionPool:
+    """Get or create (and open) the connection pool."""
     global _pool
     if _pool is None:
-        _pool = ThreadedConnectionPool(
-            minconn=settings.db_pool_min_conn,
-            maxconn=settings.db_pool_max_conn,
-            host=settings.db_host,
-            port=settings.db_port,
-            database=settings.db_name,
-            user=settings.db_user,
-            password=settings.db_password
-        )
+        async with _pool_lock:
+            if _pool is None:
+                pool = AsyncConnectionPool(
+                    conninfo=get_conninfo(),
+                    min_size=settings.db_pool_min_conn,
+                    max_size=settings.db_pool_max_conn,
+                    kwargs={"row_factory": dict_row},
+                    open=False,
+                )
+                await pool.open()
+                _pool = pool
     return _pool
 
 
-def close_pool():
+async def close_pool():
     """Close connection pool."""
     global _pool
     if _pool:
-        _pool.closeall()
+        await _pool.close()
         _pool = None
 
 
 @contextlib.asynccontextmanager
-async def get_connection():
-    """Get database connection from pool (async context manager)."""
-    pool = get_pool()
-    executor = ThreadPoolExecutor(max_workers=1)
-
-    def _get_conn():
-        return pool.getconn()
-
-    def _put_conn(conn):
-        pool.putconn(conn)
-
-    try:
-        conn = await executor.submit(_get_conn)
-        try:
-            yield conn
-        finally:
-            executor.submit(_put_conn, conn)
-    finally:
-        executor.shutdown(wait=True)
-
-
-def get_cursor(connection) -> Iterator[RealDictCursor]:
-    """Get cursor from connection (context manager)."""
-    with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+async def get_connection() -> AsyncIterator[AsyncConnection]:
+    """Borrow a connection from the pool (async context manager).
+
+    The transaction is committed when the block exits normally and rolled
+    back if it raises; the connection is then returned to the pool.
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+
+@contextlib.asynccontextmanager
+async def get_cursor(connection: AsyncConnection) -> AsyncIterator[AsyncCursor]:
+    """Get a dict-row cursor from a connection (async context manager)."""
+    async with connection.cursor(row_factory=dict_row) as cursor:
         yield cursor
@@ -0,0 +1,57 @@
+"""
+Tests for the async database pool.
+"""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db import pool
+
+
+class TestAsyncPool(unittest.TestCase):
+
+    def tearDown(self):
+        pool._pool = None
+
+    @patch('app.db.pool.AsyncConnectionPool')
+    def test_get_pool_opens_a_single_pool(self, mock_pool_cls):
+        """Concurrent first calls create and open exactly one pool."""
+        mock_pool_cls.return_value.open = AsyncMock()
+
+        async def run_test():
+            return await asyncio.gather(*[pool.get_pool() for _ in range(5)])
+
+        pools = asyncio.run(run_test())
+        mock_pool_cls.assert_called_once()
+        mock_pool_cls.return_value.open.assert_awaited_once()
+        self.assertTrue(all(p is mock_pool_cls.return_value for p in pools))
+        self.assertFalse(mock_pool_cls.call_args.kwargs['open'])
+
+    def test_get_connection_borrows_from_pool(self):
+        """get_connection yields the pooled connection without blocking calls."""
+        conn = MagicMock()
+        borrowed = MagicMock()
+        borrowed.__aenter__ = AsyncMock(return_value=conn)
+        borrowed.__aexit__ = AsyncMock(return_value=False)
+        pool._pool = MagicMock()
+        pool._pool.connection.return_value = borrowed
+
+        async def run_test():
+            async with pool.get_connection() as c:
+                return c
+
+        self.assertIs(asyncio.run(run_test()), conn)
+        borrowed.__aexit__.assert_awaited_once()
+
+    def test_close_pool(self):
+        """close_pool awaits the pool close and resets the global."""
+        mock = MagicMock()
+        mock.close = AsyncMock()
+        pool._pool = mock
+        asyncio.run(pool.close_pool())
+        mock.close.assert_awaited_once()
+        self.assertIsNone(pool._pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
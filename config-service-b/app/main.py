@@ -8,7 +8,7 @@ from fastapi import FastAPI
 from app.api.routes.applications import router as applications_router
 from app.api.routes.configurations import router as configurations_router
 from app.core.config import get_settings, setup_logging
-from app.db.pool import close_pool
+from app.db.pool import close_pool, get_pool
 
 
 @asynccontextmanager
@@ -17,11 +17,12 @@ async def lifespan(app: FastAPI):
     # Startup
     settings = get_settings()
     setup_logging(settings.log_level)
+    await get_pool()
 
     yield
 
     # Shutdown
-    close_pool()
+    await close_pool()
 
 
 app = FastAPI(
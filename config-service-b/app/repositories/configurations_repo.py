@@ -1,11 +1,9 @@
 """
 Configurations repository.
 """
-import json
 from typing import List, Optional
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg.types.json import Jsonb
 
 from app.db import pool
 from app.db.sql import (
@@ -27,9 +25,9 @@ class ConfigurationsRepository:
     async def get_all() -> List[Configuration]:
         """Get all configurations."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(CONFIGURATIONS_SELECT)
-                rows = cursor.fetchall()
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_SELECT)
+                rows = await cursor.fetchall()
 
         return [Configuration(**row) for row in rows]
 
@@ -37,9 +35,9 @@ class ConfigurationsRepository:
     async def get_by_id(configuration_id: str) -> Optional[Configuration]:
         """Get configuration by ID."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
-                row = cursor.fetchone()
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
+                row = await cursor.fetchone()
 
         return Configuration(**row) if row else None
 
@@ -47,9 +45,9 @@ class ConfigurationsRepository:
     async def get_by_app_and_name(application_id: str, name: str) -> Optional[Configuration]:
         """Get configuration by application ID and name."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(CONFIGURATIONS_SELECT_BY_APP_AND_NAME, (application_id, name))
-                row = cursor.fetchone()
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_SELECT_BY_APP_AND_NAME, (application_id, name))
+                row = await cursor.fetchone()
 
         return Configuration(**row) if row else None
 
@@ -57,9 +55,9 @@ class ConfigurationsRepository:
     async def get_by_application(application_id: str) -> List[Configuration]:
         """Get all configurations for application."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(CONFIGURATIONS_SELECT_BY_APP, (application_id,))
-                rows = cursor.fetchall()
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_SELECT_BY_APP, (application_id,))
+                rows = await cursor.fetchall()
 
         return [Configuration(**row) for row in rows]
 
@@ -67,26 +65,22 @@ class ConfigurationsRepository:
     async def create(configuration: ConfigurationCreate, configuration_id: str) -> Configuration:
         """Create new configuration."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(
+            async with conn.cursor() as cursor:
+                await cursor.execute(
                     CONFIGURATIONS_INSERT,
                     (
                         configuration_id,
                         str(configuration.application_id),
                         configuration.name,
                         configuration.comments,
-                        json.dumps(configuration.config)
+                        Jsonb(configuration.config)
                     )
                 )
-                conn.commit()
+                await conn.commit()
 
-                # Return created configuration
-                cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
-                row = cursor.fetchone()
-
-        # Convert JSONB string back to dict
-        if row and 'config' in row:
-            row['config'] = json.loads(row['config'])
+                # Return created configuration (JSONB is decoded to a dict by psycopg)
+                await cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
+                row = await cursor.fetchone()
 
         return Configuration(**row) if row else None
 
@@ -94,28 +88,24 @@ class ConfigurationsRepository:
     async def update(configuration_id: str, configuration: ConfigurationCreate) -> Optional[Configuration]:
         """Update configuration."""
         async with pool.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(
+            async with conn.cursor() as cursor:
+                await cursor.execute(
                     CONFIGURATIONS_UPDATE,
                     (
                         configuration.name,
                         configuration.comments,
-                        json.dumps(configuration.config),
+                        Jsonb(configuration.config),
                         configuration_id
                     )
                 )
-                conn.commit()
+                await conn.commit()
 
                 if cursor.rowcount == 0:
                     return None
 
-                # Return updated configuration
-                cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
-                row = cursor.fetchone()
-
-        # Convert JSONB string back to dict
-        if row and 'config' in row:
-            row['config'] = json.loads(row['config'])
+                # Return updated configuration (JSONB is decoded to a dict by psycopg)
+                await cursor.execute(CONFIGURATIONS_SELECT_BY_ID, (configuration_id,))
+                row = await cursor.fetchone()
 
         return Configuration(**row) if row else None
 
@@ -123,15 +113,15 @@ class ConfigurationsRepository:
     async def delete(configuration_id: str) -> bool:
         """Delete configuration."""
         async with pool.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(CONFIGURATIONS_EXISTS, (configuration_id,))
-                exists = cursor.fetchone() is not None
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_EXISTS, (configuration_id,))
+                exists = await cursor.fetchone() is not None
 
                 if not exists:
                     return False
 
-                cursor.execute("DELETE FROM configurations WHERE id = %s", (configuration_id,))
-                conn.commit()
+                await cursor.execute("DELETE FROM configurations WHERE id = %s", (configuration_id,))
+                await conn.commit()
 
         return cursor.rowcount > 0
 
@@ -139,17 +129,17 @@ class ConfigurationsRepository:
     async def exists(configuration_id: str) -> bool:
         """Check if configuration exists."""
         async with pool.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(CONFIGURATIONS_EXISTS, (configuration_id,))
-                return cursor.fetchone() is not None
+            async with conn.cursor() as cursor:
+                await cursor.execute(CONFIGURATIONS_EXISTS, (configuration_id,))
+                return await cursor.fetchone() is not None
 
     @staticmethod
     async def exists_by_app_and_name(application_id: str, name: str) -> bool:
         """Check if configuration exists by application and name."""
         async with pool.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
+            async with conn.cursor() as cursor:
+                await cursor.execute(
                     "SELECT 1 FROM configurations WHERE application_id = %s AND name = %s",
                     (application_id, name)
                 )
-                return cursor.fetchone() is not None
+                return await cursor.fetchone() is not None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+"""Response compression: an ASGI middleware plus cached pre-compressed bodies.
+
+The middleware compresses complete (non-streamed) responses of compressible
+media types using the coding negotiated from `Accept-Encoding`. Routes that
+already set `Content-Encoding` (e.g. bodies served pre-compressed from the
+configuration cache) and streamed responses such as Server-Sent Events are
+passed through untouched.
+
+A compressed representation has different bytes, so a strong `ETag` is
+weakened (`W/"..."`); `If-None-Match` uses weak comparison and still matches.
+"""
+
+from typing import Callable, Hashable
+
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import timing
+from app.core.cache import LRUCache
+from app.core.compression import compress, negotiate
+
+_COMPRESSIBLE = ("application/json", "application/problem+json", "application/x-ndjson", "text/plain", "text/html")
+
+
+def weak_etag(etag: str) -> str:
+    """Return `etag` as a weak validator."""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """Compress whole responses with gzip, brotli or zstd as negotiated."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        """Wrap `app`; bodies smaller than `minimum_size` bytes are sent as-is."""
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Negotiate a coding and compress the response body if worthwhile."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                if media_type in _COMPRESSIBLE and message["status"] not in (204, 304):
+                    _add_vary(MutableHeaders(raw=message["headers"]))
+                if (
+                    "content-encoding" in headers
+                    or media_type not in _COMPRESSIBLE
+                    or message["status"] in (204, 304)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send uncompressed from here on.
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            with timing.timed("compress"):
+                compressed = compress(encoding, body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = weak_etag(headers["etag"])
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def precompressed_response(
+    cache: LRUCache,
+    key: Hashable,
+    encoding: str,
+    render: Callable[[], bytes],
+    etag: str,
+    minimum_size: int = 0,
+    media_type: str = "application/json",
+) -> Response:
+    """Serve a body compressed once per `key` from `cache`.
+
+    `key` must identify immutable content (e.g. include a row version) since
+    entries are never invalidated, only evicted; their bytes count against
+    the cache's byte budget. Bodies under `minimum_size` are cached and sent
+    uncompressed.
+    """
+    cache_key = ("encoded", key, encoding)
+    cached = cache.get(cache_key)
+    if cached is None:
+        raw = render()
+        if len(raw) >= minimum_size:
+            with timing.timed("compress"):
+                cached = (encoding, compress(encoding, raw, best=True))
+        else:
+            cached = (None, raw)
+        cache.put(cache_key, cached, len(cached[1]))
+    used, body = cached
+    headers = {"Vary": "Accept-Encoding", "ETag": etag}
+    if used is not None:
+        headers.update({"Content-Encoding": used, "ETag": weak_etag(etag)})
+    return Response(content=body, media_type=media_type, headers=headers)
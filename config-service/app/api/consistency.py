@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+"""Read-your-writes tokens over HTTP.
+
+With read replicas configured, responses to requests that wrote to the
+primary carry `X-Consistency-Token: <LSN>`. Clients pass the latest token
+they hold back in the same header; reads in that request are then served
+only by a replica that has replayed at least that far, or by the primary.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db import consistency
+
+HEADER = "X-Consistency-Token"
+
+
+class ConsistencyMiddleware:
+    """Install a per-request consistency session and return write tokens."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Apply the request's token to reads and report the token of its writes."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = Headers(scope=scope).get(HEADER)
+        try:
+            min_lsn = consistency.parse_lsn(token) if token else 0
+        except ValueError:
+            response = JSONResponse({"detail": f"Invalid {HEADER}"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        session, context = consistency.begin(min_lsn)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and session.written_lsn:
+                MutableHeaders(raw=message["headers"])[HEADER] = consistency.format_lsn(session.written_lsn)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            consistency.end(context)
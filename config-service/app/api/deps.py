@@ -3,19 +3,34 @@ from __future__ import annotations
 """API-layer dependencies and shared resources.
 
 Provides a lazily-initialized global `DBPool` and an async context manager
-that yields the pool for injection into services and routers.
+that yields the pool for injection into services and routers, plus the
+per-process change listener and configuration cache built on top of it.
 """
 
+import threading
 from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncIterator
 
+from app.core.cache import LRUCache
 from app.core.config import Settings, get_settings
-from app.db.pool import DBPool
+from app.core.events import EventBroker
+from app.core.watch import WatchHub
+from app.db.notify import ChangeListener
+from app.db.pool import DBPool, dsn_from_settings
+from app.services.configurations_service import ConfigurationsService
 
 
-executor = ThreadPoolExecutor(max_workers=8)
+_executor: ThreadPoolExecutor | None = None
 _pool: DBPool | None = None
+_listener: ChangeListener | None = None
+_config_cache: LRUCache | None = None
+_name_cache: LRUCache | None = None
+_resolve_cache: LRUCache | None = None
+_snapshot_cache: LRUCache | None = None
+_watch_hub: WatchHub | None = None
+_event_broker: EventBroker | None = None
+_lock = threading.Lock()
 
 
 def get_pool(settings: Settings | None = None) -> DBPool:
@@ -24,9 +39,209 @@ def get_pool(settings: Settings | None = None) -> DBPool:
     if _pool is None:
         s = settings or get_settings()
         _pool = DBPool.from_settings(s)
+        if _pool.replicas:
+            # Replica reads must not refill caches with rows older than the
+            # changes this worker has been notified about.
+            get_change_listener().on_wal_position(_pool.advance_floor)
     return _pool
 
 
+def get_change_listener() -> ChangeListener:
+    """Return the process-wide `ChangeListener`, starting it on first use."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = ChangeListener(dsn_from_settings(get_settings()))
+            _listener.start()
+        return _listener
+
+
+def get_config_cache() -> LRUCache | None:
+    """Return the shared configuration cache, or `None` when disabled.
+
+    The cache is subscribed to the change listener on creation so writes in
+    any worker invalidate the matching entry here.
+    """
+    global _config_cache
+    s = get_settings()
+    if not s.CONFIG_CACHE_ENABLED:
+        return None
+    if _config_cache is None:
+        listener = get_change_listener()
+        with _lock:
+            if _config_cache is None:
+                cache = LRUCache(max_entries=s.CONFIG_CACHE_MAX_ENTRIES, max_bytes=s.CONFIG_CACHE_MAX_BYTES)
+
+                def on_change(payload: dict) -> None:
+                    if payload.get("table") == "configurations":
+                        cache.invalidate(payload["id"])
+                        cache.invalidate(("raw", payload["id"]))
+
+                listener.subscribe(on_change)
+                listener.on_resync(cache.clear)
+                _config_cache = cache
+    return _config_cache
+
+
+def get_name_cache() -> LRUCache | None:
+    """Return the shared `(application name, configuration name) -> id` cache.
+
+    Any application change clears it, since an application rename would
+    otherwise leave the old name resolving. Disabled with the config cache.
+    """
+    global _name_cache
+    s = get_settings()
+    if not s.CONFIG_CACHE_ENABLED:
+        return None
+    if _name_cache is None:
+        listener = get_change_listener()
+        with _lock:
+            if _name_cache is None:
+                # Entries are tiny; bound by count and account key length as bytes.
+                cache = LRUCache(max_entries=s.NAME_CACHE_MAX_ENTRIES, max_bytes=s.NAME_CACHE_MAX_ENTRIES * 1024)
+
+                def on_change(payload: dict) -> None:
+                    if payload.get("table") == "applications":
+                        cache.clear()
+
+                listener.subscribe(on_change)
+                listener.on_resync(cache.clear)
+                _name_cache = cache
+    return _name_cache
+
+
+def get_resolve_cache() -> LRUCache | None:
+    """Return the shared cache of resolved (merged) configurations per application.
+
+    A change to any configuration drops every resolution of its application.
+    Disabled with the config cache.
+    """
+    global _resolve_cache
+    s = get_settings()
+    if not s.CONFIG_CACHE_ENABLED:
+        return None
+    if _resolve_cache is None:
+        listener = get_change_listener()
+        with _lock:
+            if _resolve_cache is None:
+                cache = LRUCache(max_entries=s.RESOLVE_CACHE_MAX_ENTRIES, max_bytes=s.RESOLVE_CACHE_MAX_BYTES)
+
+                def on_change(payload: dict) -> None:
+                    if payload.get("table") == "configurations":
+                        cache.invalidate(payload.get("application_id"))
+
+                listener.subscribe(on_change)
+                listener.on_resync(cache.clear)
+                _resolve_cache = cache
+    return _resolve_cache
+
+
+def get_watch_hub() -> WatchHub:
+    """Return the shared `WatchHub` fed by the change listener.
+
+    The configuration cache subscribes first so that, by the time a waiter is
+    woken, the changed entry has already been invalidated in this worker.
+    """
+    global _watch_hub
+    if _watch_hub is None:
+        get_config_cache()
+        listener = get_change_listener()
+        with _lock:
+            if _watch_hub is None:
+                hub = WatchHub()
+
+                def on_change(payload: dict) -> None:
+                    if payload.get("table") == "configurations":
+                        hub.publish(payload["id"], payload.get("version"))
+
+                listener.subscribe(on_change)
+                listener.on_resync(hub.publish_all)
+                _watch_hub = hub
+    return _watch_hub
+
+
+def get_event_broker() -> EventBroker:
+    """Return the shared `EventBroker` fed by the change listener.
+
+    For each configuration change with at least one subscriber, the current
+    configuration is loaded once (through the cache) on a worker thread and the
+    encoded event is fanned out to every client of that application. Loads
+    may finish out of order, so versions older than the last published one
+    are dropped.
+    """
+    global _event_broker
+    if _event_broker is None:
+        get_config_cache()
+        listener = get_change_listener()
+        with _lock:
+            if _event_broker is None:
+                broker = EventBroker(buffer_size=get_settings().EVENTS_BUFFER_SIZE)
+
+                def on_change(payload: dict) -> None:
+                    if payload.get("table") != "configurations" or not broker.has_subscribers(payload.get("application_id")):
+                        return
+                    if not broker.is_stale(payload["id"], payload.get("version")):
+                        _get_executor().submit(_publish_configuration, broker, payload["id"])
+
+                listener.subscribe(on_change)
+                listener.on_resync(lambda: broker.publish_all("resync", "{}"))
+                _event_broker = broker
+    return _event_broker
+
+
+def get_snapshot_cache() -> LRUCache | None:
+    """Return the shared cache of spooled snapshot bundles, keyed by database snapshot.
+
+    Entries are immutable, so there is nothing to invalidate; older
+    snapshots are simply evicted, which frees their files. Disabled with
+    the config cache.
+    """
+    global _snapshot_cache
+    s = get_settings()
+    if not s.CONFIG_CACHE_ENABLED:
+        return None
+    if _snapshot_cache is None:
+        with _lock:
+            if _snapshot_cache is None:
+                _snapshot_cache = LRUCache(max_entries=16, max_bytes=s.SNAPSHOT_CACHE_MAX_BYTES)
+    return _snapshot_cache
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the worker pool that loads configurations for event publishing."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="events")
+    return _executor
+
+
+def _publish_configuration(broker: EventBroker, id: str) -> None:
+    """Load a changed configuration and publish it to its application's stream."""
+    row = ConfigurationsService(get_pool(), cache=get_config_cache()).find(id)
+    if row is not None:
+        broker.publish_versioned(row.application_id, row.id, row.version, "configuration", row.model_dump_json())
+
+
+def shutdown() -> None:
+    """Stop background resources started by this module."""
+    global _executor, _listener, _config_cache, _name_cache, _resolve_cache, _snapshot_cache, _watch_hub, _event_broker
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        _config_cache = None
+        _name_cache = None
+        _resolve_cache = None
+        _snapshot_cache = None
+        _watch_hub = None
+        _event_broker = None
+
+
 @asynccontextmanager
 async def with_pool() -> AsyncIterator[DBPool]:
     """Async context that yields the configured `DBPool`."""
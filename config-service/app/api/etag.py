@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+"""Entity tag helpers for conditional requests.
+
+Configurations carry a stored `version` that is bumped on every write, so
+their strong ETag is derived from it and can be checked without loading the
+document. Applications have no stored version; their ETag is a hash of the
+canonical JSON of the response (which includes the configuration ids).
+"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Response
+
+from app.api.fastjson import json_bytes
+
+
+def version_etag(version: int) -> str:
+    """Return the strong ETag for a stored row version."""
+    return f'"v{version}"'
+
+
+def snapshot_etag(snapshot: str) -> str:
+    """Return the strong ETag for the full bundle read under a Postgres snapshot."""
+    return '"s' + hashlib.sha256(snapshot.encode()).hexdigest()[:16] + '"'
+
+
+def projection_etag(version: int, paths: list[str]) -> str:
+    """Return the strong ETag for a path projection of a versioned row."""
+    digest = hashlib.sha256("\0".join(paths).encode()).hexdigest()[:12]
+    return f'"v{version}-{digest}"'
+
+
+def content_etag(data: Any) -> str:
+    """Return a strong ETag from a canonical (key-sorted) JSON encoding of `data`."""
+    return '"' + hashlib.sha256(json_bytes(data, sort_keys=True)).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return whether an `If-None-Match` header matches `etag`.
+
+    Uses the weak comparison required for `If-None-Match` (RFC 9110 13.1.2):
+    a `W/` prefix on either side is ignored, and `*` matches any current
+    representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty `304 Not Modified` response carrying `etag`."""
+    return Response(status_code=304, headers={"ETag": etag})
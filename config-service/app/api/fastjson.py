@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+"""Fast JSON responses for configuration read endpoints.
+
+Configuration read paths build response models from trusted database rows with
+`model_construct` (no validation) and return a `FastJSONResponse`, which
+encodes them straight to bytes with orjson. This skips FastAPI's
+`response_model` re-validation and the stdlib encoder, so a large `config`
+document is walked once instead of three times. Toggled by
+`FAST_SERIALIZATION`; application reads are dominated by their query and
+measured no faster (see `scripts/bench_reads.py`), so they keep the
+validated path.
+"""
+
+import json
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core import timing
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_bytes(content: Any, sort_keys: bool = False) -> bytes:
+    """Encode `content` (models, dicts, lists) to compact JSON bytes."""
+    with timing.timed("encode"):
+        try:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+        except orjson.JSONEncodeError:
+            # orjson rejects integers outside 64 bits, which JSONB can hold.
+            return json.dumps(
+                content, default=_default, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys
+            ).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with `json_bytes`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Encode the response content."""
+        return json_bytes(content)
+
+
+def fast_response(content: Any, response: Response) -> FastJSONResponse:
+    """Wrap `content` in a `FastJSONResponse` carrying headers set on the injected `response`."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(content, status_code=response.status_code or 200, headers=headers)
+
+
+def raw_configuration_bytes(row: dict) -> bytes:
+    """Assemble a `ConfigurationOut` body around already-encoded `config_json` bytes."""
+    envelope = {k: row[k] for k in ("id", "application_id", "name", "comments", "version")}
+    return json_bytes(envelope)[:-1] + b',"config":' + row["config_json"] + b"}"
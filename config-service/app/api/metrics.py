@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+"""Per-route request latency recording for the `/metrics` endpoint.
+
+`MetricsMiddleware` is a pure ASGI middleware: it reads the matched route
+template (not the raw path, which would explode label cardinality) and the
+response status, and observes the elapsed time in a histogram. Streamed
+responses are timed until their last body chunk is sent.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "config_service_http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+
+_UNMATCHED = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Observe request latency per (method, route, status)."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time the request and record it under its route template."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or _UNMATCHED
+            REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], template, status)
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 """Applications API routes."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import get_pool
-from app.models.types import ApplicationCreate, ApplicationOut, ApplicationUpdate
+from app.api.deps import get_event_broker, get_name_cache, get_pool
+from app.api.etag import content_etag, etag_matches, not_modified
+from app.api.routes.configurations import service as configurations_service
+from app.core.config import get_settings
+from app.core.events import stream
+from app.models.types import ApplicationCreate, ApplicationOut, ApplicationUpdate, ResolvedConfiguration
 from app.services.applications_service import ApplicationsService
+from app.services.configurations_service import ConfigurationsService
 
 
 router = APIRouter(prefix="/applications", tags=["applications"])
@@ -14,28 +21,101 @@ router = APIRouter(prefix="/applications", tags=["applications"])
 
 def service():
     """Dependency factory returning an `ApplicationsService`."""
-    return ApplicationsService(get_pool())
+    return ApplicationsService(get_pool(), names=get_name_cache())
 
 
 @router.post("", response_model=ApplicationOut, status_code=201)
-def create_application(data: ApplicationCreate, svc: ApplicationsService = Depends(service)):
+def create_application(data: ApplicationCreate, response: Response, svc: ApplicationsService = Depends(service)):
     """Create a new application."""
-    return svc.create(data)
+    out = svc.create(data)
+    response.headers["ETag"] = content_etag(out)
+    return out
 
 
 @router.put("/{id}", response_model=ApplicationOut)
-def update_application(id: str, data: ApplicationUpdate, svc: ApplicationsService = Depends(service)):
+def update_application(id: str, data: ApplicationUpdate, response: Response, svc: ApplicationsService = Depends(service)):
     """Update an application by id."""
-    return svc.update(str(id), data)
+    out = svc.update(str(id), data)
+    response.headers["ETag"] = content_etag(out)
+    return out
 
 
-@router.get("/{id}", response_model=ApplicationOut)
-def get_application(id: str, svc: ApplicationsService = Depends(service)):
-    """Fetch an application by id."""
-    return svc.get(str(id))
+@router.get("/{id}", response_model=ApplicationOut, responses={304: {"description": "Not modified"}})
+def get_application(
+    id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    svc: ApplicationsService = Depends(service),
+):
+    """Fetch an application by id; honours `If-None-Match` with a 304."""
+    out = svc.get(str(id))
+    etag = content_etag(out)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return out
 
 
-@router.get("", response_model=list[ApplicationOut])
-def list_applications(svc: ApplicationsService = Depends(service)):
-    """List applications with their configuration ids."""
-    return svc.list()
+@router.get("", response_model=list[ApplicationOut], responses={304: {"description": "Not modified"}})
+def list_applications(
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    svc: ApplicationsService = Depends(service),
+):
+    """List applications with their configuration ids; honours `If-None-Match`."""
+    out = svc.list()
+    etag = content_etag(out)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return out
+
+
+MAX_RESOLVE_LAYERS = 16
+
+
+@router.get(
+    "/{id}/configurations:resolve",
+    response_model=ResolvedConfiguration,
+    responses={304: {"description": "Not modified"}},
+)
+def resolve_configuration(
+    id: str,
+    response: Response,
+    layers: list[str] = Query(description="Configuration names to merge, lowest precedence first"),
+    if_none_match: str | None = Header(default=None),
+    svc: ConfigurationsService = Depends(configurations_service),
+):
+    """Deep-merge the named configurations of an application into one document.
+
+    Objects merge key by key; other values in later layers replace earlier
+    ones. The ETag covers the id and version of every layer.
+    """
+    names = list(dict.fromkeys(layers))
+    if len(names) > MAX_RESOLVE_LAYERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_RESOLVE_LAYERS} layers may be resolved")
+    out = svc.resolve(str(id), names)
+    etag = content_etag(out.layers)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return out
+
+
+@router.get("/{id}/events", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}})
+async def application_events(id: str, svc: ApplicationsService = Depends(service)):
+    """Stream configuration changes for an application as Server-Sent Events.
+
+    Emits `ready` on connect, then one `configuration` event (the full
+    `ConfigurationOut`) per create/update. A client that falls too far
+    behind receives `evicted` and is disconnected; after a listener
+    reconnect every client receives `resync` and should re-read its state.
+    """
+    await run_in_threadpool(svc.get, id)  # 404 for unknown applications
+    broker = get_event_broker()
+    sub = broker.subscribe(id)
+    return StreamingResponse(
+        stream(broker, sub, get_settings().EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
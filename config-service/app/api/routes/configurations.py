@@ -2,34 +2,284 @@ from __future__ import annotations
 
 """Configurations API routes."""
 
-from fastapi import APIRouter, Depends
+import asyncio
+import time
+from typing import Any
 
-from app.api.deps import get_pool
-from app.models.types import ConfigurationCreate, ConfigurationOut, ConfigurationUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.api.compression import precompressed_response
+from app.api.deps import get_config_cache, get_name_cache, get_pool, get_resolve_cache, get_watch_hub
+from app.api.fastjson import FastJSONResponse, fast_response, raw_configuration_bytes
+from app.api.etag import etag_matches, not_modified, projection_etag, version_etag
+from app.api.uploads import spooled_body
+from app.core.compression import negotiate
+from app.core.config import get_settings
+from app.models.types import (
+    BulkImportReport,
+    ConfigurationBatchGet,
+    ConfigurationBatchOut,
+    ConfigurationCreate,
+    ConfigurationOut,
+    ConfigurationProjection,
+    ConfigurationRevision,
+    ConfigurationRevisionPage,
+    ConfigurationUpdate,
+    JsonPatchOperation,
+)
 from app.services.configurations_service import ConfigurationsService
 
 
 router = APIRouter(prefix="/configurations", tags=["configurations"])
+by_name_router = APIRouter(prefix="/applications/by-name", tags=["configurations"])
 
 
 def service():
     """Dependency factory returning a `ConfigurationsService`."""
-    return ConfigurationsService(get_pool())
+    return ConfigurationsService(
+        get_pool(),
+        cache=get_config_cache(),
+        names=get_name_cache(),
+        resolved=get_resolve_cache(),
+        trusted_rows=get_settings().FAST_SERIALIZATION,
+    )
 
 
 @router.post("", response_model=ConfigurationOut, status_code=201)
-def create_configuration(data: ConfigurationCreate, svc: ConfigurationsService = Depends(service)):
+def create_configuration(data: ConfigurationCreate, response: Response, svc: ConfigurationsService = Depends(service)):
     """Create a configuration for an application."""
-    return svc.create(data)
+    out = svc.create(data)
+    response.headers["ETag"] = version_etag(out.version)
+    return out
+
+
+@router.post(":batchGet", response_model=ConfigurationBatchOut)
+def batch_get_configurations(data: ConfigurationBatchGet, response: Response, svc: ConfigurationsService = Depends(service)):
+    """Fetch up to 1000 configurations by id with a single query for cache misses."""
+    out = svc.batch_get(data.ids)
+    return fast_response(out, response) if get_settings().FAST_SERIALIZATION else out
+
+
+@router.post(
+    ":bulkImport",
+    response_model=BulkImportReport,
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}, "required": True}},
+)
+async def bulk_import_configurations(request: Request, svc: ConfigurationsService = Depends(service)):
+    """Upsert configurations from an NDJSON body (one `ConfigurationCreate` per line).
+
+    The body (at most `IMPORT_MAX_BYTES`, else 413) is spooled to a
+    temporary file and streamed into Postgres with COPY; per-line errors are
+    reported without aborting the batch.
+    """
+    async with spooled_body(request, get_settings().IMPORT_MAX_BYTES) as body:
+        return await run_in_threadpool(svc.bulk_import, body)
 
 
 @router.put("/{id}", response_model=ConfigurationOut)
-def update_configuration(id: str, data: ConfigurationUpdate, svc: ConfigurationsService = Depends(service)):
+def update_configuration(id: str, data: ConfigurationUpdate, response: Response, svc: ConfigurationsService = Depends(service)):
     """Update a configuration by id."""
-    return svc.update(str(id), data)
+    out = svc.update(str(id), data)
+    response.headers["ETag"] = version_etag(out.version)
+    return out
+
+
+MAX_PROJECTION_PATHS = 32
+
+
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+_json_patch_body = TypeAdapter(list[JsonPatchOperation])
+_merge_patch_body = TypeAdapter(dict[str, Any])
+
+
+@router.patch(
+    "/{id}",
+    response_model=ConfigurationOut,
+    responses={409: {"description": "A `test` or path precondition failed"}, 415: {"description": "Unsupported patch format"}},
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                JSON_PATCH: {"schema": {"type": "array", "items": JsonPatchOperation.model_json_schema(by_alias=True)}},
+                MERGE_PATCH: {"schema": {"type": "object"}},
+            },
+            "required": True,
+        }
+    },
+)
+async def patch_configuration(
+    id: str, request: Request, response: Response, svc: ConfigurationsService = Depends(service)
+):
+    """Patch `config` in place with RFC 6902 JSON Patch or RFC 7386 merge patch.
+
+    The patch is compiled to `jsonb_set`/`#-`/`jsonb_merge_patch` expressions
+    and applied atomically in one statement; the document is never read into
+    the service. The version is bumped only if the document changed.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (JSON_PATCH, MERGE_PATCH):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Use {JSON_PATCH} or {MERGE_PATCH}"
+        )
+    body = await request.body()
+    try:
+        if content_type == JSON_PATCH:
+            ops = _json_patch_body.validate_json(body)
+        else:
+            patch = _merge_patch_body.validate_json(body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in errors])
+    if content_type == JSON_PATCH:
+        out = await run_in_threadpool(svc.json_patch, str(id), ops)
+    else:
+        out = await run_in_threadpool(svc.merge_patch, str(id), patch)
+    response.headers["ETag"] = version_etag(out.version)
+    return out
+
+
+@router.get(
+    "/{id}",
+    response_model=ConfigurationOut | ConfigurationProjection,
+    responses={304: {"description": "Not modified"}},
+)
+def get_configuration(
+    id: str,
+    response: Response,
+    path: list[str] | None = Query(
+        default=None,
+        description="Dotted path into `config` (e.g. `limits.qps`, `hosts.0`); repeat to select several",
+    ),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+    svc: ConfigurationsService = Depends(service),
+):
+    """Fetch a configuration by id; honours `If-None-Match` with a 304.
+
+    With `path`, only the selected subtrees are extracted (in Postgres) and
+    returned as a `ConfigurationProjection`. Full documents are compressed
+    once per version and served from the configuration cache.
+    """
+    paths = list(dict.fromkeys(path)) if path else None
+    if paths is not None:
+        if len(paths) > MAX_PROJECTION_PATHS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_PROJECTION_PATHS} paths may be requested")
+        if any(not segment for p in paths for segment in p.split(".")):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Paths must be non-empty dot-separated keys")
+
+    def etag_for(version: int) -> str:
+        return projection_etag(version, paths) if paths is not None else version_etag(version)
+
+    if if_none_match:
+        version = svc.get_version(str(id))
+        if version is not None and etag_matches(if_none_match, etag_for(version)):
+            return not_modified(etag_for(version))
+    settings = get_settings()
+    encoding = negotiate(accept_encoding) if settings.COMPRESSION_ENABLED else None
+    if paths is None and settings.CONFIG_RAW_PASSTHROUGH:
+        row = svc.get_raw(str(id))
+        etag = version_etag(row["version"])
+        if encoding is not None and svc.cache is not None:
+            return precompressed_response(
+                svc.cache,
+                ("configuration", row["id"], row["version"]),
+                encoding,
+                lambda: raw_configuration_bytes(row),
+                etag,
+                minimum_size=settings.COMPRESSION_MIN_SIZE,
+            )
+        return Response(raw_configuration_bytes(row), media_type=FastJSONResponse.media_type, headers={"ETag": etag})
+    out = svc.get_projection(str(id), paths) if paths is not None else svc.get(str(id))
+    if paths is None and encoding is not None and svc.cache is not None:
+        return precompressed_response(
+            svc.cache,
+            ("configuration", out.id, out.version),
+            encoding,
+            lambda: out.model_dump_json().encode(),
+            etag_for(out.version),
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+        )
+    response.headers["ETag"] = etag_for(out.version)
+    return fast_response(out, response) if settings.FAST_SERIALIZATION else out
+
+
+@router.get("/{id}/revisions", response_model=ConfigurationRevisionPage)
+def list_configuration_revisions(
+    id: str,
+    before: int | None = Query(default=None, ge=1, description="Only revisions older than this one"),
+    limit: int = Query(default=50, ge=1, le=500),
+    svc: ConfigurationsService = Depends(service),
+):
+    """List a configuration's revisions, newest first (keyset-paginated via `before`)."""
+    return svc.list_revisions(str(id), before, limit)
+
+
+@router.get("/{id}/revisions/{revision}", response_model=ConfigurationRevision)
+def get_configuration_revision(id: str, revision: int, response: Response, svc: ConfigurationsService = Depends(service)):
+    """Fetch the `config` document as it was at `revision` (revisions are immutable)."""
+    out = svc.get_revision(str(id), revision)
+    response.headers["ETag"] = version_etag(out.revision)
+    return out
+
+
+@router.get("/{id}/watch", response_model=ConfigurationOut, responses={304: {"description": "No change before timeout"}})
+async def watch_configuration(
+    id: str,
+    response: Response,
+    version: int = Query(ge=0, description="Return once the configuration version exceeds this value"),
+    timeout: float = Query(default=30, gt=0, le=300, description="Seconds to wait before answering 304"),
+    svc: ConfigurationsService = Depends(service),
+):
+    """Long-poll until the configuration moves past `version`, then return it.
+
+    Waiting holds neither a worker thread nor a database connection: the
+    request parks on a future that the shared change listener resolves.
+    """
+    hub = get_watch_hub()
+    deadline = time.monotonic() + timeout
+    while True:
+        # Register before checking so a change between the check and the
+        # wait still wakes us.
+        fut = hub.register(id)
+        try:
+            current = await run_in_threadpool(svc.get_version, id)
+            if current is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+            if current > version:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return not_modified(version_etag(current))
+            try:
+                await asyncio.wait_for(fut, remaining)
+            except asyncio.TimeoutError:
+                return not_modified(version_etag(current))
+        finally:
+            hub.unregister(id, fut)
+    out = await run_in_threadpool(svc.get, id)
+    response.headers["ETag"] = version_etag(out.version)
+    return out
 
 
-@router.get("/{id}", response_model=ConfigurationOut)
-def get_configuration(id: str, svc: ConfigurationsService = Depends(service)):
-    """Fetch a configuration by id."""
-    return svc.get(str(id))
+@by_name_router.get(
+    "/{application_name}/configurations/{name}",
+    response_model=ConfigurationOut,
+    responses={304: {"description": "Not modified"}},
+)
+def get_configuration_by_name(
+    application_name: str,
+    name: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    svc: ConfigurationsService = Depends(service),
+):
+    """Fetch a configuration by application name and configuration name."""
+    out = svc.get_by_names(application_name, name)
+    etag = version_etag(out.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return fast_response(out, response) if get_settings().FAST_SERIALIZATION else out
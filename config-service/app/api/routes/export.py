@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+"""Whole-dataset export and import routes."""
+
+import itertools
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_config_cache, get_pool, get_resolve_cache
+from app.api.uploads import spooled_body
+from app.core.compression import compressor, negotiate
+from app.core.config import get_settings
+from app.models.types import ImportReport
+from app.services.export_service import ExportService
+
+router = APIRouter(tags=["export"])
+
+NDJSON = "application/x-ndjson"
+
+
+def service():
+    """Dependency factory returning an `ExportService`."""
+    return ExportService(
+        get_pool(),
+        cache=get_config_cache(),
+        resolved=get_resolve_cache(),
+        itersize=get_settings().EXPORT_ITERSIZE,
+    )
+
+
+def _compressed(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    c = compressor(encoding)
+    for chunk in chunks:
+        out = c.compress(chunk)
+        if out:
+            yield out
+    yield c.flush()
+
+
+@router.get("/export", response_class=StreamingResponse, responses={200: {"content": {NDJSON: {}}}})
+async def export(accept_encoding: str | None = Header(default=None), svc: ExportService = Depends(service)):
+    """Stream every application and configuration as NDJSON from one consistent snapshot.
+
+    Applications come first, then configurations, each line tagged with its
+    `type`. The body is compressed on the fly with the coding negotiated
+    from `Accept-Encoding` (gzip, br or zstd).
+    """
+    chunks = svc.export()
+    # Start the export before responding so pool and database errors still
+    # produce a proper status code rather than a truncated 200.
+    first = await run_in_threadpool(next, chunks, None)
+    body: Iterator[bytes] = itertools.chain([] if first is None else [first], chunks)
+    headers = {"Content-Disposition": 'attachment; filename="export.ndjson"', "Cache-Control": "no-store"}
+    encoding = negotiate(accept_encoding) if get_settings().COMPRESSION_ENABLED else None
+    if encoding is not None:
+        body = _compressed(body, encoding)
+        headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    return StreamingResponse(body, media_type=NDJSON, headers=headers)
+
+
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    openapi_extra={"requestBody": {"content": {NDJSON: {"schema": {"type": "string"}}}, "required": True}},
+)
+async def import_export(request: Request, svc: ExportService = Depends(service)):
+    """Upsert applications and configurations from a `GET /export` body.
+
+    The body (optionally `Content-Encoding: gzip`; at most
+    `IMPORT_MAX_BYTES` inflated, else 413) is spooled to a temporary file
+    and streamed into Postgres with COPY in one transaction; per-line
+    errors are reported without aborting the import.
+    """
+    encoding = request.headers.get("content-encoding", "identity").lower()
+    if encoding not in ("identity", "gzip"):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Unsupported Content-Encoding: {encoding}")
+    async with spooled_body(request, get_settings().IMPORT_MAX_BYTES, gzip=encoding == "gzip") as body:
+        return await run_in_threadpool(svc.import_lines, body)
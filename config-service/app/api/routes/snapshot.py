@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+"""Snapshot bundle and delta routes."""
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.compression import weak_etag
+from app.api.deps import get_pool, get_snapshot_cache
+from app.api.etag import etag_matches, not_modified, snapshot_etag
+from app.api.fastjson import FastJSONResponse
+from app.core.compression import negotiate
+from app.core.config import get_settings
+from app.models.types import SnapshotBundle
+from app.services.snapshot_service import Bundle, SnapshotService
+
+router = APIRouter(tags=["snapshot"])
+
+
+def service():
+    """Dependency factory returning a `SnapshotService`."""
+    s = get_settings()
+    return SnapshotService(get_pool(), cache=get_snapshot_cache(), itersize=s.EXPORT_ITERSIZE, max_bytes=s.SNAPSHOT_MAX_BYTES)
+
+
+def _send(bundle: Bundle, headers: dict[str, str]) -> StreamingResponse:
+    headers = {**headers, "Content-Length": str(bundle.size), "Vary": "Accept-Encoding"}
+    if bundle.encoding is not None:
+        headers["Content-Encoding"] = bundle.encoding
+        if "ETag" in headers:
+            headers["ETag"] = weak_etag(headers["ETag"])
+    return StreamingResponse(bundle.chunks(), media_type=FastJSONResponse.media_type, headers=headers)
+
+
+@router.get("/snapshot", response_model=SnapshotBundle, responses={304: {"description": "Snapshot unchanged"}})
+def get_snapshot(
+    since: int | None = Query(default=None, ge=0, description="`seq` of the client's last bundle"),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+    svc: SnapshotService = Depends(service),
+):
+    """Return every application and configuration with the watermark `seq` to poll from.
+
+    With `since`, return only rows changed since it plus the ids deleted
+    since; a full bundle (`since` null) is returned instead if the delta is
+    no longer available. Bundles are spooled to disk and streamed; full
+    ones are built once per database snapshot, cached (compressed per
+    coding) and carry an `ETag` derived from it. Bundles over
+    `SNAPSHOT_MAX_BYTES` get 507.
+    """
+    settings = get_settings()
+    encoding = negotiate(accept_encoding) if settings.COMPRESSION_ENABLED else None
+    if since is not None:
+        bundle = svc.delta(since)
+        if encoding is not None and bundle.size >= settings.COMPRESSION_MIN_SIZE:
+            bundle = bundle.compressed(encoding)
+        return _send(bundle, {"Cache-Control": "no-cache"})
+    snapshot = svc.current_snapshot()
+    if etag_matches(if_none_match, snapshot_etag(snapshot)):
+        return not_modified(snapshot_etag(snapshot))
+    snapshot, bundle = svc.snapshot(snapshot)
+    if encoding is not None and bundle.size >= settings.COMPRESSION_MIN_SIZE:
+        bundle = svc.encoded(snapshot, bundle, encoding)
+    return _send(bundle, {"ETag": snapshot_etag(snapshot)})
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+"""`Server-Timing` header with a per-request latency breakdown.
+
+`ServerTimingMiddleware` starts an accumulator (`app.core.timing`) for each
+HTTP request and, when the response starts, reports what was recorded:
+
+- `db-wait`: waiting to borrow a pooled connection
+- `db`: executing statements (including `COPY`)
+- `model`: building response models from rows
+- `encode`: JSON encoding of fast-path responses and ETag hashing
+- `compress`: response compression
+- `total`: time until the response headers were sent
+
+Metrics that did not occur are omitted. Toggled by `SERVER_TIMING_ENABLED`.
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import timing
+
+
+class ServerTimingMiddleware:
+    """Add a `Server-Timing` header breaking down where request time went."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Account the request and report the totals on the response start."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        timings, token = timing.begin()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timings["total"] = time.perf_counter() - started
+                MutableHeaders(raw=message["headers"]).append("Server-Timing", timing.header_value(timings))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            timing.end(token)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+"""Spooling of large request bodies (bulk imports).
+
+Bodies are read from the event loop but inflated and written to a temporary
+file (memory up to 8 MiB, then disk) from the threadpool, so neither a spool
+that spilled to disk nor decompression blocks the loop. Bodies over the
+configured limit, after inflation, get 413.
+"""
+
+import tempfile
+import zlib
+from contextlib import asynccontextmanager
+from typing import IO, AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+_SPOOL_MEMORY = 8 * 1024 * 1024
+# Chunks are gathered up to this size before each threadpool write; gzip
+# input is also inflated at most this much at a time.
+_WRITE_SIZE = 1024 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"Body exceeds {max_bytes} bytes")
+
+
+class _Spool:
+    """Writes (optionally gunzipped) body data to `file`, counting what it stores."""
+
+    def __init__(self, file: IO[bytes], max_bytes: int, gzip: bool):
+        self.file = file
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+
+    def _store(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self.file.write(data)
+
+    def write(self, data: bytes) -> None:
+        if self.inflate is None:
+            self._store(data)
+            return
+        try:
+            while data:
+                self._store(self.inflate.decompress(data, _WRITE_SIZE))
+                data = self.inflate.unconsumed_tail
+        except zlib.error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed gzip body")
+
+    def finish(self) -> None:
+        if self.inflate is not None:
+            if not self.inflate.eof:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed gzip body")
+            self._store(self.inflate.flush())
+        self.file.seek(0)
+
+
+@asynccontextmanager
+async def spooled_body(request: Request, max_bytes: int, gzip: bool = False) -> AsyncIterator[IO[bytes]]:
+    """Yield the request body spooled to a rewound temporary file.
+
+    With `gzip`, the body is inflated as it is spooled (a malformed one
+    gets 400). Raises 413 as soon as the body, or its inflated form, is
+    known to exceed `max_bytes`.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise _too_large(max_bytes)
+    body = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY)
+    try:
+        spool = _Spool(body, max_bytes, gzip)
+        received = 0
+        pending: list[bytes] = []
+        pending_size = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise _too_large(max_bytes)
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= _WRITE_SIZE:
+                await run_in_threadpool(spool.write, b"".join(pending))
+                pending, pending_size = [], 0
+        await run_in_threadpool(spool.write, b"".join(pending))
+        await run_in_threadpool(spool.finish)
+        yield body
+    finally:
+        body.close()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+"""Bounded, thread-safe LRU cache with byte-size accounting.
+
+Entries are evicted least-recently-used first once either the entry count or
+the accounted byte total exceeds its limit. Callers supply the size of each
+value when storing it, so the cache never has to walk large payloads itself.
+
+To avoid re-populating an entry with data read before a concurrent
+invalidation, loaders capture `generation()` before reading from the
+database and pass it to `put`; the put is dropped if any invalidation
+happened in between.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+
+@dataclass
+class CacheStats:
+    """Point-in-time counters for a cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class LRUCache:
+    """LRU cache bounded by entry count and accounted bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """Create an empty cache with the given limits."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def generation(self) -> int:
+        """Return the invalidation generation to pass to a later `put`."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for `key` (marking it recently used) or `None`."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int, generation: int | None = None) -> bool:
+        """Store `value` accounted as `size` bytes; return whether it was kept.
+
+        When `generation` is given and an invalidation has happened since it
+        was captured, the value is considered stale and is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if size > self.max_bytes:
+                return False
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self._stats.evictions += 1
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop `key` if present and bump the invalidation generation."""
+        with self._lock:
+            self._generation += 1
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        """Drop every entry and bump the invalidation generation."""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._data),
+                bytes=self._bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
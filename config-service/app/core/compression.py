@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+"""Content-coding negotiation and compressors.
+
+gzip is always available; brotli (`br`) and zstd are offered when the
+optional `brotli` / `zstandard` packages are installed
+(`pip install config-service[compression]`).
+"""
+
+import gzip
+import zlib
+from typing import Callable, Protocol
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Compressors take (data, best); `best` trades CPU for ratio and is used for
+# bodies that are compressed once and cached.
+_ENCODERS: dict[str, Callable[[bytes, bool], bytes]] = {
+    "gzip": lambda data, best: gzip.compress(data, compresslevel=9 if best else 6, mtime=0),
+}
+if brotli is not None:
+    _ENCODERS["br"] = lambda data, best: brotli.compress(data, quality=9 if best else 4)
+if zstandard is not None:
+    _ENCODERS["zstd"] = lambda data, best: zstandard.ZstdCompressor(level=12 if best else 3).compress(data)
+
+# Server preference among codings the client accepts with equal weight.
+_PREFERENCE = ("br", "zstd", "gzip")
+
+
+def available_encodings() -> list[str]:
+    """Return the content codings this process can produce, most preferred first."""
+    return [e for e in _PREFERENCE if e in _ENCODERS]
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Pick a content coding for an `Accept-Encoding` header, or `None` for identity.
+
+    Honours q-values (`q=0` refuses a coding) and `*`; ties go to the server
+    preference order br > zstd > gzip.
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(encoding: str, data: bytes, best: bool = False) -> bytes:
+    """Compress `data` with a coding returned by `negotiate`."""
+    return _ENCODERS[encoding](data, best)
+
+
+class StreamCompressor(Protocol):
+    """Incremental compressor: feed chunks to `compress`, then call `flush` once."""
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._c = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.finish()
+
+
+def compressor(encoding: str) -> StreamCompressor:
+    """Return an incremental compressor for streamed bodies in a coding returned by `negotiate`."""
+    if encoding == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == "br":
+        return _Brotli()
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    raise ValueError(f"Unsupported content coding: {encoding!r}")
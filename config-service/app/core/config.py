@@ -27,6 +27,62 @@ class Settings(BaseSettings):
 
     DB_POOL_MIN: int = 1
     DB_POOL_MAX: int = 10
+    # Seconds a checkout waits (FIFO) for a free connection before the request
+    # fails with 503; 0 restores fail-fast `connection pool exhausted`.
+    DB_POOL_TIMEOUT: float = 5.0
+    DB_POOL_RETRY_AFTER: int = 1
+    # Read replicas as `host[:port],...` (same database and credentials).
+    # Reads are balanced across healthy replicas; writes return an LSN token
+    # (X-Consistency-Token) that later reads can present for read-your-writes.
+    DB_REPLICA_HOSTS: str = ""
+    DB_REPLICA_RETRY_SECONDS: float = 5.0
+    # Prepare hot statements once per pooled connection. Turn off behind
+    # transaction-pooling proxies that do not preserve sessions.
+    DB_PREPARED_STATEMENTS: bool = True
+
+    # In-process read-through cache for configurations, kept coherent across
+    # workers via Postgres LISTEN/NOTIFY.
+    CONFIG_CACHE_ENABLED: bool = True
+    CONFIG_CACHE_MAX_ENTRIES: int = 10_000
+    CONFIG_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    NAME_CACHE_MAX_ENTRIES: int = 50_000
+    RESOLVE_CACHE_MAX_ENTRIES: int = 10_000
+    RESOLVE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Full GET /snapshot bundles (raw and compressed), one set per database
+    # snapshot. Bundles are spooled to temporary files, so this budgets disk
+    # rather than memory; keep it well above SNAPSHOT_MAX_BYTES.
+    SNAPSHOT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024 * 1024
+    # Largest GET /snapshot bundle rendered; larger ones get 507.
+    SNAPSHOT_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+
+    # Configuration read endpoints build models from DB rows without
+    # validation and encode them with orjson, bypassing response_model
+    # re-validation. Application reads are query-bound and gain nothing.
+    FAST_SERIALIZATION: bool = True
+    # Serve GET /configurations/{id} by splicing the stored `config::text`
+    # into the response envelope; the document is never parsed in Python.
+    CONFIG_RAW_PASSTHROUGH: bool = False
+
+    # Response compression (gzip always; br/zstd with the `compression` extra).
+    # Cached configuration reads keep their compressed bodies in the config cache.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # Pool and per-route latency metrics, exposed on GET /metrics.
+    METRICS_ENABLED: bool = True
+    # Per-request Server-Timing header (db-wait, db, model, encode, compress,
+    # total). Off by default since it reveals internal timings to clients.
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Rows fetched per round trip by the server-side cursors of GET /export
+    # and GET /snapshot.
+    EXPORT_ITERSIZE: int = 2000
+    # Largest :bulkImport / POST /import body accepted; larger requests get 413.
+    IMPORT_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # Server-Sent Events change streams (per connected client).
+    EVENTS_BUFFER_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
 
     def log_level(self) -> int:
         """Return the numeric log level derived from `LOG_LEVEL`."""
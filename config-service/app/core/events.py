@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+"""Per-application change streams for Server-Sent Events.
+
+Each connected client owns a `Subscription` with a bounded asyncio queue on
+its own event loop. `EventBroker.publish` is thread-safe and enqueues a
+pre-encoded SSE frame for every subscriber of the application. A subscriber
+whose queue is full is evicted: its backlog is dropped and it receives a
+final `evicted` event, so one slow consumer can never grow memory or hold
+back the others. Evicted clients are expected to reconnect and resync.
+
+Configuration events are loaded concurrently, so `publish_versioned` drops
+an event that arrives after a newer version of the same row was published.
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import AsyncIterator
+
+_EVICTED = object()
+
+
+def sse_frame(event: str, data: str) -> str:
+    """Encode one SSE message; `data` must not contain newlines."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """A single client's bounded event queue."""
+
+    def __init__(self, application_id: str, maxsize: int):
+        """Bind a new queue to the running event loop."""
+        self.application_id = application_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.evicted = False
+
+    def offer(self, frame: str) -> None:
+        """Enqueue `frame`, evicting the subscriber if its buffer is full (loop thread only)."""
+        if self.evicted:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.evicted = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_EVICTED)
+
+
+class EventBroker:
+    """Fan-out of pre-encoded SSE frames to subscribers grouped by application."""
+
+    def __init__(self, buffer_size: int = 100, max_tracked_versions: int = 100_000):
+        """Create a broker whose subscribers buffer at most `buffer_size` frames.
+
+        The last published version is remembered for up to
+        `max_tracked_versions` rows (least recently published are forgotten).
+        """
+        self.buffer_size = buffer_size
+        self.max_tracked_versions = max_tracked_versions
+        self._subs: dict[str, set[Subscription]] = defaultdict(set)
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+
+    def subscribe(self, application_id: str) -> Subscription:
+        """Register a subscription on the running loop."""
+        sub = Subscription(application_id, self.buffer_size)
+        with self._lock:
+            self._subs[application_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Remove `sub`; safe to call more than once."""
+        with self._lock:
+            subs = self._subs.get(sub.application_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.application_id]
+
+    def has_subscribers(self, application_id: str | None) -> bool:
+        """Return whether any client is streaming `application_id`."""
+        with self._lock:
+            return bool(application_id) and application_id in self._subs
+
+    def subscriber_count(self) -> int:
+        """Return the total number of connected subscribers."""
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    def publish(self, application_id: str, event: str, data: str) -> None:
+        """Send one event to every subscriber of `application_id` (any thread)."""
+        with self._lock:
+            subs = list(self._subs.get(application_id, ()))
+        self._deliver(subs, sse_frame(event, data))
+
+    def is_stale(self, key: str, version: int | None) -> bool:
+        """Return whether `version` of `key` is not newer than the last one published."""
+        with self._publish_lock:
+            return version is not None and self._versions.get(key, 0) >= version
+
+    def publish_versioned(self, application_id: str, key: str, version: int, event: str, data: str) -> bool:
+        """Publish like `publish` unless `version` of `key` is not newer than the last one published.
+
+        Returns whether the event was sent. Checking and delivering under one
+        lock keeps each subscriber's frames in version order.
+        """
+        with self._publish_lock:
+            if self._versions.get(key, 0) >= version:
+                return False
+            self._versions[key] = version
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_tracked_versions:
+                self._versions.popitem(last=False)
+            self.publish(application_id, event, data)
+            return True
+
+    def publish_all(self, event: str, data: str) -> None:
+        """Send one event to every subscriber of every application (any thread)."""
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+        self._deliver(subs, sse_frame(event, data))
+
+    def _deliver(self, subs: list[Subscription], frame: str) -> None:
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, frame)
+            except RuntimeError:  # the subscriber's loop has already closed
+                self.unsubscribe(sub)
+
+
+async def stream(broker: EventBroker, sub: Subscription, heartbeat: float) -> AsyncIterator[str]:
+    """Yield SSE frames for `sub` until it is evicted or the client disconnects.
+
+    Emits a comment line every `heartbeat` seconds of silence so proxies keep
+    the connection open and dead clients are detected on write.
+    """
+    try:
+        yield sse_frame("ready", json.dumps({"application_id": sub.application_id}))
+        while True:
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is _EVICTED:
+                yield sse_frame("evicted", json.dumps({"reason": "slow consumer"}))
+                return
+            yield frame
+    finally:
+        broker.unsubscribe(sub)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+"""Apply the structural JSON diffs stored in `configuration_revisions`.
+
+Diffs are produced in Postgres by `config_jsonb_diff` (see migration 0004)
+and have the shape `{"s": {key: value}, "d": [key, ...], "o": {key: diff}}`:
+set keys, delete keys, and recurse into keys whose old and new values are
+both objects.
+"""
+
+from typing import Any
+
+
+def apply_diff(doc: dict[str, Any], diff: dict[str, Any]) -> dict[str, Any]:
+    """Return `doc` with `diff` applied, without mutating `doc`."""
+    out = dict(doc)
+    for key in diff.get("d", ()):
+        out.pop(key, None)
+    out.update(diff.get("s", {}))
+    for key, sub in diff.get("o", {}).items():
+        out[key] = apply_diff(out.get(key) or {}, sub)
+    return out
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+"""Deep merge of layered configuration documents."""
+
+from typing import Any
+
+
+def deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Return `base` with `override` applied on top, without mutating either.
+
+    Objects are merged key by key, recursively; any other value (scalars,
+    arrays, `null`) in `override` replaces the value in `base`.
+    """
+    out = dict(base)
+    for key, value in override.items():
+        current = out.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            out[key] = deep_merge(current, value)
+        else:
+            out[key] = value
+    return out
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+"""Per-request time accounting for the `Server-Timing` response header.
+
+`ServerTimingMiddleware` (see `app.api.timing`) installs a fresh
+accumulator in a context variable for each request. The DB pool, cursors,
+services and encoders add elapsed time to named metrics with `timed` or
+`record`; outside a timed request these are no-ops costing one context
+variable lookup. Context variables are copied into threadpool workers, so
+sync route handlers write into the same accumulator.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_current: ContextVar[dict[str, float] | None] = ContextVar("server_timing", default=None)
+
+
+def begin() -> tuple[dict[str, float], Token]:
+    """Start accounting for the current context; pass the token to `end`."""
+    timings: dict[str, float] = {}
+    return timings, _current.set(timings)
+
+
+def end(token: Token) -> None:
+    """Stop accounting started by `begin`."""
+    _current.reset(token)
+
+
+def record(metric: str, seconds: float) -> None:
+    """Add `seconds` to `metric` for the current request, if timed."""
+    timings = _current.get()
+    if timings is not None:
+        timings[metric] = timings.get(metric, 0.0) + seconds
+
+
+@contextmanager
+def timed(metric: str) -> Iterator[None]:
+    """Add the duration of the `with` block to `metric`."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[metric] = timings.get(metric, 0.0) + time.perf_counter() - started
+
+
+def timed_factory(metric: str, factory: Callable[..., T]) -> Callable[..., T]:
+    """Wrap `factory` so each call's duration is added to `metric`."""
+
+    def call(*args, **kwargs) -> T:
+        timings = _current.get()
+        if timings is None:
+            return factory(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return factory(*args, **kwargs)
+        finally:
+            timings[metric] = timings.get(metric, 0.0) + time.perf_counter() - started
+
+    return call
+
+
+def header_value(timings: dict[str, float]) -> str:
+    """Format `timings` (seconds) as a `Server-Timing` header value in milliseconds."""
+    return ", ".join(f"{metric};dur={seconds * 1000:.3f}" for metric, seconds in timings.items())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+"""Fan-out of configuration change notifications to waiting coroutines.
+
+Long-poll requests register an `asyncio.Future` per configuration id on their
+own event loop. The change listener thread calls `publish`, which resolves
+the matching futures via `call_soon_threadsafe`. Waiting therefore costs no
+thread and no database connection.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class WatchHub:
+    """Registry of asyncio futures waiting for changes to a configuration."""
+
+    def __init__(self):
+        """Create an empty hub."""
+        self._waiters: dict[str, set[asyncio.Future]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def register(self, id: str) -> asyncio.Future:
+        """Return a future resolved with the next published version of `id`.
+
+        Must be called from a coroutine running on the loop that will await it.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters[id].add(fut)
+        return fut
+
+    def unregister(self, id: str, fut: asyncio.Future) -> None:
+        """Forget `fut`, e.g. after it resolved or its request timed out."""
+        with self._lock:
+            waiters = self._waiters.get(id)
+            if waiters is not None:
+                waiters.discard(fut)
+                if not waiters:
+                    del self._waiters[id]
+
+    def publish(self, id: str, version: int | None) -> None:
+        """Wake every waiter for `id` with `version`; safe to call from any thread."""
+        with self._lock:
+            waiters = self._waiters.pop(id, set())
+        for fut in waiters:
+            try:
+                fut.get_loop().call_soon_threadsafe(_resolve, fut, version)
+            except RuntimeError:  # the waiter's loop has already closed
+                pass
+
+    def publish_all(self) -> None:
+        """Wake every waiter with `None` so each re-checks the current version."""
+        with self._lock:
+            ids = list(self._waiters)
+        for id in ids:
+            self.publish(id, None)
+
+    def waiting(self) -> int:
+        """Return the number of registered waiters."""
+        with self._lock:
+            return sum(len(w) for w in self._waiters.values())
+
+
+def _resolve(fut: asyncio.Future, version: int | None) -> None:
+    if not fut.done():
+        fut.set_result(version)
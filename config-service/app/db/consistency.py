@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+"""Read-your-writes tokens for replica routing.
+
+A token is a Postgres WAL position (LSN, e.g. `0/16B3748`). After a write
+commits on the primary, `DBPool` records the primary's current LSN in the
+request's `Session`; the API returns it to the client, which presents it on
+later reads so they are only served by a replica that has replayed at
+least that far (or by the primary).
+
+The session lives in a context variable installed per request by
+`app.api.consistency.ConsistencyMiddleware`; like `app.core.timing`, it is
+visible to route handlers running in the threadpool.
+"""
+
+import re
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+_LSN = re.compile(r"^([0-9A-Fa-f]{1,8})/([0-9A-Fa-f]{1,8})$")
+
+
+def parse_lsn(text: str) -> int:
+    """Return the LSN `hi/lo` (hex) as an integer; raise `ValueError` if malformed."""
+    match = _LSN.match(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid LSN: {text!r}")
+    return (int(match.group(1), 16) << 32) | int(match.group(2), 16)
+
+
+def format_lsn(lsn: int) -> str:
+    """Return `lsn` in Postgres' `hi/lo` text form."""
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+@dataclass
+class Session:
+    """Consistency requirements and results of one request."""
+
+    min_lsn: int = 0
+    written_lsn: int = 0
+
+
+_current: ContextVar[Session | None] = ContextVar("consistency_session", default=None)
+
+
+def begin(min_lsn: int = 0) -> tuple[Session, Token]:
+    """Start a session requiring reads at or after `min_lsn`; pass the token to `end`."""
+    session = Session(min_lsn=min_lsn)
+    return session, _current.set(session)
+
+
+def end(token: Token) -> None:
+    """Close a session started by `begin`."""
+    _current.reset(token)
+
+
+def required_lsn() -> int:
+    """Return the LSN reads in the current session must observe (0 if none)."""
+    session = _current.get()
+    return session.min_lsn if session is not None else 0
+
+
+def record_write(lsn: int) -> None:
+    """Note a committed write; later reads in the same session must observe it."""
+    session = _current.get()
+    if session is not None:
+        session.written_lsn = max(session.written_lsn, lsn)
+        session.min_lsn = max(session.min_lsn, lsn)
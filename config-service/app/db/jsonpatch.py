@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+"""Compile JSON Patch (RFC 6902) and JSON Merge Patch (RFC 7386) to SQL.
+
+Patches are applied inside Postgres so the stored document never makes a
+round trip through Python. A patch compiles to a chain of
+`CROSS JOIN LATERAL` steps, one per operation, each yielding the document
+after that operation (`doc`) and whether every precondition so far held
+(`ok`). A step only evaluates its expression when its precondition holds,
+so invalid paths turn into `ok = false` instead of SQL errors.
+"""
+
+import re
+from typing import Any, Callable, NamedTuple
+
+from psycopg2.extras import Json
+
+_ARRAY_INDEX = re.compile(r"^(0|[1-9][0-9]*)$")
+
+
+class PatchError(ValueError):
+    """A patch that is malformed independently of the target document."""
+
+
+class _Frag(NamedTuple):
+    """A SQL fragment and its positional parameters, in textual order."""
+
+    sql: str
+    params: tuple
+
+
+def _sql(template: str, *parts: _Frag) -> _Frag:
+    """Substitute `parts` for the `{}` placeholders of `template` in order."""
+    pieces = template.split("{}")
+    if len(pieces) != len(parts) + 1:
+        raise AssertionError("placeholder count mismatch")
+    sql = pieces[0]
+    params: tuple = ()
+    for part, piece in zip(parts, pieces[1:]):
+        sql += part.sql + piece
+        params += part.params
+    return _Frag(sql, params)
+
+
+def _path(tokens: list[str]) -> _Frag:
+    return _Frag("%s::text[]", (tokens,))
+
+
+def _value(value: Any) -> _Frag:
+    return _Frag("%s::jsonb", (Json(value),))
+
+
+_TRUE = _Frag("true", ())
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _exists(doc: _Frag, path: list[str]) -> _Frag:
+    return _sql("(({} #> {}) IS NOT NULL)", doc, _path(path))
+
+
+def _add(doc: _Frag, path: list[str], value: _Frag) -> tuple[_Frag, _Frag]:
+    """Return `(expression, precondition)` for adding `value` at `path`."""
+    if not path:
+        return value, _TRUE
+    parent, last = path[:-1], path[-1]
+    parent_type = _sql("jsonb_typeof({} #> {})", doc, _path(parent))
+    into_object = _sql("jsonb_set({}, {}, {}, true)", doc, _path(path), value)
+    if last == "-":
+        into_array = _sql("jsonb_set({}, {}, ({} #> {}) || jsonb_build_array({}))", doc, _path(parent), doc, _path(parent), value)
+        array_ok = _TRUE
+    elif _ARRAY_INDEX.match(last):
+        into_array = _sql("jsonb_insert({}, {}, {})", doc, _path(path), value)
+        array_ok = _sql("(jsonb_array_length({} #> {}) >= {})", doc, _path(parent), _Frag("%s", (int(last),)))
+    else:
+        return into_object, _sql("({} = 'object')", parent_type)
+    expr = _sql("CASE {} WHEN 'object' THEN {} WHEN 'array' THEN {} END", parent_type, into_object, into_array)
+    cond = _sql("CASE {} WHEN 'object' THEN true WHEN 'array' THEN {} ELSE false END", parent_type, array_ok)
+    return expr, cond
+
+
+def _operation(doc: _Frag, op: dict) -> tuple[_Frag, _Frag]:
+    """Return `(expression, precondition)` for one JSON Patch operation on `doc`."""
+    kind = op["op"]
+    path = parse_pointer(op["path"])
+    if kind == "add":
+        return _add(doc, path, _value(op["value"]))
+    if kind == "remove":
+        if not path:
+            raise PatchError("Cannot remove the document root")
+        return _sql("({} #- {})", doc, _path(path)), _exists(doc, path)
+    if kind == "replace":
+        if not path:
+            return _value(op["value"]), _TRUE
+        return _sql("jsonb_set({}, {}, {}, false)", doc, _path(path), _value(op["value"])), _exists(doc, path)
+    if kind == "test":
+        return doc, _sql("(({} #> {}) = {})", doc, _path(path), _value(op["value"]))
+    source = parse_pointer(op["from"])
+    moved = _sql("({} #> {})", doc, _path(source))
+    if kind == "copy":
+        expr, cond = _add(doc, path, moved)
+        return expr, _sql("({} AND {})", _exists(doc, source), cond)
+    if kind == "move":
+        if path == source:
+            return doc, _exists(doc, source)
+        if path[: len(source)] == source:
+            raise PatchError("Cannot move a value into one of its children")
+        removed = _sql("({} #- {})", doc, _path(source))
+        expr, cond = _add(removed, path, moved)
+        return expr, _sql("({} AND {})", _exists(doc, source), cond)
+    raise PatchError(f"Unsupported operation: {kind!r}")
+
+
+def _chain(source: str, steps: list[Callable[[_Frag], tuple[_Frag, _Frag]]]) -> tuple[str, list, str]:
+    """Render `steps` as lateral joins starting from the jsonb expression `source`.
+
+    Each step receives the previous document and returns its
+    `(expression, precondition)`. Returns the SQL, its parameters, and the
+    alias of the final step (whose `ok` also requires an object result).
+    """
+    sql = [f"CROSS JOIN LATERAL (SELECT {source} AS doc, true AS ok) s0"]
+    params: list = []
+    for i, step in enumerate(steps, start=1):
+        expr, cond = step(_Frag(f"s{i - 1}.doc", ()))
+        frag = _sql(
+            "CROSS JOIN LATERAL (SELECT CASE WHEN g.ok THEN {} END AS doc, g.ok "
+            f"FROM (SELECT s{i - 1}.ok AND coalesce({{}}, false) AS ok) g) s{i}",
+            expr,
+            cond,
+        )
+        sql.append(frag.sql)
+        params.extend(frag.params)
+    last = f"s{len(steps)}"
+    sql.append(f"CROSS JOIN LATERAL (SELECT {last}.doc, {last}.ok AND coalesce(jsonb_typeof({last}.doc) = 'object', false) AS ok) patched")
+    return "\n".join(sql), params, "patched"
+
+
+def json_patch_chain(source: str, ops: list[dict]) -> tuple[str, list, str]:
+    """Compile RFC 6902 operations (dicts with `op`, `path`, `value`, `from`).
+
+    Raises `PatchError` for patches that can never apply (bad pointers,
+    removing the root, moving a value into itself).
+    """
+    return _chain(source, [lambda doc, op=op: _operation(doc, op) for op in ops])
+
+
+def merge_patch_chain(source: str, patch: dict) -> tuple[str, list, str]:
+    """Compile an RFC 7386 merge patch using `jsonb_merge_patch` (migration 0005)."""
+    return _chain(source, [lambda doc: (_sql("jsonb_merge_patch({}, {})", doc, _value(patch)), _TRUE)])
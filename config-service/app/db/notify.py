@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+"""Change notifications over Postgres LISTEN/NOTIFY.
+
+Writers call `notify_change` inside their transaction; Postgres delivers the
+notification to every listening session when (and only if) the transaction
+commits. Each worker process runs a single `ChangeListener` thread on a
+dedicated connection and fans payloads out to in-process subscribers such as
+the configuration cache.
+"""
+
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable
+
+import psycopg2
+import psycopg2.extensions
+
+from app.db.consistency import parse_lsn
+from app.db.sql import Statement, execute
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "config_service_changes"
+_NOTIFY = Statement("pg_notify_change", "SELECT pg_notify(%s, %s)")
+
+ChangeHandler = Callable[[dict[str, Any]], None]
+ResyncHandler = Callable[[], None]
+PositionHandler = Callable[[int], None]
+
+
+def notify_change(cur, table: str, row: dict) -> None:
+    """Queue a change notification for `row` of `table` in the current transaction."""
+    payload = {"table": table, "id": row["id"]}
+    for key in ("application_id", "version"):
+        if key in row:
+            payload[key] = row[key]
+    execute(cur, _NOTIFY, (CHANNEL, json.dumps(payload)))
+
+
+class ChangeListener:
+    """Background thread that LISTENs on `CHANNEL` and dispatches payloads.
+
+    Subscribers are called on the listener thread and must be quick and
+    thread-safe. Notifications sent while the listener is not connected are
+    lost, so resync handlers are invoked every time LISTEN is (re)established
+    so subscribers can discard state that may have missed a change.
+    """
+
+    def __init__(self, dsn: str, poll_interval: float = 1.0, retry_interval: float = 1.0):
+        """Prepare a listener for `dsn`; call `start()` to begin listening."""
+        self.dsn = dsn
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._handlers: list[ChangeHandler] = []
+        self._resync_handlers: list[ResyncHandler] = []
+        self._position_handlers: list[PositionHandler] = []
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: ChangeHandler) -> None:
+        """Register `handler` to receive each decoded notification payload."""
+        with self._lock:
+            self._handlers.append(handler)
+
+    def on_resync(self, handler: ResyncHandler) -> None:
+        """Register `handler` to run after the listener (re)connects."""
+        with self._lock:
+            self._resync_handlers.append(handler)
+
+    def on_wal_position(self, handler: PositionHandler) -> None:
+        """Register `handler` to receive the primary's WAL position (LSN).
+
+        It is called before each batch of notifications is dispatched and
+        before resync, with a position at or after every change delivered
+        so far.
+        """
+        with self._lock:
+            self._position_handlers.append(handler)
+
+    def start(self) -> None:
+        """Start the listener thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the listener has issued LISTEN; return whether it did."""
+        return self._ready.wait(timeout)
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Signal the thread to exit and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def dispatch(self, payload: dict[str, Any]) -> None:
+        """Deliver `payload` to every subscriber, isolating their failures."""
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("change handler failed for %s", payload)
+
+    def _report_position(self, conn) -> None:
+        with self._lock:
+            handlers = list(self._position_handlers)
+        if not handlers:
+            return
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_current_wal_lsn()::text")
+            lsn = parse_lsn(cur.fetchone()[0])
+        for handler in handlers:
+            try:
+                handler(lsn)
+            except Exception:
+                logger.exception("WAL position handler failed")
+
+    def _resync(self) -> None:
+        with self._lock:
+            handlers = list(self._resync_handlers)
+        for handler in handlers:
+            try:
+                handler()
+            except Exception:
+                logger.exception("resync handler failed")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+                self._report_position(conn)
+                self._resync()
+                self._ready.set()
+                self._listen(conn)
+            except Exception:
+                self._ready.clear()
+                logger.exception("change listener connection failed; retrying")
+                self._stop.wait(self.retry_interval)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _listen(self, conn) -> None:
+        while not self._stop.is_set():
+            if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                continue
+            conn.poll()
+            if conn.notifies:
+                self._report_position(conn)
+            while conn.notifies:
+                note = conn.notifies.pop(0)
+                try:
+                    payload = json.loads(note.payload)
+                except ValueError:
+                    logger.warning("ignoring malformed change payload: %r", note.payload)
+                    continue
+                self.dispatch(payload)
@@ -4,52 +4,378 @@ from __future__ import annotations
 
 Wraps `psycopg2.pool.ThreadedConnectionPool` and provides context managers for
 borrowing connections and cursors with `RealDictCursor` for dict-like rows.
+With `DB_PREPARED_STATEMENTS`, pooled connections are `PreparingConnection`s
+on which `app.db.sql.execute` prepares named statements once per connection.
+Disable it behind transaction-pooling proxies (e.g. PgBouncer in transaction
+mode), where consecutive transactions may land on different server sessions.
+
+With a positive `DB_POOL_TIMEOUT`, a checkout that finds every connection
+in use waits in a first-come, first-served queue (`FifoGate`) for up to that
+many seconds and then raises `PoolTimeout`, instead of failing immediately
+with `PoolError: connection pool exhausted`.
+
+With `DB_REPLICA_HOSTS`, `DBPool` also keeps one pool per read replica and
+routes `readonly` checkouts to them (see `DBPool` and `app.db.consistency`).
+
+Checkout wait, hold time, in-use count, queue depth, timeouts and exhaustion
+are recorded in the process metrics registry (`app.core.metrics.REGISTRY`).
 """
 
+import logging
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from dataclasses import dataclass
-from typing import Iterator
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
 
 import psycopg2
-from psycopg2.pool import ThreadedConnectionPool
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 
+from app.core import timing
 from app.core.config import Settings
+from app.core.metrics import REGISTRY
+from app.db import consistency
+from app.db.consistency import parse_lsn
+
+logger = logging.getLogger(__name__)
+
+_CHECKOUT_WAIT = REGISTRY.histogram(
+    "config_service_db_pool_checkout_seconds", "Time spent waiting to borrow a pooled connection."
+)
+_HOLD = REGISTRY.histogram(
+    "config_service_db_pool_hold_seconds", "Time a borrowed connection was held before being returned."
+)
+_IN_USE = REGISTRY.gauge("config_service_db_pool_in_use", "Connections currently borrowed from the pool.")
+_MAX = REGISTRY.gauge("config_service_db_pool_max", "Configured maximum pool size.")
+_EXHAUSTED = REGISTRY.counter(
+    "config_service_db_pool_exhausted_total", "Checkouts that failed because the pool was exhausted."
+)
+_READS = REGISTRY.counter(
+    "config_service_db_reads_total", "Read-only checkouts by the server that handled them.", ("target",)
+)
+_REPLICA_FALLBACKS = REGISTRY.counter(
+    "config_service_db_replica_fallbacks_total", "Reads sent to the primary because no replica qualified.", ("reason",)
+)
+_REPLICA_UP = REGISTRY.gauge("config_service_db_replica_up", "Whether a replica is considered healthy.", ("replica",))
+
+# A replica reports how far it has replayed; a server that is not in recovery
+# (e.g. a replica entry pointing at the primary) is trivially caught up.
+_REPLAY_LSN = (
+    "SELECT (CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END)::text"
+)
+_CURRENT_LSN = "SELECT pg_current_wal_lsn()::text"
+
+_WAITING = REGISTRY.gauge("config_service_db_pool_waiting", "Checkouts queued for a free connection.")
+_TIMEOUTS = REGISTRY.counter(
+    "config_service_db_pool_timeouts_total", "Queued checkouts that gave up after DB_POOL_TIMEOUT."
+)
+
+
+class PoolTimeout(PoolError):
+    """No pooled connection became free within the checkout timeout."""
+
+
+class FifoGate:
+    """Counting semaphore that grants permits in arrival order.
+
+    `threading.Semaphore` wakes an arbitrary waiter, so under sustained load
+    a request can starve while later arrivals are served. Here each waiter
+    parks on its own event in a queue and `release` hands the permit
+    directly to the oldest one.
+    """
+
+    def __init__(self, permits: int):
+        """Create a gate admitting `permits` holders at once."""
+        self._free = permits
+        self._waiters: deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+
+    def waiting(self) -> int:
+        """Return the number of queued callers."""
+        return len(self._waiters)
+
+    def acquire(self, timeout: float) -> None:
+        """Take a permit, waiting up to `timeout` seconds; raise `PoolTimeout` otherwise."""
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            granted = threading.Event()
+            self._waiters.append(granted)
+        _WAITING.inc()
+        try:
+            if granted.wait(timeout):
+                return
+            with self._lock:
+                if granted.is_set():
+                    # Granted between the timeout and taking the lock.
+                    return
+                self._waiters.remove(granted)
+        finally:
+            _WAITING.dec()
+        _TIMEOUTS.inc()
+        raise PoolTimeout(f"no database connection became free within {timeout:g}s")
+
+    def release(self) -> None:
+        """Return a permit, handing it to the oldest waiter if there is one."""
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+
+def dsn_from_settings(settings: Settings, host: Optional[str] = None, port: Optional[int] = None) -> str:
+    """Build a libpq DSN from `Settings`, optionally for another host (a replica)."""
+    return (
+        f"host={host or settings.DB_HOST} port={port or settings.DB_PORT} dbname={settings.DB_NAME} "
+        f"user={settings.DB_USER} password={settings.DB_PASSWORD}"
+    )
+
+
+def replica_hosts(settings: Settings) -> list[tuple[str, int]]:
+    """Parse `DB_REPLICA_HOSTS` (`host[:port],...`; port defaults to `DB_PORT`)."""
+    hosts = []
+    for entry in settings.DB_REPLICA_HOSTS.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(":") if ":" in entry else (entry, "", "")
+        hosts.append((host, int(port) if port else settings.DB_PORT))
+    return hosts
+
+
+class TimedCursor(RealDictCursor):
+    """`RealDictCursor` that adds statement time to the request's `db` Server-Timing metric."""
+
+    def execute(self, query, vars=None):
+        with timing.timed("db"):
+            return super().execute(query, vars)
+
+    def copy_expert(self, sql, file, size=8192):
+        with timing.timed("db"):
+            return super().copy_expert(sql, file, size)
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers which named statements its session has prepared."""
+
+    def __init__(self, *args, **kwargs):
+        """Open the connection with an empty prepared-statement set."""
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+
+
+class Replica:
+    """A read replica's connection pool and the routing state kept for it."""
+
+    def __init__(self, name: str, pool: ThreadedConnectionPool):
+        """Track `pool` (connections to the replica `name`, e.g. `host:port`)."""
+        self.name = name
+        self.pool = pool
+        self.replay_lsn = 0
+        self.in_use = 0
+        self.healthy = True
+        self.down_until = 0.0
+        _REPLICA_UP.set(1, name)
 
 
 @dataclass
 class DBPool:
-    """Thin wrapper around a threaded connection pool."""
+    """Thin wrapper around a threaded connection pool.
+
+    With a `gate`, checkouts queue for up to `timeout` seconds when all
+    connections are in use; without one they fail fast when exhausted.
+
+    With `replicas`, read-only checkouts go to the healthy replica with the
+    fewest borrowed connections among those that have replayed the WAL up
+    to the session's required LSN and this process' `floor_lsn`, falling
+    back to the primary. A replica that fails to connect is skipped for
+    `replica_retry_seconds`.
+    """
     pool: ThreadedConnectionPool
+    gate: Optional[FifoGate] = None
+    timeout: float = 0.0
+    replicas: list[Replica] = field(default_factory=list)
+    replica_retry_seconds: float = 5.0
+    floor_lsn: int = field(default=0, init=False)
+    _turn: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     @classmethod
     def from_settings(cls, settings: Settings) -> "DBPool":
-        """Create a pool from `Settings`."""
-        dsn = (
-            f"host={settings.DB_HOST} port={settings.DB_PORT} dbname={settings.DB_NAME} "
-            f"user={settings.DB_USER} password={settings.DB_PASSWORD}"
-        )
+        """Create a pool (plus one pool per `DB_REPLICA_HOSTS` entry) from `Settings`."""
+        kwargs = {"connection_factory": PreparingConnection} if settings.DB_PREPARED_STATEMENTS else {}
         pool = ThreadedConnectionPool(
             minconn=settings.DB_POOL_MIN,
             maxconn=settings.DB_POOL_MAX,
-            dsn=dsn,
+            dsn=dsn_from_settings(settings),
+            **kwargs,
         )
-        return cls(pool)
+        _MAX.set(settings.DB_POOL_MAX)
+        replicas = []
+        for host, port in replica_hosts(settings):
+            # minconn=0: an unreachable replica must not prevent startup.
+            replica_pool = ThreadedConnectionPool(
+                minconn=0, maxconn=settings.DB_POOL_MAX, dsn=dsn_from_settings(settings, host, port), **kwargs
+            )
+            replicas.append(Replica(f"{host}:{port}", replica_pool))
+        gate = FifoGate(settings.DB_POOL_MAX) if settings.DB_POOL_TIMEOUT > 0 else None
+        return cls(pool, gate, settings.DB_POOL_TIMEOUT, replicas, settings.DB_REPLICA_RETRY_SECONDS)
+
+    def advance_floor(self, lsn: int) -> None:
+        """Require replica reads in this process to observe at least `lsn`.
+
+        Fed with the primary's WAL position after local writes and after
+        each batch of change notifications, so a cache invalidated by a
+        change is never refilled from a replica that has not replayed it.
+        """
+        with self._lock:
+            if lsn > self.floor_lsn:
+                self.floor_lsn = lsn
 
     @contextmanager
-    def get_conn(self):
-        """Yield a borrowed connection and return it to the pool on exit."""
-        conn = self.pool.getconn()
+    def get_conn(self, readonly: bool = False):
+        """Yield a borrowed connection and return it to the pool on exit.
+
+        `readonly` checkouts may be served by a replica; others always use
+        the primary. Write paths commit through `commit` so their WAL
+        position is recorded.
+        """
+        if readonly and self.replicas:
+            replica, conn = self._borrow_replica()
+            if replica is not None:
+                try:
+                    yield conn
+                finally:
+                    self._return_replica(replica, conn)
+                return
+            _READS.inc("primary")
+        started = time.perf_counter()
+        if self.gate is not None:
+            self.gate.acquire(self.timeout)
+        try:
+            conn = self.pool.getconn()
+        except PoolError as exc:
+            if self.gate is not None:
+                self.gate.release()
+            if "exhausted" in str(exc):
+                _EXHAUSTED.inc()
+            raise
+        borrowed = time.perf_counter()
+        _CHECKOUT_WAIT.observe(borrowed - started)
+        timing.record("db-wait", borrowed - started)
+        _IN_USE.inc()
         try:
             yield conn
         finally:
             self.pool.putconn(conn)
+            if self.gate is not None:
+                self.gate.release()
+            _IN_USE.dec()
+            _HOLD.observe(time.perf_counter() - borrowed)
+
+    def _borrow_replica(self) -> tuple[Optional[Replica], object]:
+        """Return a qualifying replica and a connection to it, or `(None, None)`."""
+        required = max(self.floor_lsn, consistency.required_lsn())
+        now = time.monotonic()
+        with self._lock:
+            self._turn += 1
+            turn = self._turn
+            candidates = [r for r in self.replicas if r.down_until <= now]
+        if candidates:
+            # Rotate so ties on in_use are spread round-robin (the sort is stable).
+            shift = turn % len(candidates)
+            candidates = sorted(candidates[shift:] + candidates[:shift], key=lambda r: r.in_use)
+        reason = "unavailable"
+        for replica in candidates:
+            try:
+                conn = replica.pool.getconn()
+            except PoolError:
+                reason = "busy" if reason == "unavailable" else reason
+                continue
+            except psycopg2.Error:
+                self._mark_down(replica)
+                continue
+            try:
+                if replica.replay_lsn < required:
+                    with conn.cursor() as cur:
+                        cur.execute(_REPLAY_LSN)
+                        replayed = cur.fetchone()[0]
+                    # NULL: a standby that has not replayed anything yet, i.e. lagging.
+                    if replayed is not None:
+                        replica.replay_lsn = max(replica.replay_lsn, parse_lsn(replayed))
+                    # End the probe's transaction so callers can still set up their own.
+                    conn.rollback()
+            except psycopg2.Error:
+                replica.pool.putconn(conn, close=True)
+                self._mark_down(replica)
+                continue
+            if replica.replay_lsn < required:
+                replica.pool.putconn(conn)
+                reason = "lagging"
+                continue
+            with self._lock:
+                replica.in_use += 1
+                if not replica.healthy:
+                    replica.healthy = True
+                    _REPLICA_UP.set(1, replica.name)
+            _READS.inc(replica.name)
+            return replica, conn
+        _REPLICA_FALLBACKS.inc(reason)
+        return None, None
+
+    def _return_replica(self, replica: Replica, conn) -> None:
+        broken = bool(conn.closed)
+        replica.pool.putconn(conn, close=broken)
+        with self._lock:
+            replica.in_use -= 1
+        if broken:
+            self._mark_down(replica)
+
+    def _mark_down(self, replica: Replica) -> None:
+        logger.warning("replica %s unavailable; retrying in %ss", replica.name, self.replica_retry_seconds)
+        with self._lock:
+            replica.healthy = False
+            replica.down_until = time.monotonic() + self.replica_retry_seconds
+        _REPLICA_UP.set(0, replica.name)
+
+    def commit(self, conn, written: bool = True) -> None:
+        """Commit `conn`; with replicas, record the WAL position of a write.
+
+        Repository write paths call this instead of `conn.commit()`, passing
+        `written=False` when nothing changed (e.g. an update of a missing
+        row) so no position is read. The position is read after COMMIT, as
+        only then does it cover the commit record a replica must replay to
+        show the write. Failing to read it is logged and costs only the
+        session's token: the write has already been committed.
+        """
+        conn.commit()
+        if not (self.replicas and written):
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_CURRENT_LSN)
+                lsn = parse_lsn(cur.fetchone()[0])
+            conn.rollback()
+        except psycopg2.Error:
+            logger.warning("could not read the WAL position after a commit; no consistency token", exc_info=True)
+            return
+        self.advance_floor(lsn)
+        consistency.record_write(lsn)
 
     @contextmanager
-    def cursor(self):
-        """Yield `(conn, cur)` with a `RealDictCursor` and rollback on errors."""
-        with self.get_conn() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+    def cursor(self, readonly: bool = False):
+        """Yield `(conn, cur)` with a `RealDictCursor` (timed) and rollback on errors.
+
+        Pass `readonly=True` for statements that only read, so they may be
+        routed to a replica.
+        """
+        with self.get_conn(readonly) as conn:
+            with conn.cursor(cursor_factory=TimedCursor) as cur:
                 try:
                     yield conn, cur
                 except Exception:
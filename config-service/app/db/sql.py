@@ -1,7 +1,118 @@
 from __future__ import annotations
 
-"""SQL helpers (placeholder).
+"""SQL helpers.
 
-In this project we use raw SQL strings. This module exists per the plan and can
-host small helpers in the future (e.g., safe identifier quoting, pagination utilities).
+In this project we use raw SQL strings. This module hosts small helpers shared
+by repositories: named statements that are server-side prepared once per
+connection, and streaming rows into `COPY ... FROM STDIN`.
 """
+
+import re
+from typing import Iterable, Iterator, Optional, Sequence
+
+_PLACEHOLDER = re.compile(r"%s|%%")
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class Statement:
+    """A named SQL statement written with `%s` placeholders.
+
+    On connections that track prepared statements (see
+    `app.db.pool.PreparingConnection`), `execute` sends `PREPARE` the first
+    time the statement is used and `EXECUTE name(...)` afterwards, so
+    Postgres parses and plans it once per connection. Elsewhere the SQL is
+    sent as-is.
+    """
+
+    def __init__(self, name: str, sql: str):
+        """Create a statement; `name` must be a unique SQL identifier."""
+        self.name = name
+        self.sql = sql
+        count = 0
+
+        def number(match: re.Match) -> str:
+            nonlocal count
+            if match.group() == "%%":
+                return "%"
+            count += 1
+            return f"${count}"
+
+        self.prepare_sql = f"PREPARE {name} AS {_PLACEHOLDER.sub(number, sql)}"
+        self.execute_sql = f"EXECUTE {name}({', '.join(['%s'] * count)})" if count else f"EXECUTE {name}"
+
+
+def execute(cur, statement: Statement, params: Sequence = ()) -> None:
+    """Execute `statement` on `cur`, preparing it first if the connection supports it."""
+    prepared = getattr(cur.connection, "prepared", None)
+    if prepared is None:
+        cur.execute(statement.sql, params)
+        return
+    if statement.name not in prepared:
+        # PREPARE is not transactional, so it stays valid even if the
+        # surrounding transaction later rolls back.
+        with cur.connection.cursor() as prep:
+            prep.execute(statement.prepare_sql)
+        prepared.add(statement.name)
+    cur.execute(statement.execute_sql, params)
+
+
+_shapes: dict[str, Statement] = {}
+
+
+def shaped_statement(name: str, columns: Sequence[str], build) -> Statement:
+    """Return the cached statement for one shape of a dynamically built query.
+
+    Partial updates have one SQL shape per set of patched columns. Each shape
+    is named `<name>__<col>_<col>...` and built once by `build(columns)`, so
+    it is prepared once per connection like a fixed statement.
+    """
+    key = f"{name}__{'_'.join(columns)}"
+    statement = _shapes.get(key)
+    if statement is None:
+        statement = _shapes.setdefault(key, Statement(key, build(columns)))
+    return statement
+
+
+def copy_text_value(value: Optional[str]) -> str:
+    """Escape one field for COPY's text format (`\\N` for NULL)."""
+    if value is None:
+        return "\\N"
+    return value.translate(_COPY_ESCAPES)
+
+
+def copy_text_row(values: Iterable[Optional[str]]) -> str:
+    """Encode one tab-separated, newline-terminated COPY text row."""
+    return "\t".join(copy_text_value(v) for v in values) + "\n"
+
+
+class IteratorFile:
+    """Minimal read-only file object over an iterator of strings.
+
+    Lets `cursor.copy_expert` pull rows lazily, so arbitrarily large inputs
+    are streamed to Postgres without being materialized in memory.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        """Wrap `chunks`; they are consumed on demand by `read`."""
+        self._chunks: Iterator[str] = iter(chunks)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        """Return up to `size` characters (all remaining when negative)."""
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            out, self._buffer = self._buffer, ""
+        else:
+            out, self._buffer = self._buffer[:size], self._buffer[size:]
+        return out
+
+    def readline(self) -> str:
+        """Return the next chunk; COPY rows are produced one per chunk."""
+        if self._buffer:
+            out, self._buffer = self._buffer, ""
+            return out
+        return next(self._chunks, "")
@@ -4,16 +4,48 @@ from __future__ import annotations
 
 import logging
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.api import deps
+from app.api.compression import CompressionMiddleware
+from app.api.consistency import HEADER as CONSISTENCY_HEADER
+from app.api.consistency import ConsistencyMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.api.timing import ServerTimingMiddleware
 from app.api.routes.applications import router as applications_router
+from app.api.routes.configurations import by_name_router as configurations_by_name_router
 from app.api.routes.configurations import router as configurations_router
+from app.api.routes.export import router as export_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.snapshot import router as snapshot_router
+from app.core.config import get_settings
+from app.db.pool import PoolTimeout
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release background resources (change listener) on shutdown."""
+    yield
+    deps.shutdown()
+
+
+async def pool_timeout_handler(request: Request, exc: PoolTimeout) -> JSONResponse:
+    """Turn a queued checkout that timed out into a retryable 503."""
+    return JSONResponse(
+        {"detail": "Database connections are busy, retry later"},
+        status_code=503,
+        headers={"Retry-After": str(get_settings().DB_POOL_RETRY_AFTER)},
+    )
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application instance."""
-    app = FastAPI(title="Config Service", version="0.1.0")
+    app = FastAPI(title="Config Service", version="0.1.0", lifespan=lifespan)
+    app.add_exception_handler(PoolTimeout, pool_timeout_handler)
 
     # CORS configuration via env var CORS_ORIGINS (comma-separated)
     # Examples:
@@ -29,11 +61,27 @@ def create_app() -> FastAPI:
         allow_origins=origins,
         allow_credentials=allow_credentials,
         allow_methods=["*"],
-        allow_headers=["*"]
+        allow_headers=["*"],
+        expose_headers=["ETag", "Server-Timing", CONSISTENCY_HEADER],
     )
 
+    settings = get_settings()
+    if settings.DB_REPLICA_HOSTS:
+        app.add_middleware(ConsistencyMiddleware)
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+    if settings.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+    if settings.METRICS_ENABLED:
+        # Added last so it is outermost and the latency includes compression.
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
     app.include_router(applications_router, prefix="/api/v1")
     app.include_router(configurations_router, prefix="/api/v1")
+    app.include_router(configurations_by_name_router, prefix="/api/v1")
+    app.include_router(export_router, prefix="/api/v1")
+    app.include_router(snapshot_router, prefix="/api/v1")
 
     return app
 
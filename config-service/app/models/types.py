@@ -2,9 +2,33 @@ from __future__ import annotations
 
 """Pydantic models for API requests and responses."""
 
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+def _reject_nul(value: str | None) -> str | None:
+    """Reject NUL characters, which Postgres cannot store in text or JSONB."""
+    if value is not None and "\x00" in value:
+        raise ValueError("must not contain NUL characters")
+    return value
+
+
+def _reject_nul_in_document(doc: Any) -> Any:
+    """Reject NUL in any key or string value of a JSON document (JSONB rejects `\\u0000`)."""
+    stack = [doc]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            _reject_nul(node)
+        elif isinstance(node, dict):
+            for key, value in node.items():
+                _reject_nul(key)
+                stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return doc
 
 
 class AppBase(BaseModel):
@@ -24,6 +48,8 @@ class ApplicationCreate(AppBase):
     def coerce_id(cls, v):
         return str(v)
 
+    _no_nul = field_validator("id", "name", "comments")(_reject_nul)
+
 
 class ApplicationUpdate(BaseModel):
     """Partial update payload for an application."""
@@ -31,6 +57,8 @@ class ApplicationUpdate(BaseModel):
     name: str | None = Field(default=None, max_length=256)
     comments: str | None = Field(default=None, max_length=1024)
 
+    _no_nul = field_validator("name", "comments")(_reject_nul)
+
 
 class ApplicationOut(AppBase):
     """Application response model with related configuration ids."""
@@ -58,6 +86,9 @@ class ConfigurationCreate(ConfigBase):
     def coerce_ulid(cls, v):
         return str(v)
 
+    _no_nul = field_validator("id", "application_id", "name", "comments")(_reject_nul)
+    _no_nul_in_config = field_validator("config")(_reject_nul_in_document)
+
 
 class ConfigurationUpdate(BaseModel):
     """Partial update payload for a configuration."""
@@ -66,9 +97,164 @@ class ConfigurationUpdate(BaseModel):
     comments: str | None = Field(default=None, max_length=1024)
     config: Dict[str, Any] | None = None
 
+    _no_nul = field_validator("name", "comments")(_reject_nul)
+    _no_nul_in_config = field_validator("config")(_reject_nul_in_document)
+
+
+class JsonPatchOperation(BaseModel):
+    """One RFC 6902 JSON Patch operation; paths are RFC 6901 JSON Pointers."""
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: str | None = Field(default=None, alias="from")
+
+    @field_validator("path", "from_")
+    @classmethod
+    def validate_pointer(cls, v: str | None) -> str | None:
+        """Require JSON Pointer syntax (empty or starting with `/`)."""
+        if v is not None and v != "" and not v.startswith("/"):
+            raise ValueError("must be a JSON Pointer ('' or starting with '/')")
+        return v
+
+    @model_validator(mode="after")
+    def validate_operands(self) -> "JsonPatchOperation":
+        """Require `value` or `from` where the operation needs it."""
+        if self.op in ("add", "replace", "test") and "value" not in self.model_fields_set:
+            raise ValueError(f"'{self.op}' requires 'value'")
+        if self.op in ("move", "copy") and self.from_ is None:
+            raise ValueError(f"'{self.op}' requires 'from'")
+        return self
+
 
 class ConfigurationOut(ConfigBase):
     """Configuration response model."""
 
     id: str
     application_id: str
+    version: int
+
+
+class ConfigurationProjection(BaseModel):
+    """Selected subtrees of a configuration's `config`, keyed by requested path."""
+
+    id: str
+    application_id: str
+    name: str
+    version: int
+    values: Dict[str, Any]
+
+
+class ResolvedLayer(BaseModel):
+    """One input of a resolved configuration, pinned to the version merged."""
+
+    id: str
+    name: str
+    version: int
+
+
+class ResolvedConfiguration(BaseModel):
+    """Effective configuration produced by deep-merging layers in order."""
+
+    application_id: str
+    layers: list[ResolvedLayer]
+    config: Dict[str, Any]
+
+
+class ConfigurationRevisionSummary(BaseModel):
+    """Metadata of one stored revision (revision numbers equal row versions)."""
+
+    revision: int
+    checkpoint: bool
+    created_at: datetime
+
+
+class ConfigurationRevisionPage(BaseModel):
+    """A page of revisions, newest first; pass `next_before` to fetch the next page."""
+
+    revisions: list[ConfigurationRevisionSummary]
+    next_before: int | None = None
+
+
+class ConfigurationRevision(BaseModel):
+    """The `config` document as of a given revision."""
+
+    id: str
+    revision: int
+    created_at: datetime
+    config: Dict[str, Any]
+
+
+class ConfigurationBatchGet(BaseModel):
+    """Payload for fetching many configurations by id."""
+
+    ids: list[str] = Field(min_length=1, max_length=1000)
+
+
+class ConfigurationBatchOut(BaseModel):
+    """Found configurations (in request order) plus ids that do not exist."""
+
+    configurations: list[ConfigurationOut]
+    missing_ids: list[str]
+
+
+class BulkImportError(BaseModel):
+    """A rejected line of a bulk import."""
+
+    line: int
+    id: str | None = None
+    error: str
+
+
+class BulkImportReport(BaseModel):
+    """Outcome of a bulk configuration import."""
+
+    inserted: int
+    updated: int
+    errors: list[BulkImportError]
+
+
+class ImportCounts(BaseModel):
+    """Rows inserted and updated by an import."""
+
+    inserted: int
+    updated: int
+
+
+class ImportReport(BaseModel):
+    """Outcome of importing an export (applications and configurations)."""
+
+    applications: ImportCounts
+    configurations: ImportCounts
+    errors: list[BulkImportError]
+
+
+class SnapshotApplication(AppBase):
+    """An application as carried in a snapshot bundle."""
+
+    id: str
+
+
+class SnapshotConfiguration(ConfigBase):
+    """A configuration as carried in a snapshot bundle."""
+
+    id: str
+    application_id: str
+    version: int
+
+
+class SnapshotDeleted(BaseModel):
+    """Ids deleted since a bundle's `since`."""
+
+    applications: list[str]
+    configurations: list[str]
+
+
+class SnapshotBundle(BaseModel):
+    """Every row (`since` null) or the rows changed since `since`; poll again from watermark `seq`."""
+
+    seq: int
+    since: int | None
+    applications: list[SnapshotApplication]
+    configurations: list[SnapshotConfiguration]
+    deleted: SnapshotDeleted
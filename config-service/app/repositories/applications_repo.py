@@ -4,7 +4,68 @@ from __future__ import annotations
 
 from typing import Optional
 
+from app.db.notify import notify_change
 from app.db.pool import DBPool
+from app.db.sql import Statement, execute, shaped_statement
+
+_CONFIGURATION_IDS = "ARRAY(SELECT c.id FROM configurations c WHERE c.application_id = a.id ORDER BY c.name) AS configuration_ids"
+
+_INSERT = Statement(
+    "applications_insert",
+    "INSERT INTO applications (id, name, comments) VALUES (%s, %s, %s) RETURNING id, name, comments",
+)
+_GET = Statement("applications_get", "SELECT id, name, comments FROM applications WHERE id = %s")
+_LIST = Statement("applications_list", "SELECT id, name, comments FROM applications ORDER BY name")
+_CONFIGURATION_IDS_BY_APP = Statement(
+    "applications_configuration_ids",
+    "SELECT id FROM configurations WHERE application_id = %s ORDER BY name",
+)
+_GET_WITH_IDS = Statement(
+    "applications_get_with_ids",
+    f"SELECT a.id, a.name, a.comments, {_CONFIGURATION_IDS} FROM applications a WHERE a.id = %s",
+)
+_LIST_WITH_IDS = Statement(
+    "applications_list_with_ids",
+    """
+    SELECT a.id, a.name, a.comments,
+           COALESCE(array_agg(c.id ORDER BY c.name) FILTER (WHERE c.id IS NOT NULL), '{}') AS configuration_ids
+    FROM applications a
+    LEFT JOIN configurations c ON c.application_id = a.id
+    GROUP BY a.id
+    ORDER BY a.name
+    """,
+)
+
+
+def _set_clause(name: Optional[str], comments: Optional[str]) -> tuple[tuple[str, ...], list]:
+    """Return the patched column names and their values for a partial application update."""
+    columns = []
+    vals = []
+    if name is not None:
+        columns.append("name")
+        vals.append(name)
+    if comments is not None:
+        columns.append("comments")
+        vals.append(comments)
+    return tuple(columns), vals
+
+
+def _sets(columns: tuple[str, ...]) -> str:
+    return ", ".join(f"{c} = %s" for c in columns)
+
+
+def _update(columns: tuple[str, ...]) -> str:
+    return f"UPDATE applications SET {_sets(columns)} WHERE id = %s RETURNING id, name, comments"
+
+
+def _update_with_ids(columns: tuple[str, ...]) -> str:
+    return f"""
+        WITH a AS (
+            UPDATE applications SET {_sets(columns)} WHERE id = %s RETURNING id, name, comments
+        )
+        SELECT a.id, a.name, a.comments, {_CONFIGURATION_IDS}
+        FROM a
+    """
 
 
 class ApplicationsRepo:
@@ -17,49 +78,68 @@ class ApplicationsRepo:
     def create(self, id: str, name: str, comments: Optional[str]) -> dict:
         """Insert a new application and return the persisted row."""
         with self.db.cursor() as (conn, cur):
-            cur.execute(
-                "INSERT INTO applications (id, name, comments) VALUES (%s, %s, %s) RETURNING id, name, comments",
-                (id, name, comments),
-            )
+            execute(cur, _INSERT, (id, name, comments))
             row = cur.fetchone()
-            conn.commit()
+            notify_change(cur, "applications", row)
+            self.db.commit(conn)
             return dict(row)
 
     def update(self, id: str, name: Optional[str], comments: Optional[str]) -> Optional[dict]:
         """Patch fields on an application and return the updated row if found."""
-        sets = []
-        vals = []
-        if name is not None:
-            sets.append("name = %s")
-            vals.append(name)
-        if comments is not None:
-            sets.append("comments = %s")
-            vals.append(comments)
-        if not sets:
+        columns, vals = _set_clause(name, comments)
+        if not columns:
             return self.get(id)
         vals.append(id)
-        sql = f"UPDATE applications SET {', '.join(sets)} WHERE id = %s RETURNING id, name, comments"
         with self.db.cursor() as (conn, cur):
-            cur.execute(sql, vals)
+            execute(cur, shaped_statement("applications_update", columns, _update), vals)
             row = cur.fetchone()
-            conn.commit()
+            if row:
+                notify_change(cur, "applications", row)
+            self.db.commit(conn, written=row is not None)
+            return dict(row) if row else None
+
+    def update_with_configuration_ids(self, id: str, name: Optional[str], comments: Optional[str]) -> Optional[dict]:
+        """Patch fields and return the updated row with its configuration ids in one statement."""
+        columns, vals = _set_clause(name, comments)
+        if not columns:
+            return self.get_with_configuration_ids(id)
+        vals.append(id)
+        with self.db.cursor() as (conn, cur):
+            execute(cur, shaped_statement("applications_update_with_ids", columns, _update_with_ids), vals)
+            row = cur.fetchone()
+            if row:
+                notify_change(cur, "applications", row)
+            self.db.commit(conn, written=row is not None)
             return dict(row) if row else None
 
     def get(self, id: str) -> Optional[dict]:
         """Return an application by id, or `None` if missing."""
-        with self.db.cursor() as (conn, cur):
-            cur.execute("SELECT id, name, comments FROM applications WHERE id = %s", (id,))
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET, (id,))
             row = cur.fetchone()
             return dict(row) if row else None
 
     def list(self) -> list[dict]:
         """List applications ordered by name."""
-        with self.db.cursor() as (conn, cur):
-            cur.execute("SELECT id, name, comments FROM applications ORDER BY name")
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _LIST)
             return [dict(r) for r in cur.fetchall()]
 
     def get_configuration_ids(self, app_id: str) -> list[str]:
         """List configuration ids for a given application id ordered by name."""
-        with self.db.cursor() as (conn, cur):
-            cur.execute("SELECT id FROM configurations WHERE application_id = %s ORDER BY name", (app_id,))
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _CONFIGURATION_IDS_BY_APP, (app_id,))
             return [r["id"] for r in cur.fetchall()]
+
+    def get_with_configuration_ids(self, id: str) -> Optional[dict]:
+        """Return an application with its configuration ids (ordered by name) in one query."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_WITH_IDS, (id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def list_with_configuration_ids(self) -> list[dict]:
+        """List applications ordered by name, each with its configuration ids, in one query."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _LIST_WITH_IDS)
+            return [dict(r) for r in cur.fetchall()]
@@ -2,11 +2,183 @@ from __future__ import annotations
 
 """Raw SQL repository for `configurations` table."""
 
-from typing import Optional
+import json
+from typing import Iterable, Optional
 
+from app.db.jsonpatch import json_patch_chain, merge_patch_chain
+from app.db.notify import CHANNEL, notify_change
 from app.db.pool import DBPool
+from app.db.sql import IteratorFile, Statement, copy_text_row, execute, shaped_statement
 from psycopg2.extras import Json
 
+_COLUMNS = "id, application_id, name, comments, config, version"
+
+_INSERT = Statement(
+    "configurations_insert",
+    f"""
+    INSERT INTO configurations (id, application_id, name, comments, config)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING {_COLUMNS}
+    """,
+)
+_GET = Statement("configurations_get", f"SELECT {_COLUMNS} FROM configurations WHERE id = %s")
+_GET_RAW = Statement(
+    "configurations_get_raw",
+    "SELECT id, application_id, name, comments, version, config::text AS config_text FROM configurations WHERE id = %s",
+)
+_GET_MANY = Statement("configurations_get_many", f"SELECT {_COLUMNS} FROM configurations WHERE id = ANY(%s)")
+_GET_LAYERS = Statement(
+    "configurations_get_layers",
+    f"SELECT {_COLUMNS} FROM configurations WHERE application_id = %s AND name = ANY(%s)",
+)
+_GET_BY_NAMES = Statement(
+    "configurations_get_by_names",
+    """
+    SELECT c.id, c.application_id, c.name, c.comments, c.config, c.version
+    FROM applications a
+    JOIN configurations c ON c.application_id = a.id AND c.name = %s
+    WHERE a.name = %s
+    """,
+)
+_GET_VERSION = Statement("configurations_get_version", "SELECT version FROM configurations WHERE id = %s")
+
+
+def _update(columns: tuple[str, ...]) -> str:
+    sets = ", ".join([f"{c} = %s" for c in columns] + ["version = version + 1"])
+    return f"UPDATE configurations SET {sets} WHERE id = %s RETURNING {_COLUMNS}"
+
+
+# Staging table for bulk imports; dropped automatically at commit.
+_IMPORT_STAGING = """
+    CREATE TEMP TABLE configurations_import (
+      line_no INTEGER NOT NULL,
+      id TEXT NOT NULL,
+      application_id TEXT NOT NULL,
+      name TEXT NOT NULL,
+      comments TEXT,
+      config JSONB NOT NULL,
+      error TEXT
+    ) ON COMMIT DROP
+"""
+
+# Reject staged rows that would violate a constraint, so a single bad row
+# cannot abort the whole batch. Rows are first checked against existing
+# data; duplicates are then resolved among the remaining rows, where the
+# first occurrence in the input wins.
+_IMPORT_CLASSIFY_EXISTING = """
+    UPDATE configurations_import s SET error = CASE
+        WHEN NOT EXISTS (SELECT 1 FROM applications a WHERE a.id = s.application_id)
+          THEN 'application_id does not exist'
+        WHEN EXISTS (SELECT 1 FROM configurations c WHERE c.id = s.id AND c.application_id <> s.application_id)
+          THEN 'id already exists for another application'
+        ELSE 'Configuration name must be unique per application'
+      END
+    WHERE NOT EXISTS (SELECT 1 FROM applications a WHERE a.id = s.application_id)
+       OR EXISTS (SELECT 1 FROM configurations c WHERE c.id = s.id AND c.application_id <> s.application_id)
+       OR EXISTS (SELECT 1 FROM configurations n
+                  WHERE n.application_id = s.application_id AND n.name = s.name AND n.id <> s.id)
+"""
+
+_IMPORT_CLASSIFY_DUPLICATES = """
+    UPDATE configurations_import s SET error = v.error
+    FROM (
+      SELECT line_no,
+             CASE
+               WHEN line_no <> min(line_no) OVER (PARTITION BY id) THEN 'duplicate id in batch'
+               WHEN line_no <> min(line_no) OVER (PARTITION BY application_id, name)
+                 THEN 'duplicate configuration name for application in batch'
+             END AS error
+      FROM configurations_import
+      WHERE error IS NULL
+    ) v
+    WHERE s.line_no = v.line_no AND v.error IS NOT NULL
+"""
+
+# Applications staged alongside a configuration import (see `bulk_upsert`),
+# classified the same way: against existing rows, then within the batch.
+_APP_IMPORT_STAGING = """
+    CREATE TEMP TABLE applications_import (
+      line_no INTEGER NOT NULL,
+      id TEXT NOT NULL,
+      name TEXT NOT NULL,
+      comments TEXT,
+      error TEXT
+    ) ON COMMIT DROP
+"""
+
+_APP_IMPORT_CLASSIFY_EXISTING = """
+    UPDATE applications_import s SET error = 'Application name must be unique'
+    WHERE EXISTS (SELECT 1 FROM applications a WHERE a.name = s.name AND a.id <> s.id)
+"""
+
+_APP_IMPORT_CLASSIFY_DUPLICATES = """
+    UPDATE applications_import s SET error = v.error
+    FROM (
+      SELECT line_no,
+             CASE
+               WHEN line_no <> min(line_no) OVER (PARTITION BY id) THEN 'duplicate id in batch'
+               WHEN line_no <> min(line_no) OVER (PARTITION BY name) THEN 'duplicate application name in batch'
+             END AS error
+      FROM applications_import
+      WHERE error IS NULL
+    ) v
+    WHERE s.line_no = v.line_no AND v.error IS NOT NULL
+"""
+
+_APP_IMPORT_UPSERT = """
+    WITH up AS (
+      INSERT INTO applications (id, name, comments)
+      SELECT id, name, comments FROM applications_import WHERE error IS NULL
+      ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, comments = EXCLUDED.comments
+      RETURNING id, (xmax = 0) AS inserted
+    ), notified AS (
+      SELECT pg_notify(%s, json_build_object('table', 'applications', 'id', id)::text) FROM up
+    )
+    SELECT (SELECT count(*) FROM up WHERE inserted) AS inserted,
+           (SELECT count(*) FROM up WHERE NOT inserted) AS updated,
+           (SELECT count(*) FROM notified) AS notified
+"""
+
+# Apply a compiled patch chain (see app/db/jsonpatch.py) to one locked row.
+# The row is only written when every precondition holds and the document
+# actually changed; the outer SELECT reports which of those happened.
+_PATCH = """
+    WITH p AS (
+      SELECT c.id, c.application_id, c.name, c.comments, c.version, c.config AS old, {alias}.doc, {alias}.ok
+      FROM configurations c
+      {chain}
+      WHERE c.id = %s
+      FOR UPDATE OF c
+    ), u AS (
+      UPDATE configurations t SET config = p.doc, version = t.version + 1
+      FROM p
+      WHERE t.id = p.id AND p.ok AND p.doc IS DISTINCT FROM p.old
+      RETURNING t.id, t.version
+    )
+    SELECT p.ok AS applied, p.id, p.application_id, p.name, p.comments,
+           coalesce(p.doc, p.old) AS config, coalesce(u.version, p.version) AS version,
+           u.id IS NOT NULL AS changed
+    FROM p LEFT JOIN u ON u.id = p.id
+"""
+
+_IMPORT_UPSERT = """
+    WITH up AS (
+      INSERT INTO configurations (id, application_id, name, comments, config)
+      SELECT id, application_id, name, comments, config FROM configurations_import WHERE error IS NULL
+      ON CONFLICT (id) DO UPDATE
+        SET name = EXCLUDED.name, comments = EXCLUDED.comments, config = EXCLUDED.config,
+            version = configurations.version + 1
+      RETURNING id, application_id, version, (xmax = 0) AS inserted
+    ), notified AS (
+      SELECT pg_notify(%s, json_build_object('table', 'configurations', 'id', id,
+                                             'application_id', application_id, 'version', version)::text)
+      FROM up
+    )
+    SELECT (SELECT count(*) FROM up WHERE inserted) AS inserted,
+           (SELECT count(*) FROM up WHERE NOT inserted) AS updated,
+           (SELECT count(*) FROM notified) AS notified
+"""
+
 
 class ConfigurationsRepo:
     """Encapsulates CRUD operations for configurations."""
@@ -18,47 +190,209 @@ class ConfigurationsRepo:
     def create(self, id: str, application_id: str, name: str, comments: Optional[str], config: dict) -> dict:
         """Insert a new configuration row and return it."""
         with self.db.cursor() as (conn, cur):
-            cur.execute(
-                """
-                INSERT INTO configurations (id, application_id, name, comments, config)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id, application_id, name, comments, config
-                """,
-                (id, application_id, name, comments, Json(config)),
-            )
+            execute(cur, _INSERT, (id, application_id, name, comments, Json(config)))
             row = cur.fetchone()
-            conn.commit()
+            notify_change(cur, "configurations", row)
+            self.db.commit(conn)
             return dict(row)
 
     def update(self, id: str, name: Optional[str], comments: Optional[str], config: Optional[dict]) -> Optional[dict]:
         """Patch fields on a configuration and return the updated row if found."""
-        sets = []
+        columns = []
         vals = []
         if name is not None:
-            sets.append("name = %s")
+            columns.append("name")
             vals.append(name)
         if comments is not None:
-            sets.append("comments = %s")
+            columns.append("comments")
             vals.append(comments)
         if config is not None:
-            sets.append("config = %s")
+            columns.append("config")
             vals.append(Json(config))
-        if not sets:
+        if not columns:
             return self.get(id)
         vals.append(id)
-        sql = f"UPDATE configurations SET {', '.join(sets)} WHERE id = %s RETURNING id, application_id, name, comments, config"
         with self.db.cursor() as (conn, cur):
-            cur.execute(sql, vals)
+            execute(cur, shaped_statement("configurations_update", tuple(columns), _update), vals)
+            row = cur.fetchone()
+            if row:
+                notify_change(cur, "configurations", row)
+            self.db.commit(conn, written=row is not None)
+            return dict(row) if row else None
+
+    def json_patch(self, id: str, ops: list[dict]) -> Optional[dict]:
+        """Apply RFC 6902 operations to `config` in a single statement.
+
+        Returns `None` if the configuration is missing; otherwise the row plus
+        `applied` (False when a `test` or path precondition failed, in which
+        case nothing was written).
+        """
+        return self._patch(id, *json_patch_chain("c.config", ops))
+
+    def merge_patch(self, id: str, patch: dict) -> Optional[dict]:
+        """Apply an RFC 7386 merge patch to `config` in a single statement; see `json_patch`."""
+        return self._patch(id, *merge_patch_chain("c.config", patch))
+
+    def _patch(self, id: str, chain: str, params: list, alias: str) -> Optional[dict]:
+        with self.db.cursor() as (conn, cur):
+            cur.execute(_PATCH.format(chain=chain, alias=alias), (*params, id))
             row = cur.fetchone()
-            conn.commit()
+            changed = bool(row and row["changed"])
+            if changed:
+                notify_change(cur, "configurations", row)
+            self.db.commit(conn, written=changed)
             return dict(row) if row else None
 
     def get(self, id: str) -> Optional[dict]:
         """Return a configuration by id, or `None` if missing."""
-        with self.db.cursor() as (conn, cur):
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET, (id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def get_raw(self, id: str) -> Optional[dict]:
+        """Return a configuration with `config` as its stored JSON text (`config_text`), unparsed."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_RAW, (id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+    def get_projection(self, id: str, paths: list[list[str]]) -> Optional[dict]:
+        """Return identity columns plus `config #> path` for each path, or `None` if missing.
+
+        Only the extracted subtrees leave the server; missing paths yield `None`.
+        The result carries the values in request order under `values`.
+        """
+        columns = ", ".join(f"config #> %s::text[] AS p{i}" for i in range(len(paths)))
+        with self.db.cursor(readonly=True) as (conn, cur):
             cur.execute(
-                "SELECT id, application_id, name, comments, config FROM configurations WHERE id = %s",
-                (id,),
+                f"SELECT id, application_id, name, version, {columns} FROM configurations WHERE id = %s",
+                (*paths, id),
             )
             row = cur.fetchone()
+            if not row:
+                return None
+            out = {k: row[k] for k in ("id", "application_id", "name", "version")}
+            out["values"] = [row[f"p{i}"] for i in range(len(paths))]
+            return out
+
+    def bulk_upsert(
+        self,
+        records: Iterable[tuple[int, str, str, str, Optional[str], dict]],
+        applications: Optional[Iterable[tuple[int, str, str, Optional[str]]]] = None,
+    ) -> dict:
+        """Upsert many configurations in one transaction via COPY into a staging table.
+
+        `records` are `(line_no, id, application_id, name, comments, config)`
+        tuples and are streamed to the server lazily. Rows that would violate
+        a constraint are skipped and reported; the rest are inserted or
+        updated (by id). Returns `{"inserted", "updated", "errors"}` where
+        `errors` lists `{"line", "id", "error"}`.
+
+        `applications`, if given, are `(line_no, id, name, comments)` tuples
+        upserted (by id) in the same transaction before the configurations
+        are checked; they are only read once `records` is exhausted, so the
+        producer of `records` may fill them as it goes. Their counts are
+        returned under `"applications"` and their errors are merged in.
+        """
+        rows = (
+            copy_text_row((str(line_no), id, application_id, name, comments, json.dumps(config)))
+            for line_no, id, application_id, name, comments, config in records
+        )
+        errors = []
+        with self.db.cursor() as (conn, cur):
+            cur.execute(_IMPORT_STAGING)
+            cur.copy_expert(
+                "COPY configurations_import (line_no, id, application_id, name, comments, config) FROM STDIN",
+                IteratorFile(rows),
+            )
+            if applications is not None:
+                cur.execute(_APP_IMPORT_STAGING)
+                cur.copy_expert(
+                    "COPY applications_import (line_no, id, name, comments) FROM STDIN",
+                    IteratorFile(copy_text_row((str(line_no), *rest)) for line_no, *rest in applications),
+                )
+                cur.execute(_APP_IMPORT_CLASSIFY_EXISTING)
+                cur.execute(_APP_IMPORT_CLASSIFY_DUPLICATES)
+                cur.execute("SELECT line_no, id, error FROM applications_import WHERE error IS NOT NULL")
+                errors.extend({"line": r["line_no"], "id": r["id"], "error": r["error"]} for r in cur.fetchall())
+                cur.execute(_APP_IMPORT_UPSERT, (CHANNEL,))
+                app_counts = cur.fetchone()
+            cur.execute(_IMPORT_CLASSIFY_EXISTING)
+            cur.execute(_IMPORT_CLASSIFY_DUPLICATES)
+            cur.execute("SELECT line_no, id, error FROM configurations_import WHERE error IS NOT NULL")
+            errors.extend({"line": r["line_no"], "id": r["id"], "error": r["error"]} for r in cur.fetchall())
+            cur.execute(_IMPORT_UPSERT, (CHANNEL,))
+            counts = cur.fetchone()
+            self.db.commit(conn)
+        result = {"inserted": counts["inserted"], "updated": counts["updated"], "errors": sorted(errors, key=lambda e: e["line"])}
+        if applications is not None:
+            result["applications"] = {"inserted": app_counts["inserted"], "updated": app_counts["updated"]}
+        return result
+
+    def get_many(self, ids: list[str]) -> list[dict]:
+        """Return every existing configuration among `ids` in a single query (unordered)."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_MANY, (list(ids),))
+            return [dict(r) for r in cur.fetchall()]
+
+    def get_layers(self, application_id: str, names: list[str]) -> list[dict]:
+        """Return the configurations of an application named in `names` (unordered)."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_LAYERS, (application_id, list(names)))
+            return [dict(r) for r in cur.fetchall()]
+
+    def get_by_names(self, application_name: str, name: str) -> Optional[dict]:
+        """Return a configuration addressed by application name and configuration name.
+
+        A single join served by the unique indexes on `applications.name` and
+        `(configurations.application_id, configurations.name)`.
+        """
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_BY_NAMES, (name, application_name))
+            row = cur.fetchone()
             return dict(row) if row else None
+
+    def list_revisions(self, id: str, before: Optional[int], limit: int) -> list[dict]:
+        """Return revision metadata for a configuration, newest first, below `before` if given."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            cur.execute(
+                "SELECT revision, depth = 0 AS checkpoint, created_at FROM configuration_revisions "
+                "WHERE configuration_id = %s AND (%s::bigint IS NULL OR revision < %s) "
+                "ORDER BY revision DESC LIMIT %s",
+                (id, before, before, limit),
+            )
+            return [dict(r) for r in cur.fetchall()]
+
+    def get_revision_chain(self, id: str, revision: int) -> list[dict]:
+        """Return the rows needed to rebuild `revision`: its checkpoint and every diff up to it.
+
+        Rows are in ascending revision order, the first being a checkpoint.
+        The chain is never longer than the checkpoint interval.
+        """
+        with self.db.cursor(readonly=True) as (conn, cur):
+            cur.execute(
+                """
+                SELECT r.revision, r.depth, r.body, r.created_at
+                FROM configuration_revisions r
+                WHERE r.configuration_id = %(id)s
+                  AND r.revision <= %(revision)s
+                  AND r.revision >= (
+                    SELECT max(c.revision) FROM configuration_revisions c
+                    WHERE c.configuration_id = %(id)s AND c.revision <= %(revision)s AND c.depth = 0
+                  )
+                ORDER BY r.revision
+                """,
+                {"id": id, "revision": revision},
+            )
+            return [dict(r) for r in cur.fetchall()]
+
+    def get_version(self, id: str) -> Optional[int]:
+        """Return only the current version of a configuration, or `None` if missing.
+
+        Does not touch the (possibly TOASTed) `config` column.
+        """
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _GET_VERSION, (id,))
+            row = cur.fetchone()
+            return row["version"] if row else None
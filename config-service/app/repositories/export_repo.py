@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+"""Raw SQL repository for whole-dataset exports."""
+
+from typing import Iterator
+
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ  # type: ignore
+
+from app.db.pool import DBPool
+
+# Rows are rendered to JSON text by Postgres, so each fetched row is already
+# an output line and the `config` documents are never parsed in Python.
+# Applications come first so an import can resolve `application_id`.
+_EXPORT_QUERIES = (
+    (
+        "export_applications",
+        """
+        SELECT json_build_object('type', 'application', 'id', id, 'name', name, 'comments', comments)::text
+        FROM applications ORDER BY id
+        """,
+    ),
+    (
+        "export_configurations",
+        """
+        SELECT json_build_object('type', 'configuration', 'id', id, 'application_id', application_id,
+                                 'name', name, 'comments', comments, 'version', version, 'config', config)::text
+        FROM configurations ORDER BY id
+        """,
+    ),
+)
+
+
+class ExportRepo:
+    """Streams every application and configuration from one snapshot."""
+
+    def __init__(self, db: DBPool):
+        """Create a repository bound to a `DBPool`."""
+        self.db = db
+
+    def stream(self, itersize: int) -> Iterator[list[str]]:
+        """Yield batches of up to `itersize` NDJSON lines (without newlines).
+
+        Both tables are read through named (server-side) cursors inside one
+        REPEATABLE READ READ ONLY transaction: the export is a consistent
+        snapshot and memory stays flat regardless of table size. The pooled
+        connection is held until the generator is exhausted or closed.
+        """
+        with self.db.get_conn(readonly=True) as conn:
+            # Set on the session rather than with SET TRANSACTION, which fails
+            # if the pool already used the connection in a transaction; it is
+            # reset before the connection goes back to the pool.
+            conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+            try:
+                for name, query in _EXPORT_QUERIES:
+                    with conn.cursor(name=name) as cur:
+                        cur.itersize = itersize
+                        cur.execute(query)
+                        while rows := cur.fetchmany(itersize):
+                            yield [r[0] for r in rows]
+            finally:
+                if not conn.closed:
+                    conn.rollback()
+                    conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+"""Raw SQL repository for MVCC-watermarked snapshots and deltas."""
+
+from typing import Iterator, Optional
+
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ  # type: ignore
+
+from app.db.pool import DBPool
+from app.db.sql import Statement, execute
+
+_CURRENT_SNAPSHOT = Statement("snapshot_current", "SELECT pg_current_snapshot()::text AS snapshot")
+
+# Run first in the bundle's transaction, so the watermark describes the same
+# snapshot as the rows (see migration 0006). `seq` is the snapshot's xmin,
+# or `since` if that is newer (a lagging replica must not move a client
+# backwards). `since` is honoured only above the floor and below the
+# snapshot's xmax; otherwise (NULL, a truncate or a bypassing bulk load
+# since, or a watermark from another database) the bundle is a full
+# snapshot and `since` is null.
+_HEADER = Statement(
+    "snapshot_header",
+    """
+    WITH k AS (
+      SELECT s::text AS snapshot, pg_snapshot_xmin(s)::text::bigint AS xmin,
+             CASE WHEN %s::bigint > f.floor AND %s::bigint <= pg_snapshot_xmax(s)::text::bigint THEN %s::bigint END AS since
+      FROM change_floor f, pg_current_snapshot() s
+    )
+    SELECT snapshot, greatest(xmin, since) AS seq, since FROM k
+    """,
+)
+
+# Bundle sections in output order, each rendered to JSON text per row by
+# Postgres so documents are never parsed in Python. A null `since` selects
+# every row and no tombstones.
+_SECTIONS = (
+    (
+        "applications",
+        """
+        SELECT json_build_object('id', id, 'name', name, 'comments', comments)::text
+        FROM applications WHERE change_xid >= coalesce(%s, 0) ORDER BY id
+        """,
+    ),
+    (
+        "configurations",
+        """
+        SELECT json_build_object('id', id, 'application_id', application_id, 'name', name,
+                                 'comments', comments, 'version', version, 'config', config)::text
+        FROM configurations WHERE change_xid >= coalesce(%s, 0) ORDER BY id
+        """,
+    ),
+    (
+        "deleted_applications",
+        "SELECT to_json(id)::text FROM change_tombstones WHERE kind = 'applications' AND change_xid >= %s ORDER BY id",
+    ),
+    (
+        "deleted_configurations",
+        "SELECT to_json(id)::text FROM change_tombstones WHERE kind = 'configurations' AND change_xid >= %s ORDER BY id",
+    ),
+)
+
+
+class SnapshotRepo:
+    """Reads the current MVCC snapshot and the rows changed since a watermark."""
+
+    def __init__(self, db: DBPool):
+        """Create a repository bound to a `DBPool`."""
+        self.db = db
+
+    def current_snapshot(self) -> str:
+        """Return the text of the current Postgres snapshot (`xmin:xmax:xip`)."""
+        with self.db.cursor(readonly=True) as (conn, cur):
+            execute(cur, _CURRENT_SNAPSHOT)
+            return cur.fetchone()["snapshot"]
+
+    def stream(self, since: Optional[int], itersize: int) -> Iterator:
+        """Yield a bundle header, then its rows section by section.
+
+        The first item is `{"snapshot", "seq", "since"}` (see `_HEADER`);
+        `snapshot` identifies exactly which writes the bundle contains. Then
+        come `(section, lines)` batches of up to `itersize` JSON texts for
+        each of `_SECTIONS` in order, each section ending with a short
+        (possibly empty) batch. Everything is read through named cursors in
+        one REPEATABLE READ READ ONLY transaction, like `ExportRepo.stream`;
+        the pooled connection is held until the generator is exhausted or
+        closed.
+        """
+        with self.db.get_conn(readonly=True) as conn:
+            conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+            try:
+                with conn.cursor() as cur:
+                    execute(cur, _HEADER, (since, since, since))
+                    snapshot, seq, since = cur.fetchone()
+                yield {"snapshot": snapshot, "seq": seq, "since": since}
+                for section, query in _SECTIONS:
+                    with conn.cursor(name=f"snapshot_{section}") as cur:
+                        cur.itersize = itersize
+                        cur.execute(query, (since,))
+                        while True:
+                            rows = cur.fetchmany(itersize)
+                            yield section, [r[0] for r in rows]
+                            if len(rows) < itersize:
+                                break
+            finally:
+                if not conn.closed:
+                    conn.rollback()
+                    conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
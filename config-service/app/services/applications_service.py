@@ -11,6 +11,8 @@ from typing import Optional
 from fastapi import HTTPException, status
 from psycopg2 import errorcodes
 
+from app.core import timing
+from app.core.cache import LRUCache
 from app.db.pool import DBPool
 from app.models.types import ApplicationCreate, ApplicationOut, ApplicationUpdate
 from app.repositories.applications_repo import ApplicationsRepo
@@ -19,9 +21,16 @@ from app.repositories.applications_repo import ApplicationsRepo
 class ApplicationsService:
     """Service orchestrating CRUD for applications."""
 
-    def __init__(self, db: DBPool):
-        """Initialize with a connection pool-backed repository."""
+    def __init__(self, db: DBPool, names: LRUCache | None = None):
+        """Initialize with a connection pool-backed repository.
+
+        `names` is the `(application name, configuration name) -> id` cache,
+        cleared on renames so this process sees them before the change
+        notification arrives.
+        """
         self.repo = ApplicationsRepo(db)
+        self.names = names
+        self._out = timing.timed_factory("model", ApplicationOut)
 
     def create(self, data: ApplicationCreate) -> ApplicationOut:
         """Create a new application or raise 409 on duplicate name."""
@@ -31,31 +40,31 @@ class ApplicationsService:
             if getattr(e, "pgcode", None) == errorcodes.UNIQUE_VIOLATION:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Application name must be unique")
             raise
-        conf_ids = self.repo.get_configuration_ids(row["id"])  # empty
-        return ApplicationOut(id=row["id"], name=row["name"], comments=row["comments"], configuration_ids=conf_ids)
+        # A freshly inserted application cannot have configurations yet.
+        return ApplicationOut(id=row["id"], name=row["name"], comments=row["comments"], configuration_ids=[])
 
     def update(self, id: str, data: ApplicationUpdate) -> ApplicationOut:
         """Update an application; raises 404 if not found, 409 on conflict."""
         try:
-            row = self.repo.update(id, data.name, data.comments)
+            row = self.repo.update_with_configuration_ids(id, data.name, data.comments)
         except Exception as e:
             if getattr(e, "pgcode", None) == errorcodes.UNIQUE_VIOLATION:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Application name must be unique")
             raise
         if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
-        conf_ids = self.repo.get_configuration_ids(row["id"])  # could have values
-        return ApplicationOut(id=row["id"], name=row["name"], comments=row["comments"], configuration_ids=conf_ids)
+        if data.name is not None and self.names is not None:
+            self.names.clear()
+        return ApplicationOut(**row)
 
     def get(self, id: str) -> ApplicationOut:
         """Fetch an application by id or raise 404."""
-        row = self.repo.get(id)
+        row = self.repo.get_with_configuration_ids(id)
         if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
-        conf_ids = self.repo.get_configuration_ids(row["id"])  # could have values
-        return ApplicationOut(id=row["id"], name=row["name"], comments=row["comments"], configuration_ids=conf_ids)
+        return self._out(**row)
 
     def list(self) -> list[ApplicationOut]:
         """List applications with their related configuration ids."""
-        rows = self.repo.list()
-        return [ApplicationOut(id=r["id"], name=r["name"], comments=r["comments"], configuration_ids=self.repo.get_configuration_ids(r["id"])) for r in rows]
+        rows = self.repo.list_with_configuration_ids()
+        return [self._out(**r) for r in rows]
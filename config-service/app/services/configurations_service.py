@@ -6,20 +6,61 @@ Validates and translates low-level database errors into HTTP-friendly
 responses and returns typed response models.
 """
 
+import json
+import re
+from typing import Iterable, Iterator
+
 from fastapi import HTTPException, status
 from psycopg2 import errorcodes
+from pydantic import ValidationError
 
+from app.core import timing
+from app.core.cache import LRUCache
+from app.core.jsondiff import apply_diff
+from app.core.merge import deep_merge
+from app.db.jsonpatch import PatchError
 from app.db.pool import DBPool
-from app.models.types import ConfigurationCreate, ConfigurationOut, ConfigurationUpdate
+from app.models.types import (
+    BulkImportError,
+    BulkImportReport,
+    ConfigurationBatchOut,
+    ConfigurationCreate,
+    ConfigurationOut,
+    ConfigurationProjection,
+    ConfigurationRevision,
+    ConfigurationRevisionPage,
+    ConfigurationRevisionSummary,
+    ConfigurationUpdate,
+    JsonPatchOperation,
+    ResolvedConfiguration,
+    ResolvedLayer,
+)
 from app.repositories.configurations_repo import ConfigurationsRepo
 
 
 class ConfigurationsService:
     """Service orchestrating CRUD for configurations."""
 
-    def __init__(self, db: DBPool):
-        """Initialize with a connection pool-backed repository."""
+    def __init__(
+        self,
+        db: DBPool,
+        cache: LRUCache | None = None,
+        names: LRUCache | None = None,
+        resolved: LRUCache | None = None,
+        trusted_rows: bool = False,
+    ):
+        """Initialize with a repository and optional row, name->id and resolution caches.
+
+        `resolved` maps an application id to `{layers: ResolvedConfiguration}`
+        so that a change to any of its configurations drops every memoized
+        resolution for that application at once. With `trusted_rows`, read
+        paths build models from database rows without validation.
+        """
         self.repo = ConfigurationsRepo(db)
+        self.cache = cache
+        self.names = names
+        self.resolved = resolved
+        self._out = timing.timed_factory("model", ConfigurationOut.model_construct if trusted_rows else ConfigurationOut)
 
     def create(self, data: ConfigurationCreate) -> ConfigurationOut:
         """Create a configuration; 409 on name conflict, 400 on bad app id."""
@@ -32,6 +73,7 @@ class ConfigurationsService:
             if code == errorcodes.FOREIGN_KEY_VIOLATION:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="application_id does not exist")
             raise
+        self._invalidate(row["id"], row["application_id"])
         return ConfigurationOut(**row)
 
     def update(self, id: str, data: ConfigurationUpdate) -> ConfigurationOut:
@@ -45,11 +87,284 @@ class ConfigurationsService:
             raise
         if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        self._invalidate(row["id"], row["application_id"])
         return ConfigurationOut(**row)
 
-    def get(self, id: str) -> ConfigurationOut:
-        """Fetch a configuration by id or raise 404."""
-        row = self.repo.get(id)
+    def json_patch(self, id: str, ops: list[JsonPatchOperation]) -> ConfigurationOut:
+        """Apply a JSON Patch in the database; 404 if missing, 409 if it does not apply, 422 if malformed."""
+        try:
+            row = self.repo.json_patch(id, [op.model_dump(by_alias=True) for op in ops])
+        except PatchError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        return self._patched(row)
+
+    def merge_patch(self, id: str, patch: dict) -> ConfigurationOut:
+        """Apply a JSON Merge Patch in the database; 404 if missing."""
+        return self._patched(self.repo.merge_patch(id, patch))
+
+    def _patched(self, row: dict | None) -> ConfigurationOut:
         if not row:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        if not row["applied"]:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Patch cannot be applied to the current document")
+        if row["changed"]:
+            self._invalidate(row["id"], row["application_id"])
         return ConfigurationOut(**row)
+
+    def get(self, id: str) -> ConfigurationOut:
+        """Fetch a configuration by id (served from cache when warm) or raise 404."""
+        out = self.find(id)
+        if out is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        return out
+
+    def find(self, id: str) -> ConfigurationOut | None:
+        """Fetch a configuration by id (served from cache when warm) or return `None`."""
+        row = self._get_row(id)
+        return self._out(**row) if row else None
+
+    def get_projection(self, id: str, paths: list[str]) -> ConfigurationProjection:
+        """Fetch only the `config` subtrees at dotted `paths` or raise 404.
+
+        A warm cache entry is projected in process; otherwise Postgres
+        extracts the subtrees with `#>` so the full document is never sent.
+        """
+        split = [path.split(".") for path in paths]
+        row = self.cache.get(id) if self.cache is not None else None
+        if row is not None:
+            values = [_extract(row["config"], segments) for segments in split]
+        else:
+            row = self.repo.get_projection(id, split)
+            if not row:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+            values = row["values"]
+        return ConfigurationProjection(
+            id=row["id"],
+            application_id=row["application_id"],
+            name=row["name"],
+            version=row["version"],
+            values=dict(zip(paths, values)),
+        )
+
+    def get_raw(self, id: str) -> dict:
+        """Fetch a configuration with `config` as raw JSON bytes (`config_json`) or raise 404.
+
+        The document is never parsed; rows are cached under `("raw", id)`
+        and invalidated together with the parsed entry.
+        """
+        key = ("raw", id)
+        row = self.cache.get(key) if self.cache is not None else None
+        if row is not None:
+            return row
+        generation = self.cache.generation() if self.cache is not None else None
+        row = self.repo.get_raw(id)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        row["config_json"] = row.pop("config_text").encode()
+        if self.cache is not None:
+            self.cache.put(key, row, len(row["config_json"]) + 256, generation)
+        return row
+
+    def get_by_names(self, application_name: str, name: str) -> ConfigurationOut:
+        """Fetch a configuration by application name and configuration name or raise 404.
+
+        A cached name->id mapping is only trusted if the cached row still
+        carries that name, so configuration renames fall back to the join;
+        application renames clear the name cache locally (`ApplicationsService`)
+        and in other processes via change notifications.
+        """
+        key = (application_name, name)
+        if self.names is not None:
+            hit = self.names.get(key)
+            if hit is not None:
+                id, application_id = hit
+                row = self._get_row(id)
+                if row and row["name"] == name and row["application_id"] == application_id:
+                    return self._out(**row)
+        generation = self.cache.generation() if self.cache is not None else None
+        names_generation = self.names.generation() if self.names is not None else None
+        row = self.repo.get_by_names(application_name, name)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        if self.cache is not None:
+            self.cache.put(row["id"], row, _row_size(row), generation)
+        if self.names is not None:
+            self.names.put(key, (row["id"], row["application_id"]), len(application_name) + len(name), names_generation)
+        return self._out(**row)
+
+    def resolve(self, application_id: str, layers: list[str]) -> ResolvedConfiguration:
+        """Deep-merge the named configurations of an application, later layers winning.
+
+        Results are memoized per application and dropped whenever any of its
+        configurations changes; 404 if any layer does not exist.
+        """
+        key = tuple(layers)
+        memo = self.resolved.get(application_id) if self.resolved is not None else None
+        if memo is not None and key in memo:
+            return memo[key]
+        generation = self.resolved.generation() if self.resolved is not None else None
+        rows = {row["name"]: row for row in self.repo.get_layers(application_id, layers)}
+        missing = [name for name in layers if name not in rows]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Configuration layers not found: {', '.join(missing)}"
+            )
+        config: dict = {}
+        for name in layers:
+            config = deep_merge(config, rows[name]["config"])
+        out = ResolvedConfiguration(
+            application_id=application_id,
+            layers=[ResolvedLayer(id=rows[n]["id"], name=n, version=rows[n]["version"]) for n in layers],
+            config=config,
+        )
+        if self.resolved is not None:
+            memo = dict(self.resolved.get(application_id) or {})
+            memo[key] = out
+            size = sum(_row_size({"config": r.config}) for r in memo.values())
+            self.resolved.put(application_id, memo, size, generation)
+        return out
+
+    def batch_get(self, ids: list[str]) -> ConfigurationBatchOut:
+        """Fetch many configurations: cache hits first, then one query for the rest.
+
+        Duplicate ids are collapsed; results keep the order of first appearance.
+        """
+        wanted = list(dict.fromkeys(ids))
+        rows: dict[str, dict] = {}
+        misses = wanted
+        if self.cache is not None:
+            misses = []
+            for id in wanted:
+                row = self.cache.get(id)
+                if row is None:
+                    misses.append(id)
+                else:
+                    rows[id] = row
+        if misses:
+            generation = self.cache.generation() if self.cache is not None else None
+            for row in self.repo.get_many(misses):
+                rows[row["id"]] = row
+                if self.cache is not None:
+                    self.cache.put(row["id"], row, _row_size(row), generation)
+        return ConfigurationBatchOut(
+            configurations=[self._out(**rows[id]) for id in wanted if id in rows],
+            missing_ids=[id for id in wanted if id not in rows],
+        )
+
+    def bulk_import(self, lines: Iterable[bytes | str]) -> BulkImportReport:
+        """Upsert configurations from NDJSON lines in a single transaction.
+
+        Each non-blank line is validated like a `POST /configurations` body.
+        Invalid lines and rows that would violate a constraint are reported
+        per line instead of aborting the batch.
+        """
+        invalid: list[BulkImportError] = []
+
+        def records() -> Iterator[tuple]:
+            for line_no, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = ConfigurationCreate.model_validate_json(line)
+                except ValidationError as e:
+                    err = e.errors()[0]
+                    where = ".".join(str(p) for p in err["loc"])
+                    invalid.append(BulkImportError(line=line_no, error=f"{where}: {err['msg']}" if where else err["msg"]))
+                    continue
+                yield line_no, data.id, data.application_id, data.name, data.comments, data.config
+
+        try:
+            result = self.repo.bulk_upsert(records())
+        except Exception as e:
+            code = getattr(e, "pgcode", None)
+            if code == errorcodes.UNIQUE_VIOLATION:  # lost a race with a concurrent writer
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Configuration name must be unique per application")
+            if code == errorcodes.DEADLOCK_DETECTED:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Import conflicts with a concurrent write")
+            raise
+        for cache in (self.cache, self.resolved):
+            if cache is not None:
+                cache.clear()
+        errors = sorted(invalid + [BulkImportError(**e) for e in result["errors"]], key=lambda e: e.line)
+        return BulkImportReport(inserted=result["inserted"], updated=result["updated"], errors=errors)
+
+    def list_revisions(self, id: str, before: int | None = None, limit: int = 50) -> ConfigurationRevisionPage:
+        """Page through a configuration's revisions, newest first; 404 if it does not exist."""
+        rows = self.repo.list_revisions(id, before, limit + 1)
+        if not rows and self.get_version(id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Configuration not found")
+        page = [ConfigurationRevisionSummary(**r) for r in rows[:limit]]
+        next_before = page[-1].revision if len(rows) > limit else None
+        return ConfigurationRevisionPage(revisions=page, next_before=next_before)
+
+    def get_revision(self, id: str, revision: int) -> ConfigurationRevision:
+        """Rebuild the document as of `revision` from its checkpoint and diffs, or raise 404."""
+        chain = self.repo.get_revision_chain(id, revision)
+        if not chain or chain[-1]["revision"] != revision:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revision not found")
+        config = chain[0]["body"]
+        for row in chain[1:]:
+            config = apply_diff(config, row["body"])
+        return ConfigurationRevision(id=id, revision=revision, created_at=chain[-1]["created_at"], config=config)
+
+    def get_version(self, id: str) -> int | None:
+        """Return the current version of a configuration without loading its document.
+
+        Served from the cache when warm; otherwise reads only the version column.
+        """
+        if self.cache is not None:
+            row = self.cache.get(id)
+            if row is not None:
+                return row["version"]
+        return self.repo.get_version(id)
+
+    def _get_row(self, id: str) -> dict | None:
+        """Read-through lookup: cache first, then the repository."""
+        if self.cache is None:
+            return self.repo.get(id)
+        row = self.cache.get(id)
+        if row is not None:
+            return row
+        generation = self.cache.generation()
+        row = self.repo.get(id)
+        if row:
+            self.cache.put(id, row, _row_size(row), generation)
+        return row
+
+    def _invalidate(self, id: str, application_id: str) -> None:
+        """Drop locally cached state for a row right away; other workers follow via NOTIFY."""
+        if self.cache is not None:
+            self.cache.invalidate(id)
+            self.cache.invalidate(("raw", id))
+        if self.resolved is not None:
+            self.resolved.invalidate(application_id)
+
+
+# What Postgres `#>` accepts as an array index (C `strtol`): optional leading
+# whitespace and sign, then ASCII digits only. Python's `int()` also takes
+# underscores, trailing whitespace and non-ASCII digits.
+_ARRAY_INDEX = re.compile(r"[ \t\n\v\f\r]*[+-]?[0-9]+")
+
+
+def _extract(doc, segments: list[str]):
+    """Mirror Postgres `#>`: walk object keys and (possibly negative) array indexes."""
+    for seg in segments:
+        if isinstance(doc, dict):
+            doc = doc.get(seg)
+        elif isinstance(doc, list):
+            if not _ARRAY_INDEX.fullmatch(seg):
+                return None
+            i = int(seg)
+            if not -len(doc) <= i < len(doc):
+                return None
+            doc = doc[i]
+        else:
+            return None
+        if doc is None:
+            return None
+    return doc
+
+
+def _row_size(row: dict) -> int:
+    """Approximate the in-memory footprint of a cached row by its JSON length."""
+    return len(json.dumps(row, separators=(",", ":"), default=str))
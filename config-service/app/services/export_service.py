@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+"""Business logic for whole-dataset export and import.
+
+The export format is NDJSON with one type-tagged object per line:
+`{"type": "application", ...}` lines (id, name, comments) followed by
+`{"type": "configuration", ...}` lines (id, application_id, name, comments,
+version, config). Import accepts the same format; `version` is informational
+since imported rows are versioned by the target database.
+"""
+
+from typing import Annotated, Iterable, Iterator, Literal, Union
+
+from fastapi import HTTPException, status
+from psycopg2 import errorcodes
+from pydantic import Field, TypeAdapter, ValidationError
+
+from app.core.cache import LRUCache
+from app.db.pool import DBPool
+from app.models.types import ApplicationCreate, BulkImportError, ConfigurationCreate, ImportCounts, ImportReport
+from app.repositories.configurations_repo import ConfigurationsRepo
+from app.repositories.export_repo import ExportRepo
+
+
+class _ApplicationLine(ApplicationCreate):
+    type: Literal["application"]
+
+
+class _ConfigurationLine(ConfigurationCreate):
+    type: Literal["configuration"]
+    version: int | None = None
+
+
+# A concurrent write can still make the upsert fail as a whole.
+_RACES = (errorcodes.UNIQUE_VIOLATION, errorcodes.DEADLOCK_DETECTED)
+
+# Parsed straight from bytes by pydantic, which keeps integers of any size
+# exact (JSONB can hold them).
+_LINE = TypeAdapter(Annotated[Union[_ApplicationLine, _ConfigurationLine], Field(discriminator="type")])
+
+
+class ExportService:
+    """Service streaming exports and applying imports."""
+
+    def __init__(
+        self,
+        db: DBPool,
+        cache: LRUCache | None = None,
+        resolved: LRUCache | None = None,
+        itersize: int = 2000,
+    ):
+        """Initialize with repositories, the caches an import must clear and the export batch size."""
+        self.repo = ExportRepo(db)
+        self.configurations = ConfigurationsRepo(db)
+        self.cache = cache
+        self.resolved = resolved
+        self.itersize = itersize
+
+    def export(self) -> Iterator[bytes]:
+        """Yield the NDJSON export in chunks of up to `itersize` lines."""
+        for lines in self.repo.stream(self.itersize):
+            yield ("\n".join(lines) + "\n").encode()
+
+    def import_lines(self, lines: Iterable[bytes | str]) -> ImportReport:
+        """Upsert an NDJSON export in a single transaction.
+
+        Lines are validated like `POST /applications` and
+        `POST /configurations` bodies according to their `type`; invalid
+        lines and rows that would violate a constraint are reported per
+        line instead of aborting the import.
+        """
+        invalid: list[BulkImportError] = []
+        applications: list[tuple] = []
+
+        def records() -> Iterator[tuple]:
+            for line_no, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = _LINE.validate_json(line)
+                except ValidationError as e:
+                    err = e.errors()[0]
+                    where = ".".join(str(p) for p in err["loc"])
+                    invalid.append(BulkImportError(line=line_no, error=f"{where}: {err['msg']}" if where else err["msg"]))
+                    continue
+                if data.type == "application":
+                    applications.append((line_no, data.id, data.name, data.comments))
+                else:
+                    yield line_no, data.id, data.application_id, data.name, data.comments, data.config
+
+        try:
+            result = self.configurations.bulk_upsert(records(), applications=applications)
+        except Exception as e:
+            if getattr(e, "pgcode", None) in _RACES:  # lost a race with a concurrent writer
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Import conflicts with a concurrent write")
+            raise
+        for cache in (self.cache, self.resolved):
+            if cache is not None:
+                cache.clear()
+        errors = sorted(invalid + [BulkImportError(**e) for e in result["errors"]], key=lambda e: e.line)
+        return ImportReport(
+            applications=ImportCounts(**result["applications"]),
+            configurations=ImportCounts(inserted=result["inserted"], updated=result["updated"]),
+            errors=errors,
+        )
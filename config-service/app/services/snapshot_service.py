@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+"""Business logic for snapshot bundles and incremental deltas.
+
+A client mirrors the dataset by fetching `GET /snapshot` once and then
+`GET /snapshot?since=SEQ` with the `seq` of its last bundle: it deletes the
+ids under `deleted` and upserts the rows, then remembers the new `seq`. A
+bundle whose `since` is null is a full snapshot and replaces the mirror.
+Deltas may repeat changes the client already has; applying them is
+idempotent.
+
+Bundles are rendered row by row into temporary files rather than memory,
+so their size is bounded by `max_bytes` (507 beyond it), not by Postgres'
+1 GB value limit or the process heap.
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import closing
+from typing import IO, Iterator
+
+import orjson
+from fastapi import HTTPException, status
+
+from app.core import timing
+from app.core.cache import LRUCache
+from app.core.compression import compressor
+from app.db.pool import DBPool
+from app.repositories.snapshot_repo import SnapshotRepo
+
+# Serializes full-bundle builds so concurrent cache misses for one snapshot
+# build it once; the others wait and are served from the cache.
+_build_lock = threading.Lock()
+
+_CHUNK_SIZE = 1024 * 1024
+
+# JSON between sections, keyed by the section it opens.
+_OPEN = {
+    "applications": b',"applications":[',
+    "configurations": b'],"configurations":[',
+    "deleted_applications": b'],"deleted":{"applications":[',
+    "deleted_configurations": b'],"configurations":[',
+}
+_CLOSE = b"]}}"
+
+
+class Bundle:
+    """A rendered bundle spooled to an anonymous temporary file.
+
+    Cached bundles are read by concurrent responses with `os.pread`, so no
+    file offset is shared. The file is removed once the bundle is evicted
+    and the last response reading it has finished.
+    """
+
+    def __init__(self, file: IO[bytes], size: int, encoding: str | None = None):
+        """Wrap a spooled file of `size` bytes, compressed with `encoding` if set."""
+        self.file = file
+        self.size = size
+        self.encoding = encoding
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield the body in chunks of up to 1 MiB."""
+        offset = 0
+        while offset < self.size:
+            chunk = os.pread(self.file.fileno(), min(_CHUNK_SIZE, self.size - offset), offset)
+            offset += len(chunk)
+            yield chunk
+
+    def compressed(self, encoding: str) -> Bundle:
+        """Return a copy compressed with the streaming compressor for `encoding`."""
+        file = tempfile.TemporaryFile()
+        c = compressor(encoding)
+        with timing.timed("compress"):
+            for chunk in self.chunks():
+                file.write(c.compress(chunk))
+            file.write(c.flush())
+        file.flush()
+        return Bundle(file, file.tell(), encoding)
+
+
+class _Spool:
+    """Writes bundle text to a temporary file, refusing to grow past `max_bytes`."""
+
+    def __init__(self, max_bytes: int):
+        self.file = tempfile.TemporaryFile()
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+                detail=f"Snapshot exceeds {self.max_bytes} bytes; use GET /export",
+            )
+        self.file.write(data)
+
+    def finish(self) -> Bundle:
+        self.file.flush()
+        return Bundle(self.file, self.size)
+
+
+class SnapshotService:
+    """Service building full snapshot bundles (cached per snapshot) and deltas."""
+
+    def __init__(self, db: DBPool, cache: LRUCache | None = None, itersize: int = 2000, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        """Initialize with a repository, an optional cache of full bundles, the fetch batch size and the bundle size cap."""
+        self.repo = SnapshotRepo(db)
+        self.cache = cache
+        self.itersize = itersize
+        self.max_bytes = max_bytes
+
+    def current_snapshot(self) -> str:
+        """Return the text of the current Postgres snapshot, which keys full bundles."""
+        return self.repo.current_snapshot()
+
+    def snapshot(self, snapshot: str | None = None) -> tuple[str, Bundle]:
+        """Return `(snapshot, bundle)` of the full bundle, built at most once per snapshot.
+
+        Pass the snapshot already read by the caller to save a round trip.
+        The returned snapshot may be newer if a write landed in between.
+        """
+        if snapshot is None:
+            snapshot = self.repo.current_snapshot()
+        if self.cache is None:
+            return self._build(None)
+        cached = self.cache.get(("snapshot", snapshot))
+        if cached is not None:
+            return snapshot, cached
+        with _build_lock:
+            cached = self.cache.get(("snapshot", snapshot))
+            if cached is not None:
+                return snapshot, cached
+            return self._build(None)
+
+    def encoded(self, snapshot: str, bundle: Bundle, encoding: str) -> Bundle:
+        """Return the full `bundle` of `snapshot` compressed with `encoding`, compressed once per snapshot."""
+        if self.cache is None:
+            return bundle.compressed(encoding)
+        key = ("encoded", snapshot, encoding)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with _build_lock:
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = bundle.compressed(encoding)
+                self.cache.put(key, cached, cached.size)
+            return cached
+
+    def delta(self, since: int) -> Bundle:
+        """Return the bundle of changes since the watermark `since`.
+
+        Falls back to a full bundle (with `since` null) when `since` is at or
+        below the change floor or is not a watermark of this database.
+        """
+        return self._build(since)[1]
+
+    def _build(self, since: int | None) -> tuple[str, Bundle]:
+        spool = _Spool(self.max_bytes)
+        try:
+            with closing(self.repo.stream(since, self.itersize)) as rows:
+                header = next(rows)
+                spool.write(b'{"seq":%d,"since":%s' % (header["seq"], orjson.dumps(header["since"])))
+                section = None
+                for name, lines in rows:
+                    if name != section:
+                        spool.write(_OPEN[name])
+                        section, separator = name, b""
+                    if lines:
+                        spool.write(separator + ",".join(lines).encode())
+                        separator = b","
+                spool.write(_CLOSE)
+        except BaseException:
+            spool.file.close()
+            raise
+        bundle = spool.finish()
+        if self.cache is not None and header["since"] is None:
+            self.cache.put(("snapshot", header["snapshot"]), bundle, bundle.size)
+        return header["snapshot"], bundle
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+"""Bulk configuration import CLI.
+
+Reads NDJSON (one `ConfigurationCreate` object per line) from a file or
+stdin and upserts it in a single transaction using the same COPY-based
+path as `POST /api/v1/configurations:bulkImport`. Prints the JSON report.
+With `--from-export` the input is a `GET /api/v1/export` dump (type-tagged
+applications and configurations), imported like `POST /api/v1/import`.
+
+Exit status is 0 when every line was imported and 2 when some were rejected.
+"""
+
+import argparse
+import sys
+
+from app.core.config import get_settings
+from app.db.pool import DBPool
+from app.services.configurations_service import ConfigurationsService
+from app.services.export_service import ExportService
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entrypoint; parse args and import the given NDJSON source."""
+    parser = argparse.ArgumentParser(description="Bulk import configurations from NDJSON")
+    parser.add_argument("path", help="NDJSON file to import, or '-' for stdin")
+    parser.add_argument(
+        "--from-export", action="store_true", help="input is a GET /api/v1/export dump of applications and configurations"
+    )
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    db = DBPool.from_settings(settings)
+    try:
+        run = ExportService(db).import_lines if args.from_export else ConfigurationsService(db).bulk_import
+        if args.path == "-":
+            report = run(sys.stdin.buffer)
+        else:
+            with open(args.path, "rb") as f:
+                report = run(f)
+    finally:
+        db.pool.closeall()
+    print(report.model_dump_json(indent=2))
+    return 2 if report.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,3 @@
+-- Monotonic per-row version for configurations, bumped on every update.
+-- Used for ETags / conditional GETs and change watching.
+ALTER TABLE configurations ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
@@ -0,0 +1,81 @@
+-- Revision history for configurations, one row per version.
+-- Revisions are delta-encoded: every 32nd revision of a configuration (and
+-- its first) is a checkpoint holding the full document (depth = 0); the rest
+-- hold a diff against the previous revision (depth = distance from the last
+-- checkpoint). Reconstructing any revision reads at most 32 rows.
+--
+-- Diff format (applied recursively, see app/core/jsondiff.py):
+--   {"s": {key: value}, "d": [key, ...], "o": {key: <diff>}}
+-- "s" sets keys, "d" deletes keys, "o" descends into keys whose old and new
+-- values are both objects. Empty sections are omitted; an unchanged document
+-- diffs to {}.
+CREATE TABLE IF NOT EXISTS configuration_revisions (
+  configuration_id TEXT NOT NULL REFERENCES configurations(id) ON DELETE CASCADE,
+  revision BIGINT NOT NULL,
+  depth SMALLINT NOT NULL,
+  body JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (configuration_id, revision)
+);
+
+CREATE OR REPLACE FUNCTION config_jsonb_diff(old_doc JSONB, new_doc JSONB) RETURNS JSONB
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+  k TEXT;
+  v JSONB;
+  ov JSONB;
+  sets JSONB := '{}';
+  dels JSONB;
+  subs JSONB := '{}';
+  out JSONB := '{}';
+BEGIN
+  FOR k, v IN SELECT key, value FROM jsonb_each(new_doc) LOOP
+    ov := old_doc -> k;
+    IF ov IS NOT NULL AND ov = v THEN
+      CONTINUE;
+    ELSIF jsonb_typeof(ov) = 'object' AND jsonb_typeof(v) = 'object' THEN
+      subs := subs || jsonb_build_object(k, config_jsonb_diff(ov, v));
+    ELSE
+      sets := sets || jsonb_build_object(k, v);
+    END IF;
+  END LOOP;
+  SELECT jsonb_agg(key) INTO dels FROM jsonb_object_keys(old_doc) AS t(key) WHERE NOT new_doc ? key;
+  IF sets <> '{}' THEN out := out || jsonb_build_object('s', sets); END IF;
+  IF dels IS NOT NULL THEN out := out || jsonb_build_object('d', dels); END IF;
+  IF subs <> '{}' THEN out := out || jsonb_build_object('o', subs); END IF;
+  RETURN out;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION configurations_record_revision() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  prev_depth SMALLINT;
+BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    IF NEW.version = OLD.version THEN
+      RETURN NULL;
+    END IF;
+    SELECT depth INTO prev_depth FROM configuration_revisions
+      WHERE configuration_id = NEW.id ORDER BY revision DESC LIMIT 1;
+  END IF;
+  IF prev_depth IS NULL OR prev_depth + 1 >= 32 THEN
+    INSERT INTO configuration_revisions (configuration_id, revision, depth, body)
+      VALUES (NEW.id, NEW.version, 0, NEW.config);
+  ELSE
+    INSERT INTO configuration_revisions (configuration_id, revision, depth, body)
+      VALUES (NEW.id, NEW.version, prev_depth + 1, config_jsonb_diff(OLD.config, NEW.config));
+  END IF;
+  RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS configurations_record_revision ON configurations;
+CREATE TRIGGER configurations_record_revision
+  AFTER INSERT OR UPDATE ON configurations
+  FOR EACH ROW EXECUTE FUNCTION configurations_record_revision();
+
+-- Existing configurations start their history with a checkpoint.
+INSERT INTO configuration_revisions (configuration_id, revision, depth, body)
+SELECT id, version, 0, config FROM configurations
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,23 @@
+-- RFC 7386 JSON Merge Patch, used by PATCH /configurations/{id} so merge
+-- patches are applied in the database in a single UPDATE.
+CREATE OR REPLACE FUNCTION jsonb_merge_patch(target JSONB, patch JSONB) RETURNS JSONB
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+  k TEXT;
+  v JSONB;
+  out JSONB;
+BEGIN
+  IF jsonb_typeof(patch) IS DISTINCT FROM 'object' THEN
+    RETURN patch;
+  END IF;
+  out := CASE WHEN jsonb_typeof(target) = 'object' THEN target ELSE '{}'::jsonb END;
+  FOR k, v IN SELECT key, value FROM jsonb_each(patch) LOOP
+    IF jsonb_typeof(v) = 'null' THEN
+      out := out - k;
+    ELSE
+      out := out || jsonb_build_object(k, jsonb_merge_patch(out -> k, v));
+    END IF;
+  END LOOP;
+  RETURN out;
+END
+$$;
@@ -0,0 +1,88 @@
+-- Change tracking for snapshot deltas (GET /snapshot?since=SEQ).
+-- Every row inserted or updated in applications or configurations is stamped
+-- with the id of the writing transaction; deletes leave a tombstone stamped
+-- the same way. A bundle read under snapshot S reports SEQ =
+-- pg_snapshot_xmin(S): every transaction below it had finished when S was
+-- taken, so a change S did not see was made by a transaction at or above
+-- it. The delta since SEQ is every row and tombstone stamped >= SEQ, which
+-- may repeat changes the client already has but never misses one. Writers
+-- share no lock: ordering comes from MVCC snapshots, not from a counter.
+--
+-- TRUNCATE (and bulk loads that bypass the triggers) raise `floor` to their
+-- own transaction id: deltas from at or below the floor are unknown and
+-- clients get a full snapshot instead.
+CREATE TABLE IF NOT EXISTS change_floor (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  floor BIGINT NOT NULL
+);
+INSERT INTO change_floor (floor) VALUES (0) ON CONFLICT DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS change_tombstones (
+  kind TEXT NOT NULL,
+  id TEXT NOT NULL,
+  change_xid BIGINT NOT NULL,
+  PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS idx_change_tombstones_xid ON change_tombstones(change_xid);
+
+-- Existing rows keep 0: they are part of every snapshot.
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE configurations ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_applications_change_xid ON applications(change_xid);
+CREATE INDEX IF NOT EXISTS idx_configurations_change_xid ON configurations(change_xid);
+
+CREATE OR REPLACE FUNCTION stamp_change_xid() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  NEW.change_xid := pg_current_xact_id()::text::bigint;
+  RETURN NEW;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION record_change_tombstone() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO change_tombstones (kind, id, change_xid) VALUES (TG_TABLE_NAME, OLD.id, pg_current_xact_id()::text::bigint)
+  ON CONFLICT (kind, id) DO UPDATE SET change_xid = EXCLUDED.change_xid;
+  RETURN NULL;
+END
+$$;
+
+-- Tombstones below the floor can no longer be served, so they are dropped.
+CREATE OR REPLACE FUNCTION raise_change_floor() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  xid BIGINT := pg_current_xact_id()::text::bigint;
+BEGIN
+  UPDATE change_floor SET floor = greatest(floor, xid);
+  DELETE FROM change_tombstones WHERE change_xid <= xid;
+  RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS applications_stamp_change_xid ON applications;
+CREATE TRIGGER applications_stamp_change_xid
+  BEFORE INSERT OR UPDATE ON applications
+  FOR EACH ROW EXECUTE FUNCTION stamp_change_xid();
+DROP TRIGGER IF EXISTS configurations_stamp_change_xid ON configurations;
+CREATE TRIGGER configurations_stamp_change_xid
+  BEFORE INSERT OR UPDATE ON configurations
+  FOR EACH ROW EXECUTE FUNCTION stamp_change_xid();
+
+DROP TRIGGER IF EXISTS applications_change_tombstone ON applications;
+CREATE TRIGGER applications_change_tombstone
+  AFTER DELETE ON applications
+  FOR EACH ROW EXECUTE FUNCTION record_change_tombstone();
+DROP TRIGGER IF EXISTS configurations_change_tombstone ON configurations;
+CREATE TRIGGER configurations_change_tombstone
+  AFTER DELETE ON configurations
+  FOR EACH ROW EXECUTE FUNCTION record_change_tombstone();
+
+DROP TRIGGER IF EXISTS applications_change_floor ON applications;
+CREATE TRIGGER applications_change_floor
+  AFTER TRUNCATE ON applications
+  FOR EACH STATEMENT EXECUTE FUNCTION raise_change_floor();
+DROP TRIGGER IF EXISTS configurations_change_floor ON configurations;
+CREATE TRIGGER configurations_change_floor
+  AFTER TRUNCATE ON configurations
+  FOR EACH STATEMENT EXECUTE FUNCTION raise_change_floor();
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Benchmark configuration reads with and without the fast serialization path.
+
+Runs in-process against the ASGI app (no network), so the numbers reflect
+per-request CPU in the service: model construction, validation and JSON
+encoding. Responses are requested uncompressed and configuration reads are
+served from the warm configuration cache, isolating serialization cost.
+
+Each endpoint is measured in `--repeat` rounds that alternate the two
+modes, so drift (CPU frequency, other load) hits both equally; the table
+reports the median rate, the spread across rounds and the speedup of the
+medians, with a range taken from the per-round ratios.
+
+Usage (database migrated, settings from env/.env):
+  uv run python scripts/bench_reads.py --duration 2 --repeat 7 --config-kb 100
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import pathlib
+import statistics
+import sys
+import time
+
+cwd = pathlib.Path(__file__).resolve().parents[1]
+if str(cwd) not in sys.path:
+    sys.path.insert(0, str(cwd))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from ulid import ULID  # noqa: E402
+
+from app.api.deps import get_pool  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.main import app  # noqa: E402
+
+PREFIX = "bench-reads-"
+
+
+def make_config(kb: int) -> dict:
+    """Build a nested document of roughly `kb` KiB of JSON."""
+    doc: dict = {}
+    i = 0
+    while len(json.dumps(doc)) < kb * 1024:
+        doc[f"section_{i}"] = {
+            "enabled": i % 3 == 0,
+            "threshold": i * 1.5,
+            "targets": [f"host-{i}-{j}.example.internal" for j in range(4)],
+            "limits": {"qps": i * 10, "burst": i, "window_ms": 1000},
+        }
+        i += 1
+    return doc
+
+
+def seed(client: TestClient, apps: int, configs_per_app: int, config_kb: int) -> tuple[str, list[str]]:
+    """Create benchmark data; return the id of one large configuration and up to 20 ids for batch reads."""
+    big = make_config(config_kb)
+    ids: list[str] = []
+    for a in range(apps):
+        app_id = str(ULID())
+        client.post("/api/v1/applications", json={"id": app_id, "name": f"{PREFIX}{a}", "comments": None})
+        for c in range(configs_per_app):
+            conf_id = str(ULID())
+            client.post(
+                "/api/v1/configurations",
+                json={"id": conf_id, "application_id": app_id, "name": f"cfg-{c}", "comments": None, "config": big},
+            ).raise_for_status()
+            ids.append(conf_id)
+    return ids[0], ids[:20]
+
+
+def cleanup() -> None:
+    """Remove benchmark data."""
+    with get_pool().cursor() as (conn, cur):
+        cur.execute(
+            "DELETE FROM configurations WHERE application_id IN (SELECT id FROM applications WHERE name LIKE %s)",
+            (PREFIX + "%",),
+        )
+        cur.execute("DELETE FROM applications WHERE name LIKE %s", (PREFIX + "%",))
+        conn.commit()
+
+
+def measure(client: TestClient, method: str, url: str, body: dict | None, duration: float) -> float:
+    """Return requests per second for sequential requests to `url`."""
+    client.request(method, url, json=body).raise_for_status()  # warm caches
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        client.request(method, url, json=body)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Seed data, benchmark both modes and print a table plus JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per endpoint, mode and round")
+    parser.add_argument("--repeat", type=int, default=7, help="rounds per endpoint (modes alternate order)")
+    parser.add_argument("--apps", type=int, default=50)
+    parser.add_argument("--configs-per-app", type=int, default=2)
+    parser.add_argument("--config-kb", type=int, default=100, help="approximate size of each config document")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    client = TestClient(app, headers={"Accept-Encoding": "identity"})
+    cleanup()
+    try:
+        conf_id, batch = seed(client, args.apps, args.configs_per_app, args.config_kb)
+        endpoints = {
+            "get_configuration": ("GET", f"/api/v1/configurations/{conf_id}"),
+            "get_by_names": ("GET", f"/api/v1/applications/by-name/{PREFIX}0/configurations/cfg-0"),
+            "batch_get": ("POST", "/api/v1/configurations:batchGet", {"ids": batch}),
+        }
+        results: dict[str, dict[str, list[float]]] = {}
+        for name, (method, url, *body) in endpoints.items():
+            results[name] = {"baseline": [], "fast": []}
+            for round_no in range(args.repeat):
+                modes = (("baseline", False), ("fast", True))
+                for label, enabled in modes if round_no % 2 == 0 else reversed(modes):
+                    settings.FAST_SERIALIZATION = enabled
+                    results[name][label].append(measure(client, method, url, body[0] if body else None, args.duration))
+    finally:
+        cleanup()
+
+    print(f"{'endpoint':<20} {'baseline rps':>18} {'fast rps':>18} {'speedup':>8} {'ratio range':>14}")
+    for name, r in results.items():
+        ratios = [f / b for b, f in zip(r["baseline"], r["fast"])]
+        cells = [f"{statistics.median(v):.0f} +/- {statistics.pstdev(v):.0f}" for v in (r["baseline"], r["fast"])]
+        speedup = statistics.median(r["fast"]) / statistics.median(r["baseline"])
+        print(f"{name:<20} {cells[0]:>18} {cells[1]:>18} {speedup:>7.2f}x {min(ratios):>6.2f}-{max(ratios):.2f}x")
+    print(json.dumps(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
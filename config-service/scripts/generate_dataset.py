@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""Bulk-load a large synthetic dataset for scale testing.
+
+Generates applications and configurations deterministically from a seed
+and streams them into Postgres with `COPY`, in batches of applications
+(one transaction each, spread over `--jobs` connections). Documents are
+assembled from a pool of pre-rendered JSON subtrees, so building millions
+of distinct documents costs string joins rather than JSON encoding:
+
+- sizes follow a log-normal distribution (`--doc-kb-median`, `--doc-kb-sigma`,
+  capped at `--doc-kb-max`)
+- subtrees nest up to `--depth` levels below the top-level sections
+- `--shared-fraction` of configurations reuse one of `--shared-docs`
+  documents verbatim (byte-identical duplicates across applications);
+  the rest are unique (each also carries a distinct `_seed` field)
+
+Same seed and parameters, same rows (ids included). The revision and
+change-sequence triggers are disabled during the load and each
+configuration's first revision is backfilled in one statement afterwards
+(or skipped with `--skip-revisions`); the change-sequence floor is raised
+so snapshot clients resynchronise. Point it at a scratch database with no running
+service; `--truncate` empties the tables first.
+
+Usage (settings from env/.env):
+  uv run python scripts/generate_dataset.py --apps 50000 --configs-per-app 20-60 --truncate
+  uv run python scripts/generate_dataset.py --apps 1000 --configs-per-app 5 --doc-kb-median 8 --depth 5 --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import pathlib
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Iterator
+
+cwd = pathlib.Path(__file__).resolve().parents[1]
+if str(cwd) not in sys.path:
+    sys.path.insert(0, str(cwd))
+
+import psycopg2  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.pool import dsn_from_settings  # noqa: E402
+from app.db.sql import IteratorFile, copy_text_row  # noqa: E402
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Ids are timestamped from this instant (2024-01-01T00:00:00Z), one ms apart, so they sort in load order.
+_EPOCH_MS = 1_704_067_200_000
+_WORDS = (
+    "feature", "limits", "cache", "timeout", "retry", "endpoint", "region", "pool", "flags", "auth",
+    "logging", "metrics", "quota", "rollout", "tier", "window", "backoff", "shard", "replica", "policy",
+)
+_ENVIRONMENTS = ("default", "prod", "staging", "dev", "qa", "canary", "eu", "us", "apac", "perf")
+_FRAGMENTS = 4096
+# Per-row triggers bypassed during the load (see main).
+_LOAD_TRIGGERS = (
+    ("configurations", "configurations_record_revision"),
+    ("configurations", "configurations_stamp_change_xid"),
+    ("applications", "applications_stamp_change_xid"),
+)
+
+
+def ulid(rng: random.Random, n: int) -> str:
+    """Return a deterministic ULID: timestamp `_EPOCH_MS + n`, 80 random bits from `rng`."""
+    value = ((_EPOCH_MS + n) << 80) | rng.getrandbits(80)
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def parse_range(text: str) -> tuple[int, int]:
+    """Parse `N` or `LO-HI` (inclusive)."""
+    lo, _, hi = text.partition("-")
+    low, high = int(lo), int(hi or lo)
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError(f"invalid range: {text!r}")
+    return low, high
+
+
+class DocumentFactory:
+    """Render JSON documents from a seeded pool of subtrees."""
+
+    def __init__(self, rng: random.Random, depth: int, median_kb: float, sigma: float, max_kb: float):
+        """Pre-render the subtree pool; all later choices also draw from `rng`."""
+        self.rng = rng
+        self.depth = depth
+        self.mu = math.log(median_kb * 1024)
+        self.sigma = sigma
+        self.max_bytes = max_kb * 1024
+        self.fragments = [self._node(1) for _ in range(_FRAGMENTS)]
+
+    def _leaf(self) -> str:
+        rng = self.rng
+        kind = rng.randrange(6)
+        if kind == 0:
+            return "true" if rng.random() < 0.5 else "false"
+        if kind == 1:
+            return str(rng.randrange(100_000))
+        if kind == 2:
+            return f"{rng.uniform(0, 1000):.3f}"
+        if kind == 3:
+            return json.dumps(f"{rng.choice(_WORDS)}-{rng.randrange(10_000)}.example.internal")
+        if kind == 4:
+            return "[" + ",".join(str(rng.randrange(1000)) for _ in range(rng.randrange(1, 6))) + "]"
+        return "null"
+
+    def _node(self, level: int) -> str:
+        rng = self.rng
+        members = []
+        for i in range(rng.randrange(2, 6)):
+            child = self._node(level + 1) if level < self.depth and rng.random() < 0.6 else self._leaf()
+            members.append(f'"{rng.choice(_WORDS)}_{i}":{child}')
+        return "{" + ",".join(members) + "}"
+
+    def size(self) -> int:
+        """Draw a target document size in bytes."""
+        return int(min(self.max_bytes, max(64.0, self.rng.lognormvariate(self.mu, self.sigma))))
+
+    def document(self, tag: int) -> str:
+        """Return a document of a drawn size whose `_seed` field is `tag`."""
+        target = self.size()
+        parts = [f'"_seed":{tag}']
+        length = len(parts[0]) + 2
+        i = 0
+        while length < target:
+            part = f'"section_{i}":{self.rng.choice(self.fragments)}'
+            parts.append(part)
+            length += len(part) + 1
+            i += 1
+        return "{" + ",".join(parts) + "}"
+
+
+class Generator:
+    """Deterministic stream of application and configuration rows."""
+
+    def __init__(self, args: argparse.Namespace):
+        """Seed the generator and pre-render the shared documents."""
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.docs = DocumentFactory(self.rng, args.depth, args.doc_kb_median, args.doc_kb_sigma, args.doc_kb_max)
+        self.shared = [self.docs.document(-i - 1) for i in range(args.shared_docs if args.shared_fraction > 0 else 0)]
+        self.ids = 0
+        self.configurations = 0
+        self.shared_used = 0
+        self.bytes = 0
+
+    def _next_id(self) -> str:
+        self.ids += 1
+        return ulid(self.rng, self.ids)
+
+    def batch(self, first_app: int, count: int) -> tuple[list[str], list[str]]:
+        """Return COPY text rows for `count` applications and their configurations."""
+        args = self.args
+        apps, configs = [], []
+        for a in range(first_app, first_app + count):
+            app_id = self._next_id()
+            comments = None if self.rng.random() < 0.5 else f"Synthetic application {a}"
+            apps.append(copy_text_row((app_id, f"{args.prefix}{a:08d}", comments)))
+            for j in range(self.rng.randint(*args.configs_per_app)):
+                if self.shared and self.rng.random() < args.shared_fraction:
+                    doc = self.rng.choice(self.shared)
+                    self.shared_used += 1
+                else:
+                    doc = self.docs.document(self.configurations)
+                name = f"{_ENVIRONMENTS[j % len(_ENVIRONMENTS)]}-{j // len(_ENVIRONMENTS)}"
+                configs.append(copy_text_row((self._next_id(), app_id, name, None, doc, "1")))
+                self.configurations += 1
+                self.bytes += len(doc)
+        return apps, configs
+
+
+def _chunks(rows: list[str], size: int = 1000) -> Iterator[str]:
+    for i in range(0, len(rows), size):
+        yield "".join(rows[i : i + size])
+
+
+def _copy_batches(batches: queue.Queue, errors: list[BaseException]) -> None:
+    """Worker: COPY each queued `(apps, configs)` batch in its own transaction."""
+    conn = psycopg2.connect(dsn_from_settings(get_settings()))
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET synchronous_commit = off")
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if errors:
+                continue  # drain so the producer never blocks
+            apps, configs = batch
+            try:
+                with conn.cursor() as cur:
+                    cur.copy_expert("COPY applications (id, name, comments) FROM STDIN", IteratorFile(_chunks(apps)))
+                    cur.copy_expert(
+                        "COPY configurations (id, application_id, name, comments, config, version) FROM STDIN",
+                        IteratorFile(_chunks(configs)),
+                    )
+                conn.commit()
+            except BaseException as exc:
+                conn.rollback()
+                errors.append(exc)
+    finally:
+        conn.close()
+
+
+def _load(gen: Generator, args: argparse.Namespace, started: float) -> None:
+    """Generate batches in order on this thread and COPY them on `args.jobs` connections.
+
+    Generation is sequential, so the rows do not depend on `--jobs`; only
+    the order in which batches commit does.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=args.jobs)
+    errors: list[BaseException] = []
+    workers = [threading.Thread(target=_copy_batches, args=(batches, errors)) for _ in range(args.jobs)]
+    for worker in workers:
+        worker.start()
+    try:
+        for first in range(0, args.apps, args.batch_apps):
+            if errors:
+                break
+            count = min(args.batch_apps, args.apps - first)
+            batches.put(gen.batch(first, count))
+            print(
+                f"{first + count}/{args.apps} applications, {gen.configurations} configurations, "
+                f"{gen.bytes / 2**20:.0f} MiB, {time.perf_counter() - started:.0f}s",
+                file=sys.stderr,
+            )
+    finally:
+        for _ in workers:
+            batches.put(None)
+        for worker in workers:
+            worker.join()
+    if errors:
+        raise errors[0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Generate and load the dataset, then print a JSON summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=1000, help="number of applications")
+    parser.add_argument("--configs-per-app", type=parse_range, default=(1, 10), help="N or LO-HI (uniform)")
+    parser.add_argument("--doc-kb-median", type=float, default=2.0, help="median document size in KiB")
+    parser.add_argument("--doc-kb-sigma", type=float, default=1.0, help="log-normal sigma of document sizes")
+    parser.add_argument("--doc-kb-max", type=float, default=512.0, help="largest document size in KiB")
+    parser.add_argument("--depth", type=int, default=3, help="nesting levels below each top-level section")
+    parser.add_argument("--shared-fraction", type=float, default=0.0, help="share of configurations reusing a document")
+    parser.add_argument("--shared-docs", type=int, default=100, help="number of distinct shared documents")
+    parser.add_argument("--prefix", default="ds-", help="application name prefix")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-apps", type=int, default=2000, help="applications per COPY transaction")
+    parser.add_argument("--jobs", type=int, default=2, help="parallel COPY connections")
+    parser.add_argument("--truncate", action="store_true", help="empty applications and configurations first")
+    parser.add_argument("--skip-revisions", action="store_true", help="do not backfill first revisions")
+    args = parser.parse_args(argv)
+    if not 0 <= args.shared_fraction <= 1:
+        parser.error("--shared-fraction must be between 0 and 1")
+
+    started = time.perf_counter()
+    gen = Generator(args)
+    conn = psycopg2.connect(dsn_from_settings(get_settings()))
+    try:
+        with conn.cursor() as cur:
+            if args.truncate:
+                cur.execute("TRUNCATE configurations, applications CASCADE")
+            cur.execute("SELECT coalesce(max(version), 0) FROM configurations")  # fail early if unmigrated
+            for table, trigger in _LOAD_TRIGGERS:
+                cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}")
+            conn.commit()
+        try:
+            _load(gen, args, started)
+        finally:
+            conn.rollback()
+            with conn.cursor() as cur:
+                for table, trigger in _LOAD_TRIGGERS:
+                    cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}")
+            conn.commit()
+        with conn.cursor() as cur:
+            # Loaded rows carry no change stamp, so deltas from before the load are void.
+            cur.execute("SELECT pg_current_xact_id()::text::bigint")
+            floor = cur.fetchone()[0]
+            cur.execute("UPDATE change_floor SET floor = greatest(floor, %s)", (floor,))
+            cur.execute("DELETE FROM change_tombstones WHERE change_xid <= %s", (floor,))
+            if not args.skip_revisions:
+                # Same as the 0004 backfill: every configuration starts with a checkpoint.
+                cur.execute(
+                    """
+                    INSERT INTO configuration_revisions (configuration_id, revision, depth, body)
+                    SELECT id, version, 0, config FROM configurations
+                    ON CONFLICT DO NOTHING
+                    """
+                )
+            conn.commit()
+            conn.autocommit = True
+            cur.execute("ANALYZE applications")
+            cur.execute("ANALYZE configurations")
+            cur.execute("ANALYZE configuration_revisions")
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "seed": args.seed,
+        "applications": args.apps,
+        "configurations": gen.configurations,
+        "shared_configurations": gen.shared_used,
+        "document_bytes": gen.bytes,
+        "seconds": round(elapsed, 1),
+        "configurations_per_second": round(gen.configurations / elapsed) if elapsed else None,
+    }
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
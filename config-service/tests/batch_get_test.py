@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_config_cache
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_batch_get_returns_found_in_order_and_missing(monkeypatch, seed):
+    app_id = seed.app("batch-app")
+    ids = [seed.config(app_id, f"c{i}", {"i": i}) for i in range(5)]
+    get_config_cache().clear()
+    missing = str(ULID())
+    queries = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        queries.append(query)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    requested = [ids[3], missing, ids[0], ids[3], ids[1]]
+    r = client.post("/api/v1/configurations:batchGet", json={"ids": requested})
+    assert r.status_code == 200
+    body = r.json()
+    assert [c["id"] for c in body["configurations"]] == [ids[3], ids[0], ids[1]]
+    assert [c["config"]["i"] for c in body["configurations"]] == [3, 0, 1]
+    assert body["missing_ids"] == [missing]
+    assert len(queries) == 1
+
+    queries.clear()
+    again = client.post("/api/v1/configurations:batchGet", json={"ids": [ids[0], ids[1], ids[3]]})
+    assert len(again.json()["configurations"]) == 3
+    assert queries == []  # all served from cache
+
+
+def test_batch_get_validates_payload():
+    assert client.post("/api/v1/configurations:batchGet", json={"ids": []}).status_code == 422
+    assert client.post("/api/v1/configurations:batchGet", json={"ids": ["x"] * 1001}).status_code == 422
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+import bulk_import
+from app.core.config import get_settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def _ndjson(rows: list) -> bytes:
+    return b"\n".join(r if isinstance(r, bytes) else json.dumps(r).encode() for r in rows) + b"\n"
+
+
+def test_bulk_import_reports_conflicts_without_aborting(seed):
+    app_id = seed.app("bulk-app")
+    existing = seed.config(app_id, "taken")
+    ok_id, dup_id, upd_id = str(ULID()), str(ULID()), existing
+    body = _ndjson(
+        [
+            {"id": ok_id, "application_id": app_id, "name": "fresh", "comments": "tab\there", "config": {"s": "a\\b\nc"}},
+            {"id": str(ULID()), "application_id": str(ULID()), "name": "orphan", "config": {}},
+            {"id": dup_id, "application_id": app_id, "name": "taken", "config": {}},
+            b"{not json",
+            {"id": str(ULID()), "application_id": app_id, "name": "fresh", "config": {}},
+            {"id": upd_id, "application_id": app_id, "name": "taken", "comments": None, "config": {"v": 2}},
+            {"id": str(ULID()), "application_id": app_id, "config": {}},
+        ]
+    )
+    r = client.post("/api/v1/configurations:bulkImport", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    errors = {e["line"]: e["error"] for e in report["errors"]}
+    assert set(errors) == {2, 3, 4, 5, 7}
+    assert errors[2] == "application_id does not exist"
+    assert "unique" in errors[3]
+    assert "duplicate configuration name" in errors[5]
+    assert errors[7].startswith("name")
+
+    fresh = client.get(f"/api/v1/configurations/{ok_id}").json()
+    assert fresh["comments"] == "tab\there"
+    assert fresh["config"] == {"s": "a\\b\nc"}
+    updated = client.get(f"/api/v1/configurations/{upd_id}").json()
+    assert updated["config"] == {"v": 2} and updated["version"] == 2
+
+
+def test_bulk_import_reports_nul_characters_per_line(seed):
+    app_id = seed.app("nul-app")
+    ok_id = str(ULID())
+    body = _ndjson(
+        [
+            {"id": str(ULID()), "application_id": app_id, "name": "a\u0000b", "config": {}},
+            {"id": str(ULID()), "application_id": app_id, "name": "in-config", "config": {"k": ["\u0000"]}},
+            {"id": ok_id, "application_id": app_id, "name": "clean", "config": {"k": "v"}},
+        ]
+    )
+    r = client.post("/api/v1/configurations:bulkImport", content=body)
+    assert r.status_code == 200
+    report = r.json()
+    assert report["inserted"] == 1
+    assert [(e["line"], e["error"].split(":")[0]) for e in report["errors"]] == [(1, "name"), (2, "config")]
+    assert client.get(f"/api/v1/configurations/{ok_id}").status_code == 200
+
+
+def test_bulk_import_rejects_oversized_bodies(monkeypatch, seed):
+    app_id = seed.app("big-app")
+    lines = [{"id": str(ULID()), "application_id": app_id, "name": f"c{i}", "config": {}} for i in range(20)]
+    body = _ndjson(lines)
+    monkeypatch.setattr(get_settings(), "IMPORT_MAX_BYTES", len(body) - 1)
+    assert client.post("/api/v1/configurations:bulkImport", content=body).status_code == 413
+
+    def chunked():  # no Content-Length: the limit is enforced while reading
+        yield body[:100]
+        yield body[100:]
+
+    assert client.post("/api/v1/configurations:bulkImport", content=chunked()).status_code == 413
+    monkeypatch.setattr(get_settings(), "IMPORT_MAX_BYTES", len(body))
+    assert client.post("/api/v1/configurations:bulkImport", content=chunked()).json()["inserted"] == 20
+
+
+def test_cli_imports_file(tmp_path, capsys, seed):
+    app_id = seed.app("bulk-cli")
+    path = tmp_path / "in.ndjson"
+    path.write_bytes(
+        _ndjson([{"id": str(ULID()), "application_id": app_id, "name": f"c{i}", "config": {"i": i}} for i in range(50)])
+    )
+    assert bulk_import.main([str(path)]) == 0
+    assert json.loads(capsys.readouterr().out)["inserted"] == 50
+    assert len(client.get(f"/api/v1/applications/{app_id}").json()["configuration_ids"]) == 50
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+
+from app.api.deps import get_change_listener, get_name_cache, get_pool
+from app.core.cache import LRUCache
+from app.main import app
+from app.models.types import ApplicationUpdate
+from app.services.applications_service import ApplicationsService
+from app.services.configurations_service import ConfigurationsService
+
+client = TestClient(app)
+
+
+def test_lookup_by_name_is_one_query_then_cached(monkeypatch, seed):
+    _, conf_id = seed.app_with_config("alpha-app", "prod", {"env": "prod"})
+    queries = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        queries.append(query)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    r = client.get("/api/v1/applications/by-name/alpha-app/configurations/prod")
+    assert r.status_code == 200
+    assert r.json()["id"] == conf_id
+    assert len(queries) == 1
+
+    queries.clear()
+    again = client.get("/api/v1/applications/by-name/alpha-app/configurations/prod")
+    assert again.json()["config"] == {"env": "prod"}
+    assert queries == []
+    assert client.get(
+        "/api/v1/applications/by-name/alpha-app/configurations/prod", headers={"If-None-Match": again.headers["etag"]}
+    ).status_code == 304
+
+
+def test_lookup_follows_renames(seed):
+    assert get_change_listener().wait_ready(timeout=5)
+    app_id, conf_id = seed.app_with_config("alpha-app", "prod", {"env": "prod"})
+    assert client.get("/api/v1/applications/by-name/alpha-app/configurations/prod").status_code == 200
+
+    client.put(f"/api/v1/configurations/{conf_id}", json={"name": "production"})
+    assert client.get("/api/v1/applications/by-name/alpha-app/configurations/prod").status_code == 404
+    assert client.get("/api/v1/applications/by-name/alpha-app/configurations/production").json()["id"] == conf_id
+
+    client.put(f"/api/v1/applications/{app_id}", json={"name": "alpha-renamed"})
+    deadline = time.monotonic() + 2
+    while len(get_name_cache()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get("/api/v1/applications/by-name/alpha-app/configurations/production").status_code == 404
+    assert client.get("/api/v1/applications/by-name/alpha-renamed/configurations/production").status_code == 200
+
+
+def test_rename_is_visible_to_the_renaming_process_immediately(seed):
+    app_id, conf_id = seed.app_with_config("alpha-app", "prod", {"env": "prod"})
+    # A private cache that no change notification will ever clear.
+    names = LRUCache(max_entries=100, max_bytes=100 * 1024)
+    configurations = ConfigurationsService(get_pool(), names=names)
+    assert configurations.get_by_names("alpha-app", "prod").id == conf_id
+
+    ApplicationsService(get_pool(), names=names).update(app_id, ApplicationUpdate(name="alpha-renamed"))
+    with pytest.raises(HTTPException) as e:
+        configurations.get_by_names("alpha-app", "prod")
+    assert e.value.status_code == 404
+    assert configurations.get_by_names("alpha-renamed", "prod").id == conf_id
+
+
+def test_lookup_unknown_names(seed):
+    seed.app_with_config("alpha-app", "prod", {"env": "prod"})
+    assert client.get("/api/v1/applications/by-name/nope/configurations/prod").status_code == 404
+    assert client.get("/api/v1/applications/by-name/alpha-app/configurations/nope").status_code == 404
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+
+from app.api.deps import get_change_listener, get_config_cache, get_pool
+from app.core.cache import LRUCache
+from app.main import app
+from app.repositories.configurations_repo import ConfigurationsRepo
+
+client = TestClient(app)
+
+
+def test_lru_evicts_by_entry_count():
+    cache = LRUCache(max_entries=2, max_bytes=1000)
+    cache.put("a", 1, 1)
+    cache.put("b", 2, 1)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3, 1)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+def test_lru_evicts_by_bytes_and_rejects_oversized():
+    cache = LRUCache(max_entries=100, max_bytes=10)
+    cache.put("a", "x", 4)
+    cache.put("b", "y", 4)
+    cache.put("c", "z", 4)
+    assert cache.get("a") is None
+    assert cache.stats().bytes == 8
+    assert cache.put("huge", "!", 11) is False
+    assert cache.get("huge") is None
+
+
+def test_put_after_invalidation_is_dropped():
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    gen = cache.generation()
+    cache.invalidate("a")
+    assert cache.put("a", "stale", 1, gen) is False
+    assert cache.get("a") is None
+
+
+def test_hot_reads_do_not_touch_the_database(monkeypatch, seed):
+    _, conf_id = seed.app_with_config("cached-app", "cached", {"v": 1})
+    assert client.get(f"/api/v1/configurations/{conf_id}").status_code == 200
+
+    calls = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        calls.append(query)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    for _ in range(3):
+        assert client.get(f"/api/v1/configurations/{conf_id}").json()["config"] == {"v": 1}
+    assert calls == []
+
+
+def test_local_write_is_visible_immediately(seed):
+    _, conf_id = seed.app_with_config("cached-app", "cached", {"v": 1})
+    client.get(f"/api/v1/configurations/{conf_id}")
+    client.put(f"/api/v1/configurations/{conf_id}", json={"config": {"v": 2}})
+    assert client.get(f"/api/v1/configurations/{conf_id}").json()["config"] == {"v": 2}
+
+
+def test_notify_invalidates_entries_written_by_another_worker(seed):
+    assert get_change_listener().wait_ready(timeout=5)
+    _, conf_id = seed.app_with_config("cached-app", "cached", {"v": 1})
+    client.get(f"/api/v1/configurations/{conf_id}")
+    cache = get_config_cache()
+    assert cache.get(conf_id) is not None
+
+    # Simulate another worker: write through the repository, bypassing this
+    # process's service (and therefore its local invalidation).
+    ConfigurationsRepo(get_pool()).update(conf_id, None, None, {"v": 3})
+
+    deadline = time.monotonic() + 2
+    while cache.get(conf_id) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get(conf_id) is None
+    assert client.get(f"/api/v1/configurations/{conf_id}").json()["config"] == {"v": 3}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_config_cache
+from app.core import compression
+from app.core.compression import negotiate
+from app.main import app
+
+client = TestClient(app)
+
+BIG = {f"key_{i}": {"enabled": i % 2 == 0, "threshold": i, "label": f"feature number {i}"} for i in range(200)}
+
+
+def test_negotiate_respects_q_values_and_preference():
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("gzip, deflate;q=0.5") == "gzip"
+    assert negotiate("*;q=0.1, gzip;q=0.5") == "gzip"
+    if "br" in compression.available_encodings():
+        assert negotiate("gzip, br") == "br"
+        assert negotiate("gzip;q=1, br;q=0.5") == "gzip"
+
+
+@pytest.mark.parametrize("encoding", compression.available_encodings())
+def test_configuration_is_compressed_once_per_version(encoding, seed):
+    _, conf_id = seed.app_with_config("gz-app", "prod", BIG)
+    # httpx decodes gzip/br/zstd transparently when the codec is installed.
+    r = client.get(f"/api/v1/configurations/{conf_id}", headers={"Accept-Encoding": encoding})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == encoding
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["etag"] == 'W/"v1"'
+    assert r.json()["config"] == BIG
+
+    cache = get_config_cache()
+    cached = cache.get(("encoded", ("configuration", conf_id, 1), encoding))
+    assert cached is not None and cached[0] == encoding
+    again = client.get(f"/api/v1/configurations/{conf_id}", headers={"Accept-Encoding": encoding})
+    assert again.content == r.content
+
+    revalidate = client.get(
+        f"/api/v1/configurations/{conf_id}", headers={"Accept-Encoding": encoding, "If-None-Match": r.headers["etag"]}
+    )
+    assert revalidate.status_code == 304
+
+    client.put(f"/api/v1/configurations/{conf_id}", json={"config": {**BIG, "extra": 1}})
+    updated = client.get(f"/api/v1/configurations/{conf_id}", headers={"Accept-Encoding": encoding})
+    assert updated.headers["etag"] == 'W/"v2"'
+    assert updated.json()["config"]["extra"] == 1
+
+
+def test_middleware_compresses_large_lists_and_skips_small_bodies(seed):
+    for i in range(30):
+        client.post("/api/v1/applications", json={"id": str(ULID()), "name": f"app-{i:03d}", "comments": "x" * 40})
+    r = client.get("/api/v1/applications", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["etag"].startswith('W/"')
+    assert len(r.json()) == 30
+
+    _, small = seed.app_with_config("gz-app", "prod", {"a": 1})
+    s = client.get(f"/api/v1/configurations/{small}", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in s.headers
+    assert s.headers["etag"] == '"v1"'
+
+    plain = client.get("/api/v1/applications", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_compressed_body_round_trips():
+    assert gzip.decompress(compression.compress("gzip", b"x" * 5000)) == b"x" * 5000
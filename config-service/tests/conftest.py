@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 import psycopg2  # type: ignore
+from psycopg2.pool import ThreadedConnectionPool  # type: ignore
 """Test configuration & shared fixtures.
 
 This file centralizes reusable pytest fixtures for the test suite. Key goals:
@@ -11,7 +12,8 @@ This file centralizes reusable pytest fixtures for the test suite. Key goals:
 2. Apply database migrations once per test session so individual tests focus
      on data logic, not schema setup.
 3. Provide a clean database state for each test via table truncation.
-4. Offer common helpers (e.g., a compiled ULID regex) to avoid duplication.
+4. Offer common helpers (e.g., a compiled ULID regex, the ``seed`` factory
+     for applications and configurations) to avoid duplication.
 
 Design choices:
 - We modify ``sys.path`` instead of installing the package because the project
@@ -33,8 +35,12 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.api.deps import get_pool  # noqa: E402
+from app.api.deps import get_config_cache, get_name_cache, get_pool, get_resolve_cache  # noqa: E402
 from app.core import config as config_mod  # noqa: E402
+from app.db.pool import DBPool, Replica, dsn_from_settings  # noqa: E402
+from app.main import app  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic_extra_types.ulid import ULID  # noqa: E402
 
 import migrations
 
@@ -65,9 +71,62 @@ def _clean_db():
         cur.execute("TRUNCATE configurations CASCADE;")
         cur.execute("TRUNCATE applications CASCADE;")
         conn.commit()
+    # TRUNCATE does not emit change notifications, so reset caches explicitly.
+    for cache in (get_config_cache(), get_name_cache(), get_resolve_cache()):
+        if cache is not None:
+            cache.clear()
     yield
 
 
+@pytest.fixture
+def routed():
+    """A `DBPool` whose 'replica' is the primary itself (never lagging)."""
+    settings = config_mod.get_settings()
+
+    def pool() -> ThreadedConnectionPool:
+        return ThreadedConnectionPool(minconn=0, maxconn=2, dsn=dsn_from_settings(settings))
+
+    db = DBPool(pool(), replicas=[Replica("self", pool())])
+    yield db
+    db.pool.closeall()
+    db.replicas[0].pool.closeall()
+
+
+class Seeder:
+    """Creates applications and configurations through the public API."""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+
+    def app(self, name: str = "app", comments: str | None = None) -> str:
+        """Create an application and return its id."""
+        app_id = str(ULID())
+        r = self.client.post("/api/v1/applications", json={"id": app_id, "name": name, "comments": comments})
+        assert r.status_code == 201, r.text
+        return app_id
+
+    def config(self, app_id: str, name: str = "prod", config: dict | None = None, comments: str | None = None) -> str:
+        """Create a configuration of `app_id` and return its id."""
+        conf_id = str(ULID())
+        r = self.client.post(
+            "/api/v1/configurations",
+            json={"id": conf_id, "application_id": app_id, "name": name, "comments": comments, "config": config or {}},
+        )
+        assert r.status_code == 201, r.text
+        return conf_id
+
+    def app_with_config(self, app_name: str = "app", name: str = "prod", config: dict | None = None) -> tuple[str, str]:
+        """Create an application with one configuration; return `(app_id, conf_id)`."""
+        app_id = self.app(app_name)
+        return app_id, self.config(app_id, name, config)
+
+
+@pytest.fixture
+def seed() -> Seeder:
+    """Factory for applications and configurations created via the API."""
+    return Seeder(TestClient(app))
+
+
 @pytest.fixture
 def ulid_regex():
     """Compiled regex for validating canonical 26-char Crockford Base32 ULIDs."""
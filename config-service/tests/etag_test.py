@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+
+from app.api.deps import get_config_cache
+from app.api.etag import etag_matches
+from app.main import app
+from app.repositories.configurations_repo import _GET_VERSION
+
+client = TestClient(app)
+
+
+def test_etag_matching_rules():
+    assert etag_matches('"v1"', '"v1"')
+    assert etag_matches('W/"v1"', '"v1"')
+    assert etag_matches('"v0", "v1"', '"v1"')
+    assert etag_matches("*", '"v1"')
+    assert not etag_matches('"v2"', '"v1"')
+    assert not etag_matches(None, '"v1"')
+
+
+def test_configuration_conditional_get_and_version_bump(seed):
+    _, conf_id = seed.app_with_config("etag-app", "etag", {"big": "x" * 100})
+    r = client.get(f"/api/v1/configurations/{conf_id}")
+    etag = r.headers["etag"]
+    assert r.json()["version"] == 1
+
+    nm = client.get(f"/api/v1/configurations/{conf_id}", headers={"If-None-Match": etag})
+    assert nm.status_code == 304
+    assert nm.content == b""
+    assert nm.headers["etag"] == etag
+
+    u = client.put(f"/api/v1/configurations/{conf_id}", json={"config": {"big": "y"}})
+    assert u.json()["version"] == 2
+    assert u.headers["etag"] != etag
+
+    r2 = client.get(f"/api/v1/configurations/{conf_id}", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.json()["config"] == {"big": "y"}
+
+
+def test_cold_conditional_get_skips_the_config_column(monkeypatch, seed):
+    _, conf_id = seed.app_with_config("cold-app", "cold", {"big": "x" * 100})
+    etag = client.get(f"/api/v1/configurations/{conf_id}").headers["etag"]
+    get_config_cache().clear()
+
+    queries = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        queries.append(query)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    r = client.get(f"/api/v1/configurations/{conf_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert len(queries) == 1
+    sql = queries[0]
+    if sql == _GET_VERSION.execute_sql:  # sent as a prepared statement
+        sql = _GET_VERSION.sql
+    assert "config" not in sql.split("FROM")[0]
+
+
+def test_application_conditional_get_changes_with_configurations(seed):
+    app_id, _ = seed.app_with_config("appetag-app", "appetag", {"big": "x" * 100})
+    r = client.get(f"/api/v1/applications/{app_id}")
+    etag = r.headers["etag"]
+    assert client.get(f"/api/v1/applications/{app_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    seed.config(app_id, "another")
+    assert client.get(f"/api/v1/applications/{app_id}", headers={"If-None-Match": etag}).status_code == 200
+
+    listed = client.get("/api/v1/applications")
+    assert client.get("/api/v1/applications", headers={"If-None-Match": listed.headers["etag"]}).status_code == 304
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_change_listener, get_event_broker, get_pool
+from app.core.events import EventBroker, stream
+from app.main import app
+from app.repositories.configurations_repo import ConfigurationsRepo
+
+client = TestClient(app)
+
+
+def _parse(frame: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_slow_consumer_is_evicted_without_affecting_others():
+    async def run():
+        broker = EventBroker(buffer_size=2)
+        slow = broker.subscribe("app")
+        fast = broker.subscribe("app")
+        fast_frames = []
+        fast_stream = stream(broker, fast, heartbeat=5)
+        await fast_stream.__anext__()  # ready
+        for i in range(3):
+            broker.publish("app", "configuration", json.dumps({"i": i}))
+            await asyncio.sleep(0)
+            fast_frames.append(await fast_stream.__anext__())
+        assert [_parse(f)[1]["i"] for f in fast_frames] == [0, 1, 2]
+
+        slow_frames = [f async for f in stream(broker, slow, heartbeat=5)]
+        assert _parse(slow_frames[-1])[0] == "evicted"
+        assert len(slow_frames) == 2  # ready + evicted; backlog dropped
+        await fast_stream.aclose()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(run())
+
+
+def test_out_of_order_versions_are_dropped():
+    async def run():
+        broker = EventBroker(buffer_size=10)
+        sub = broker.subscribe("app")
+        for version in (1, 3, 2, 3):  # the load of v2 finishes after v3
+            broker.publish_versioned("app", "conf", version, "configuration", json.dumps({"version": version}))
+        assert broker.is_stale("conf", 2) and not broker.is_stale("conf", 4)
+        await asyncio.sleep(0)
+        return [_parse(sub.queue.get_nowait())[1]["version"] for _ in range(sub.queue.qsize())]
+
+    assert asyncio.run(run()) == [1, 3]
+
+
+def test_change_through_listener_reaches_application_stream(seed):
+    assert get_change_listener().wait_ready(timeout=5)
+    app_id = seed.app("sse-app")
+    conf_id = str(ULID())
+
+    async def run():
+        broker = get_event_broker()
+        events = stream(broker, broker.subscribe(app_id), heartbeat=5)
+        assert _parse(await events.__anext__())[0] == "ready"
+        repo = ConfigurationsRepo(get_pool())
+        await asyncio.to_thread(repo.create, conf_id, app_id, "live", None, {"k": 1})
+        created = _parse(await asyncio.wait_for(events.__anext__(), 5))
+        await asyncio.to_thread(repo.update, conf_id, None, None, {"k": 2})
+        updated = _parse(await asyncio.wait_for(events.__anext__(), 5))
+        await events.aclose()
+        return created, updated
+
+    created, updated = asyncio.run(run())
+    assert created[0] == "configuration"
+    assert (created[1]["id"], created[1]["version"]) == (conf_id, 1)
+    assert updated[1]["config"] == {"k": 2} and updated[1]["version"] == 2
+
+
+def test_events_for_unknown_application_is_404():
+    r = client.get(f"/api/v1/applications/{ULID()}/events")
+    assert r.status_code == 404
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from pydantic_extra_types.ulid import ULID
+
+import bulk_import
+from app.api.deps import get_pool
+from app.core.config import get_settings
+from app.main import app
+from app.models.types import ApplicationCreate, ConfigurationCreate
+from app.services.applications_service import ApplicationsService
+from app.services.configurations_service import ConfigurationsService
+from app.services.export_service import ExportService
+
+client = TestClient(app)
+
+BIG = 123456789012345678901234567890
+
+
+def _dataset(seed, apps: int = 2, configs: int = 3) -> dict[str, list[str]]:
+    seeded = {}
+    for a in range(apps):
+        app_id = seed.app(f"export-app-{a}", comments="tab\there")
+        seeded[app_id] = [seed.config(app_id, f"c{c}", {"n": c, "big": BIG}) for c in range(configs)]
+    return seeded
+
+
+def _lines(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def _wipe() -> None:
+    with get_pool().cursor() as (conn, cur):
+        cur.execute("TRUNCATE configurations, applications CASCADE")
+        conn.commit()
+
+
+def test_export_streams_type_tagged_lines_applications_first(seed):
+    seeded = _dataset(seed)
+    r = client.get("/api/v1/export", headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert "content-encoding" not in r.headers
+    lines = _lines(r.content)
+    types = [line["type"] for line in lines]
+    assert types == ["application"] * 2 + ["configuration"] * 6
+    assert {line["id"] for line in lines[:2]} == set(seeded)
+    config = next(line for line in lines if line["type"] == "configuration")
+    assert set(config) == {"type", "id", "application_id", "name", "comments", "version", "config"}
+    assert config["config"]["big"] == BIG and config["version"] == 1
+    assert lines[0]["comments"] == "tab\there"
+
+
+def test_export_is_compressed_on_the_fly(seed):
+    _dataset(seed)
+    r = client.get("/api/v1/export", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(_lines(r.content)) == 8  # httpx decodes the body
+
+
+def test_export_reads_one_snapshot_in_batches(seed):
+    seeded = _dataset(seed, apps=1, configs=5)
+    app_id = next(iter(seeded))
+    chunks = ExportService(get_pool(), itersize=2).export()
+    first = next(chunks)
+    # Written after the snapshot was taken, so not part of this export.
+    ConfigurationsService(get_pool()).create(
+        ConfigurationCreate(id=str(ULID()), application_id=app_id, name="late", config={})
+    )
+    rest = list(chunks)
+    assert [len(c.splitlines()) for c in [first, *rest]] == [1, 2, 2, 1]
+    assert "late" not in {line.get("name") for line in _lines(b"".join(rest))}
+
+
+def test_export_reads_from_a_replica(routed, seed):
+    _dataset(seed, apps=1, configs=2)
+    ApplicationsService(routed).create(ApplicationCreate(id=str(ULID()), name="raises-the-floor"))  # forces a replay check
+    assert len(_lines(b"".join(ExportService(routed, itersize=2).export()))) == 4
+    with routed.get_conn(readonly=True) as conn:
+        # Returned to the pool with the default session, outside a transaction.
+        assert (conn.isolation_level, conn.readonly) == (None, None)
+        assert conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+
+
+def test_import_restores_an_export_and_reports_bad_lines(seed):
+    seeded = _dataset(seed)
+    exported = client.get("/api/v1/export").content
+    _wipe()
+    orphan = {"type": "configuration", "id": str(ULID()), "application_id": str(ULID()), "name": "x", "config": {}}
+    body = exported + b"{not json\n" + b'{"type": "widget"}\n' + json.dumps(orphan).encode() + b"\n"
+    r = client.post(
+        "/api/v1/import",
+        content=gzip.compress(body),
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert report["applications"] == {"inserted": 2, "updated": 0}
+    assert report["configurations"] == {"inserted": 6, "updated": 0}
+    assert [e["line"] for e in report["errors"]] == [9, 10, 11]
+    assert report["errors"][2]["error"] == "application_id does not exist"
+    for app_id, config_ids in seeded.items():
+        assert sorted(client.get(f"/api/v1/applications/{app_id}").json()["configuration_ids"]) == sorted(config_ids)
+    assert client.get(f"/api/v1/configurations/{config_ids[0]}").json()["config"]["big"] == BIG
+
+    # Importing again updates in place; a renamed application keeps its id.
+    again = body.replace(b'"export-app-0"', b'"renamed"', 1)
+    report = client.post("/api/v1/import", content=again).json()
+    assert report["applications"] == {"inserted": 0, "updated": 2}
+    assert report["configurations"] == {"inserted": 0, "updated": 6}
+    names = {a["name"] for a in client.get("/api/v1/applications").json()}
+    assert names == {"renamed", "export-app-1"}
+
+
+def test_import_rejects_conflicting_application_names(seed):
+    _dataset(seed, apps=1, configs=0)
+    line = {"type": "application", "id": str(ULID()), "name": "export-app-0"}
+    report = client.post("/api/v1/import", content=json.dumps(line).encode()).json()
+    assert report["applications"] == {"inserted": 0, "updated": 0}
+    assert report["errors"] == [{"line": 1, "id": line["id"], "error": "Application name must be unique"}]
+
+
+def test_import_rejects_unknown_content_encoding():
+    r = client.post("/api/v1/import", content=b"", headers={"Content-Encoding": "compress"})
+    assert r.status_code == 415
+
+
+def test_import_reports_nul_characters_per_line():
+    app_id = str(ULID())
+    lines = [
+        {"type": "application", "id": app_id, "name": "nul-app"},
+        {"type": "application", "id": str(ULID()), "name": "bad\u0000name"},
+        {"type": "configuration", "id": str(ULID()), "application_id": app_id, "name": "c", "config": {"\u0000": 1}},
+    ]
+    body = b"\n".join(json.dumps(line).encode() for line in lines)
+    report = client.post("/api/v1/import", content=body).json()
+    assert report["applications"] == {"inserted": 1, "updated": 0}
+    errors = [(e["line"], e["error"].split(":")[0]) for e in report["errors"]]
+    assert errors == [(2, "application.name"), (3, "configuration.config")]
+
+
+def test_import_limits_the_inflated_size(monkeypatch):
+    body = b"\n" * 100_000  # blank lines; compresses to a few hundred bytes
+    monkeypatch.setattr(get_settings(), "IMPORT_MAX_BYTES", 50_000)
+    headers = {"Content-Encoding": "gzip"}
+    assert client.post("/api/v1/import", content=gzip.compress(body), headers=headers).status_code == 413
+    assert client.post("/api/v1/import", content=gzip.compress(body)[:-8], headers=headers).status_code == 413
+    monkeypatch.setattr(get_settings(), "IMPORT_MAX_BYTES", len(body))
+    assert client.post("/api/v1/import", content=gzip.compress(body), headers=headers).status_code == 200
+    assert client.post("/api/v1/import", content=b"not gzip", headers=headers).status_code == 400
+
+
+def test_cli_imports_an_export(tmp_path, capsys, seed):
+    _dataset(seed)
+    path = tmp_path / "export.ndjson"
+    path.write_bytes(client.get("/api/v1/export").content)
+    _wipe()
+    assert bulk_import.main(["--from-export", str(path)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["applications"]["inserted"] == 2 and report["configurations"]["inserted"] == 6
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.fastjson import json_bytes
+from app.core.config import get_settings
+from app.main import app
+from app.models.types import ConfigurationOut
+
+client = TestClient(app, headers={"Accept-Encoding": "identity"})
+
+CONFIG = {"limits": {"qps": 10, "ratio": 0.25}, "hosts": ["a", "b"], "on": True, "none": None}
+
+
+@pytest.fixture
+def fast_serialization(monkeypatch):
+    def set(enabled: bool) -> None:
+        monkeypatch.setattr(get_settings(), "FAST_SERIALIZATION", enabled)
+
+    return set
+
+
+def test_fast_path_matches_validated_path(fast_serialization, seed):
+    app_id = seed.app("fast-app", comments="demo")
+    conf_id = seed.config(app_id, "prod", CONFIG)
+    urls = [
+        f"/api/v1/configurations/{conf_id}",
+        "/api/v1/applications/by-name/fast-app/configurations/prod",
+        f"/api/v1/applications/{app_id}",
+        "/api/v1/applications",
+    ]
+    responses = {}
+    for enabled in (False, True):
+        fast_serialization(enabled)
+        responses[enabled] = [client.get(url) for url in urls]
+        responses[enabled].append(client.post("/api/v1/configurations:batchGet", json={"ids": [conf_id, "missing"]}))
+    for slow, fast in zip(responses[False], responses[True]):
+        assert fast.status_code == slow.status_code == 200
+        assert fast.json() == slow.json()
+        assert fast.headers.get("etag") == slow.headers.get("etag")
+        assert fast.headers["content-type"] == "application/json"
+
+
+def test_json_bytes_handles_models_and_big_integers():
+    out = ConfigurationOut.model_construct(
+        id="c", application_id="a", name="n", comments=None, config={"big": 2**70, "s": "é"}, version=1
+    )
+    assert json.loads(json_bytes(out)) == out.model_dump()
+    assert '"big":1180591620717411303424,"s":"é"'.encode() in json_bytes(out)
+    assert json_bytes({"b": 1, "a": [out]}, sort_keys=True).startswith(b'{"a":[{"application_id"')
+
+
+def test_raw_passthrough_matches_parsed_response(monkeypatch, seed):
+    _, conf_id = seed.app_with_config("fast-app", "prod", CONFIG)
+    parsed = client.get(f"/api/v1/configurations/{conf_id}")
+    monkeypatch.setattr(get_settings(), "CONFIG_RAW_PASSTHROUGH", True)
+    raw = client.get(f"/api/v1/configurations/{conf_id}")
+    assert raw.status_code == 200
+    assert raw.json() == parsed.json()
+    assert raw.headers["etag"] == parsed.headers["etag"] == '"v1"'
+    assert raw.headers["content-type"] == "application/json"
+
+    client.put(f"/api/v1/configurations/{conf_id}", json={"config": {"changed": [1, 2]}})
+    updated = client.get(f"/api/v1/configurations/{conf_id}")
+    assert updated.json()["config"] == {"changed": [1, 2]}
+    assert updated.headers["etag"] == '"v2"'
+    assert client.get(f"/api/v1/configurations/{str(ULID())}").status_code == 404
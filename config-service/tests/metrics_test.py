@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.pool import ThreadedConnectionPool
+from pydantic_extra_types.ulid import ULID
+
+from app.api.metrics import REQUEST_DURATION
+from app.core.config import get_settings
+from app.core.metrics import Registry, _Metric
+from app.db import pool as pool_mod
+from app.db.pool import DBPool, dsn_from_settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Requests.", ("code",))
+    in_flight = registry.gauge("demo_in_flight", "In flight.")
+    latency = registry.histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc("200")
+    requests.inc("200", amount=2)
+    in_flight.inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{code="200"} 3' in text
+    assert "demo_in_flight 1" in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+    assert registry.counter("demo_requests_total", "Requests.", ("code",)) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("demo_requests_total", "Clash.")
+    with pytest.raises(ValueError):
+        requests.inc()
+
+
+def test_metric_without_samples_cannot_be_created():
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("demo_incomplete", "Incomplete.")
+
+
+def test_pool_checkout_and_exhaustion_are_recorded():
+    settings = get_settings()
+    db = DBPool(ThreadedConnectionPool(minconn=0, maxconn=1, dsn=dsn_from_settings(settings)))
+    checkouts = pool_mod._CHECKOUT_WAIT.count()
+    holds = pool_mod._HOLD.count()
+    exhausted = pool_mod._EXHAUSTED.value()
+    in_use = pool_mod._IN_USE.value()
+    try:
+        with db.get_conn():
+            assert pool_mod._IN_USE.value() == in_use + 1
+            with pytest.raises(Exception, match="exhausted"):
+                with db.get_conn():
+                    pass
+    finally:
+        db.pool.closeall()
+    assert pool_mod._CHECKOUT_WAIT.count() == checkouts + 1
+    assert pool_mod._HOLD.count() == holds + 1
+    assert pool_mod._EXHAUSTED.value() == exhausted + 1
+    assert pool_mod._IN_USE.value() == in_use
+
+
+def test_request_latency_is_labelled_by_route_template():
+    route = "/api/v1/applications/{id}"
+    before = REQUEST_DURATION.count("GET", route, 404)
+    client.get(f"/api/v1/applications/{ULID()}")
+    client.get(f"/api/v1/applications/{ULID()}")
+    assert REQUEST_DURATION.count("GET", route, 404) == before + 2
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'config_service_http_request_duration_seconds_count{method="GET",route="/api/v1/applications/{id}",status="404"}' in res.text
+    assert "config_service_db_pool_checkout_seconds_bucket" in res.text
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.main import app
+
+client = TestClient(app)
+
+DOC = {"limits": {"qps": 100, "burst": 20}, "flags": {"beta": False}, "hosts": ["a", "b"], "odd/key": {"~x": 1}}
+
+
+def _json_patch(conf_id: str, ops: list):
+    return client.patch(
+        f"/api/v1/configurations/{conf_id}",
+        content=json.dumps(ops),
+        headers={"Content-Type": "application/json-patch+json"},
+    )
+
+
+def _merge_patch(conf_id: str, patch):
+    return client.patch(
+        f"/api/v1/configurations/{conf_id}",
+        content=json.dumps(patch),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+
+
+def test_json_patch_operations(seed):
+    _, conf_id = seed.app_with_config("patch-app", "prod", DOC)
+    r = _json_patch(
+        conf_id,
+        [
+            {"op": "test", "path": "/limits/qps", "value": 100},
+            {"op": "replace", "path": "/limits/qps", "value": 250},
+            {"op": "add", "path": "/hosts/-", "value": "c"},
+            {"op": "add", "path": "/hosts/0", "value": "z"},
+            {"op": "remove", "path": "/limits/burst"},
+            {"op": "copy", "from": "/flags", "path": "/flags_backup"},
+            {"op": "move", "from": "/flags/beta", "path": "/flags/gamma"},
+            {"op": "add", "path": "/odd~1key/~0x", "value": [1, {"n": None}]},
+            {"op": "add", "path": "/new", "value": {"nested": True}},
+        ],
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["version"] == 2
+    assert r.headers["etag"] == '"v2"'
+    assert r.json()["config"] == {
+        "limits": {"qps": 250},
+        "flags": {"gamma": False},
+        "flags_backup": {"beta": False},
+        "hosts": ["z", "a", "b", "c"],
+        "odd/key": {"~x": [1, {"n": None}]},
+        "new": {"nested": True},
+    }
+    assert client.get(f"/api/v1/configurations/{conf_id}").json()["config"] == r.json()["config"]
+
+
+def test_json_patch_preconditions_conflict_without_writing(seed):
+    _, conf_id = seed.app_with_config("patch-app", "prod", DOC)
+    for ops in (
+        [{"op": "test", "path": "/limits/qps", "value": 1}, {"op": "remove", "path": "/limits"}],
+        [{"op": "remove", "path": "/missing"}],
+        [{"op": "replace", "path": "/hosts/9", "value": 1}],
+        [{"op": "add", "path": "/hosts/3", "value": "x"}],
+        [{"op": "add", "path": "/hosts/x", "value": "x"}],
+        [{"op": "add", "path": "/missing/child", "value": 1}],
+        [{"op": "move", "from": "/missing", "path": "/x"}],
+        [{"op": "replace", "path": "", "value": [1]}],
+    ):
+        r = _json_patch(conf_id, ops)
+        assert r.status_code == 409, (ops, r.text)
+    current = client.get(f"/api/v1/configurations/{conf_id}").json()
+    assert current["config"] == DOC and current["version"] == 1
+
+
+def test_json_patch_noop_keeps_version(seed):
+    _, conf_id = seed.app_with_config("patch-app", "prod", DOC)
+    r = _json_patch(conf_id, [{"op": "test", "path": "/hosts/1", "value": "b"}])
+    assert r.status_code == 200
+    assert r.json()["version"] == 1
+
+
+def test_merge_patch(seed):
+    _, conf_id = seed.app_with_config("patch-app", "prod", DOC)
+    r = _merge_patch(conf_id, {"limits": {"qps": 5, "burst": None}, "flags": None, "hosts": ["only"], "x": {"y": 1}})
+    assert r.status_code == 200, r.text
+    assert r.json()["config"] == {"limits": {"qps": 5}, "hosts": ["only"], "odd/key": {"~x": 1}, "x": {"y": 1}}
+    assert r.json()["version"] == 2
+
+
+def test_patch_errors(seed):
+    _, conf_id = seed.app_with_config("patch-app", "prod", DOC)
+    assert _json_patch(str(ULID()), [{"op": "remove", "path": "/a"}]).status_code == 404
+    assert _merge_patch(str(ULID()), {"a": 1}).status_code == 404
+    assert _json_patch(conf_id, [{"op": "add", "path": "/a"}]).status_code == 422
+    assert _json_patch(conf_id, [{"op": "remove", "path": "a"}]).status_code == 422
+    assert _json_patch(conf_id, [{"op": "remove", "path": ""}]).status_code == 422
+    assert _json_patch(conf_id, [{"op": "move", "from": "/limits", "path": "/limits/x"}]).status_code == 422
+    assert _merge_patch(conf_id, [1]).status_code == 422
+    r = client.patch(f"/api/v1/configurations/{conf_id}", json={"limits": None})
+    assert r.status_code == 415
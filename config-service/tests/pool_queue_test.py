@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.pool import ThreadedConnectionPool
+from pydantic_extra_types.ulid import ULID
+
+from app.api import deps
+from app.core.config import get_settings
+from app.db import pool as pool_mod
+from app.db.pool import DBPool, FifoGate, PoolTimeout, dsn_from_settings
+from app.main import app
+
+
+@pytest.fixture
+def small_pool():
+    db = DBPool(
+        ThreadedConnectionPool(minconn=0, maxconn=1, dsn=dsn_from_settings(get_settings())),
+        FifoGate(1),
+        timeout=0.2,
+    )
+    yield db
+    db.pool.closeall()
+
+
+def test_checkout_waits_for_a_released_connection(small_pool):
+    order = []
+
+    def borrow(name: str) -> None:
+        with small_pool.get_conn():
+            order.append(name)
+
+    with small_pool.get_conn():
+        waiter = threading.Thread(target=borrow, args=("waiter",))
+        waiter.start()
+        while small_pool.gate.waiting() == 0:
+            time.sleep(0.001)
+        order.append("holder")
+    waiter.join()
+    assert order == ["holder", "waiter"]
+
+
+def test_checkout_times_out_and_is_counted(small_pool):
+    timeouts = pool_mod._TIMEOUTS.value()
+    with small_pool.get_conn():
+        started = time.perf_counter()
+        with pytest.raises(PoolTimeout):
+            with small_pool.get_conn():
+                pass
+        assert time.perf_counter() - started >= 0.2
+    assert pool_mod._TIMEOUTS.value() == timeouts + 1
+    assert small_pool.gate.waiting() == 0
+    with small_pool.get_conn():  # the timed-out waiter did not leak a permit
+        pass
+
+
+def test_gate_serves_waiters_in_arrival_order():
+    gate = FifoGate(1)
+    gate.acquire(1)
+    served = []
+
+    def wait(i: int) -> None:
+        gate.acquire(5)
+        served.append(i)
+        gate.release()
+
+    threads = []
+    for i in range(5):
+        t = threading.Thread(target=wait, args=(i,))
+        t.start()
+        threads.append(t)
+        while gate.waiting() < i + 1:
+            time.sleep(0.001)
+    gate.release()
+    for t in threads:
+        t.join()
+    assert served == [0, 1, 2, 3, 4]
+
+
+def test_pool_timeout_maps_to_503_with_retry_after(small_pool, monkeypatch):
+    monkeypatch.setattr(deps, "_pool", small_pool)
+    client = TestClient(app)
+    with small_pool.get_conn():
+        res = client.get(f"/api/v1/applications/{ULID()}")
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == str(get_settings().DB_POOL_RETRY_AFTER)
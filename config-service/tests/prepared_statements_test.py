@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+from pydantic_extra_types.ulid import ULID
+
+from app.core.config import get_settings
+from app.db.pool import DBPool
+from app.db.sql import Statement
+from app.repositories.applications_repo import ApplicationsRepo
+from app.repositories.configurations_repo import ConfigurationsRepo
+
+
+def test_statement_numbers_placeholders():
+    st = Statement("demo", "SELECT %s, 5 %% 3 WHERE a = %s")
+    assert st.prepare_sql == "PREPARE demo AS SELECT $1, 5 % 3 WHERE a = $2"
+    assert st.execute_sql == "EXECUTE demo(%s, %s)"
+    assert Statement("plain", "SELECT 1").execute_sql == "EXECUTE plain"
+
+
+def _single_connection_pool(prepared: bool) -> DBPool:
+    settings = get_settings().model_copy(update={"DB_POOL_MIN": 1, "DB_POOL_MAX": 1, "DB_PREPARED_STATEMENTS": prepared})
+    return DBPool.from_settings(settings)
+
+
+def _prepared_names(db: DBPool) -> set[str]:
+    with db.cursor() as (conn, cur):
+        cur.execute("SELECT name FROM pg_prepared_statements")
+        return {r["name"] for r in cur.fetchall()}
+
+
+@pytest.fixture
+def prepared_pool():
+    db = _single_connection_pool(prepared=True)
+    yield db
+    db.pool.closeall()
+
+
+def test_hot_statements_are_prepared_once_per_connection(prepared_pool):
+    apps = ApplicationsRepo(prepared_pool)
+    configs = ConfigurationsRepo(prepared_pool)
+    app_id = str(ULID())
+    apps.create(app_id, "prep-app", None)
+    conf_id = str(ULID())
+    configs.create(conf_id, app_id, "prod", None, {"a": 1})
+
+    with prepared_pool.get_conn() as conn:
+        assert {"applications_insert", "configurations_insert", "pg_notify_change"} <= conn.prepared
+
+    for _ in range(3):
+        assert configs.get(conf_id)["config"] == {"a": 1}
+        assert configs.get_version(conf_id) == 1
+        assert apps.get_with_configuration_ids(app_id)["configuration_ids"] == [conf_id]
+    names = _prepared_names(prepared_pool)
+    assert {"configurations_get", "configurations_get_version", "applications_get_with_ids"} <= names
+
+
+def test_update_shapes_are_cached_by_column_set(prepared_pool):
+    apps = ApplicationsRepo(prepared_pool)
+    configs = ConfigurationsRepo(prepared_pool)
+    app_id = str(ULID())
+    apps.create(app_id, "prep-shapes", None)
+    conf_id = str(ULID())
+    configs.create(conf_id, app_id, "prod", None, {})
+
+    configs.update(conf_id, None, "c1", None)
+    configs.update(conf_id, None, "c2", None)
+    row = configs.update(conf_id, "renamed", None, {"b": 2})
+    assert (row["name"], row["comments"], row["config"], row["version"]) == ("renamed", "c2", {"b": 2}, 4)
+    apps.update_with_configuration_ids(app_id, None, "x")
+
+    names = _prepared_names(prepared_pool)
+    assert {
+        "configurations_update__comments",
+        "configurations_update__name_config",
+        "applications_update_with_ids__comments",
+    } <= names
+
+
+def test_disabled_sends_plain_sql():
+    db = _single_connection_pool(prepared=False)
+    try:
+        app_id = str(ULID())
+        ApplicationsRepo(db).create(app_id, "prep-off", None)
+        assert ApplicationsRepo(db).get(app_id)["name"] == "prep-off"
+        with db.get_conn() as conn:
+            assert not hasattr(conn, "prepared")
+        assert _prepared_names(db) == set()
+    finally:
+        db.pool.closeall()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_config_cache
+from app.main import app
+
+client = TestClient(app)
+
+DOC = {"limits": {"qps": 100, "burst": 20}, "feature_flags": {"beta": True}, "hosts": ["a", "b", "c"]}
+
+
+def _project(conf_id: str, *paths: str):
+    return client.get(f"/api/v1/configurations/{conf_id}", params=[("path", p) for p in paths])
+
+
+def test_projection_from_database_and_cache_agree(seed):
+    _, conf_id = seed.app_with_config("proj-app", "prod", DOC)
+    get_config_cache().clear()
+    expected = {"limits.qps": 100, "feature_flags": {"beta": True}, "hosts.1": "b", "hosts.-1": "c", "nope.x": None}
+    cold = _project(conf_id, *expected)
+    assert cold.status_code == 200
+    body = cold.json()
+    assert body["values"] == expected
+    assert body["version"] == 1 and "config" not in body
+
+    client.get(f"/api/v1/configurations/{conf_id}")  # warm the cache
+    warm = _project(conf_id, *expected)
+    assert warm.json() == body
+    assert warm.headers["etag"] == cold.headers["etag"]
+
+
+def test_projection_of_unusual_array_indexes_matches_postgres(seed):
+    _, conf_id = seed.app_with_config("proj-app", "prod", DOC)
+    get_config_cache().clear()
+    paths = [f"hosts.{seg}" for seg in ("1_0", "+1", " 1", "01", "-0", "1 ", "99999999999")]
+    cold = _project(conf_id, *paths).json()["values"]
+    client.get(f"/api/v1/configurations/{conf_id}")  # warm the cache
+    assert _project(conf_id, *paths).json()["values"] == cold
+    assert cold["hosts.1_0"] is None and cold["hosts.+1"] == "b"
+
+
+def test_projection_etag_depends_on_paths_and_version(seed):
+    _, conf_id = seed.app_with_config("proj-app", "prod", DOC)
+    get_config_cache().clear()
+    qps = _project(conf_id, "limits.qps")
+    burst = _project(conf_id, "limits.burst")
+    full = client.get(f"/api/v1/configurations/{conf_id}")
+    assert len({qps.headers["etag"], burst.headers["etag"], full.headers["etag"]}) == 3
+
+    r = client.get(
+        f"/api/v1/configurations/{conf_id}", params={"path": "limits.qps"}, headers={"If-None-Match": qps.headers["etag"]}
+    )
+    assert r.status_code == 304
+
+    client.put(f"/api/v1/configurations/{conf_id}", json={"config": {"limits": {"qps": 5}}})
+    r = client.get(
+        f"/api/v1/configurations/{conf_id}", params={"path": "limits.qps"}, headers={"If-None-Match": qps.headers["etag"]}
+    )
+    assert r.status_code == 200
+    assert r.json()["values"] == {"limits.qps": 5}
+
+
+def test_projection_errors(seed):
+    _, conf_id = seed.app_with_config("proj-app", "prod", DOC)
+    get_config_cache().clear()
+    assert _project(str(ULID()), "limits").status_code == 404
+    assert _project(conf_id, "limits..qps").status_code == 400
+    assert _project(conf_id, *[f"k{i}" for i in range(33)]).status_code == 400
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+"""Guard against N+1 query regressions on the applications endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+from pydantic_extra_types.ulid import ULID
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def query_log(monkeypatch):
+    """Record every data statement executed through a `RealDictCursor`.
+
+    Change notifications (`pg_notify`) ride in the writing transaction and
+    are not data reads, so they are not counted.
+    """
+    log: list[str] = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        text = query if isinstance(query, str) else query.decode()
+        if "pg_notify" not in text:
+            log.append(text)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    return log
+
+
+def _dataset(seed, apps: int, configs_per_app: int) -> list[str]:
+    app_ids = [seed.app(f"qc-app-{i}") for i in range(apps)]
+    for app_id in app_ids:
+        for j in range(configs_per_app):
+            seed.config(app_id, f"cfg-{j}")
+    return app_ids
+
+
+def test_list_applications_is_a_single_query(query_log, seed):
+    _dataset(seed, apps=6, configs_per_app=3)
+    query_log.clear()
+    r = client.get("/api/v1/applications")
+    assert r.status_code == 200
+    assert len(r.json()) == 6
+    assert all(len(a["configuration_ids"]) == 3 for a in r.json())
+    assert len(query_log) == 1
+
+
+def test_single_application_endpoints_use_one_query_each(query_log, seed):
+    app_id = _dataset(seed, apps=1, configs_per_app=2)[0]
+
+    query_log.clear()
+    g = client.get(f"/api/v1/applications/{app_id}")
+    assert g.status_code == 200
+    assert len(g.json()["configuration_ids"]) == 2
+    assert len(query_log) == 1
+
+    query_log.clear()
+    u = client.put(f"/api/v1/applications/{app_id}", json={"comments": "updated"})
+    assert u.status_code == 200
+    assert len(u.json()["configuration_ids"]) == 2
+    assert len(query_log) == 1
+
+    query_log.clear()
+    c = client.post("/api/v1/applications", json={"id": str(ULID()), "name": "qc-new", "comments": None})
+    assert c.status_code == 201
+    assert c.json()["configuration_ids"] == []
+    assert len(query_log) == 1
+
+
+def test_configuration_ids_are_ordered_by_name(query_log, seed):
+    app_id = seed.app("qc-order")
+    ids = {name: seed.config(app_id, name) for name in ("prod", "default", "staging")}
+    expected = [ids["default"], ids["prod"], ids["staging"]]
+    assert client.get(f"/api/v1/applications/{app_id}").json()["configuration_ids"] == expected
+    listed = next(a for a in client.get("/api/v1/applications").json() if a["id"] == app_id)
+    assert listed["configuration_ids"] == expected
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import time
+
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+from psycopg2.pool import ThreadedConnectionPool
+from pydantic_extra_types.ulid import ULID
+
+from app.api import deps
+from app.core.config import get_settings
+from app.db import consistency
+from app.db import pool as pool_mod
+from app.db.pool import DBPool, Replica, dsn_from_settings, replica_hosts
+from app.main import create_app
+from app.repositories.applications_repo import ApplicationsRepo
+
+# host:port of a streaming replica of the test database, e.g. one created with
+# `pg_basebackup -R` and started on another port. Tests that need real
+# replication lag are skipped without it.
+REPLICA = os.getenv("CONFIG_SERVICE_TEST_REPLICA")
+
+
+def _pool(host: str | None = None, port: int | None = None) -> ThreadedConnectionPool:
+    return ThreadedConnectionPool(minconn=0, maxconn=2, dsn=dsn_from_settings(get_settings(), host, port))
+
+
+def test_lsn_round_trip():
+    assert consistency.parse_lsn("0/16B3748") == 0x16B3748
+    assert consistency.parse_lsn("1/0") == 1 << 32
+    assert consistency.format_lsn(consistency.parse_lsn("AB/CD12")) == "AB/CD12"
+    with pytest.raises(ValueError):
+        consistency.parse_lsn("16B3748")
+
+
+def test_replica_hosts_parsing(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DB_REPLICA_HOSTS", "replica-a:5433, replica-b ,")
+    assert replica_hosts(settings) == [("replica-a", 5433), ("replica-b", settings.DB_PORT)]
+
+
+def test_reads_use_replica_and_writes_record_a_token(routed):
+    repo = ApplicationsRepo(routed)
+    reads = pool_mod._READS.value("self")
+    session, token = consistency.begin()
+    try:
+        repo.create(str(ULID()), "routed-app", None)
+        assert session.written_lsn > 0
+        assert routed.floor_lsn >= session.written_lsn
+        assert [a["name"] for a in repo.list()] == ["routed-app"]
+    finally:
+        consistency.end(token)
+    assert pool_mod._READS.value("self") == reads + 1
+
+
+def test_writes_that_change_nothing_record_no_token(routed):
+    session, token = consistency.begin()
+    try:
+        assert ApplicationsRepo(routed).update(str(ULID()), "missing", None) is None
+        assert session.written_lsn == 0
+    finally:
+        consistency.end(token)
+
+
+def test_committed_write_survives_a_failed_position_read(routed, monkeypatch):
+    monkeypatch.setattr(pool_mod, "_CURRENT_LSN", "SELECT no_such_function()")
+    repo = ApplicationsRepo(routed)
+    session, token = consistency.begin()
+    try:
+        row = repo.create(str(ULID()), "committed", None)
+        assert session.written_lsn == 0
+    finally:
+        consistency.end(token)
+    assert repo.get(row["id"])["name"] == "committed"
+
+
+def test_replica_connections_are_handed_out_outside_a_transaction(routed):
+    ApplicationsRepo(routed).create(str(ULID()), "probe-app", None)  # raises the floor, forcing a replay check
+    assert routed.replicas[0].replay_lsn < routed.floor_lsn
+    with routed.get_conn(readonly=True) as conn:
+        assert routed.replicas[0].replay_lsn >= routed.floor_lsn  # served by the replica after probing
+        assert conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+def test_lagging_replica_falls_back_to_primary(routed):
+    fallbacks = pool_mod._REPLICA_FALLBACKS.value("lagging")
+    primary_reads = pool_mod._READS.value("primary")
+    session, token = consistency.begin(min_lsn=consistency.parse_lsn("FFFFFF/0"))
+    try:
+        assert ApplicationsRepo(routed).list() == []
+    finally:
+        consistency.end(token)
+    assert pool_mod._REPLICA_FALLBACKS.value("lagging") == fallbacks + 1
+    assert pool_mod._READS.value("primary") == primary_reads + 1
+
+
+def test_replica_that_has_replayed_nothing_counts_as_lagging(routed, monkeypatch):
+    monkeypatch.setattr(pool_mod, "_REPLAY_LSN", "SELECT NULL::text")  # pg_last_wal_replay_lsn() before any replay
+    routed.advance_floor(1)
+    fallbacks = pool_mod._REPLICA_FALLBACKS.value("lagging")
+    assert ApplicationsRepo(routed).list() == []
+    assert pool_mod._REPLICA_FALLBACKS.value("lagging") == fallbacks + 1
+    assert routed.replicas[0].healthy and routed.replicas[0].replay_lsn == 0
+
+
+def test_unreachable_replica_is_skipped_until_retry():
+    down = Replica("down", _pool("localhost", 1))
+    db = DBPool(_pool(), replicas=[down], replica_retry_seconds=60)
+    try:
+        assert ApplicationsRepo(db).list() == []
+        assert not down.healthy
+        assert pool_mod._REPLICA_UP.value("down") == 0
+        assert down.down_until > time.monotonic() + 30
+        fallbacks = pool_mod._REPLICA_FALLBACKS.value("unavailable")
+        assert ApplicationsRepo(db).list() == []
+        assert pool_mod._REPLICA_FALLBACKS.value("unavailable") == fallbacks + 1
+    finally:
+        db.pool.closeall()
+
+
+def test_api_returns_token_on_writes_and_validates_it(routed, monkeypatch):
+    monkeypatch.setattr(get_settings(), "DB_REPLICA_HOSTS", "self")
+    monkeypatch.setattr(deps, "_pool", routed)
+    client = TestClient(create_app())
+    app_id = str(ULID())
+    res = client.post("/api/v1/applications", json={"id": app_id, "name": "tokened", "comments": None})
+    assert res.status_code == 201
+    token = res.headers["x-consistency-token"]
+    assert consistency.parse_lsn(token) > 0
+
+    res = client.get(f"/api/v1/applications/{app_id}", headers={"X-Consistency-Token": token})
+    assert res.status_code == 200
+    assert "x-consistency-token" not in res.headers
+    assert client.get("/api/v1/applications", headers={"X-Consistency-Token": "nope"}).status_code == 400
+
+
+@pytest.mark.skipif(not REPLICA, reason="set CONFIG_SERVICE_TEST_REPLICA=host:port to a streaming replica")
+def test_token_reads_are_served_by_a_caught_up_streaming_replica():
+    settings = get_settings()
+    host, port = replica_hosts(settings.model_copy(update={"DB_REPLICA_HOSTS": REPLICA}))[0]
+    replica = Replica(REPLICA, _pool(host, port))
+    db = DBPool(_pool(), replicas=[replica])
+    repo = ApplicationsRepo(db)
+    try:
+        for i in range(20):
+            session, token = consistency.begin()
+            try:
+                app_id = str(ULID())
+                repo.create(app_id, f"replicated-{i}", None)
+                # Never stale: either the replica caught up or the primary answered.
+                assert repo.get(app_id)["name"] == f"replicated-{i}"
+            finally:
+                consistency.end(token)
+        reads = pool_mod._READS.value(REPLICA)
+        deadline = time.monotonic() + 10
+        while pool_mod._READS.value(REPLICA) == reads and time.monotonic() < deadline:
+            repo.list()
+            time.sleep(0.05)
+        assert pool_mod._READS.value(REPLICA) > reads
+        with psycopg2.connect(dsn_from_settings(settings, host, port)) as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_is_in_recovery()")
+            assert cur.fetchone()[0] is True
+    finally:
+        db.pool.closeall()
+        replica.pool.closeall()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+from psycopg2.extras import RealDictCursor
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_change_listener, get_pool, get_resolve_cache
+from app.main import app
+from app.models.types import ConfigurationUpdate
+from app.services.configurations_service import ConfigurationsService
+
+client = TestClient(app)
+
+
+def _resolve(app_id: str, *layers: str, **kwargs):
+    return client.get(
+        f"/api/v1/applications/{app_id}/configurations:resolve", params=[("layers", l) for l in layers], **kwargs
+    )
+
+
+def _layers(seed) -> tuple[str, dict[str, str]]:
+    app_id = seed.app("layered")
+    docs = {
+        "default": {"db": {"host": "localhost", "pool": 5}, "features": ["a"], "debug": True},
+        "prod": {"db": {"host": "db.prod"}, "features": ["a", "b"], "debug": False},
+    }
+    return app_id, {name: seed.config(app_id, name, doc) for name, doc in docs.items()}
+
+
+def test_resolve_deep_merges_in_order(seed):
+    app_id, ids = _layers(seed)
+    r = _resolve(app_id, "default", "prod")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["config"] == {"db": {"host": "db.prod", "pool": 5}, "features": ["a", "b"], "debug": False}
+    assert [(l["name"], l["id"], l["version"]) for l in body["layers"]] == [
+        ("default", ids["default"], 1),
+        ("prod", ids["prod"], 1),
+    ]
+    assert _resolve(app_id, "prod", "default").json()["config"]["db"]["host"] == "localhost"
+    assert _resolve(app_id, "default", "prod", headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+
+
+def test_resolve_is_memoized_and_invalidated_by_updates(monkeypatch, seed):
+    app_id, ids = _layers(seed)
+    first = _resolve(app_id, "default", "prod")
+
+    queries = []
+    original = RealDictCursor.execute
+
+    def execute(self, query, vars=None):
+        queries.append(query)
+        return original(self, query, vars)
+
+    monkeypatch.setattr(RealDictCursor, "execute", execute)
+    assert _resolve(app_id, "default", "prod").json() == first.json()
+    assert queries == []
+    monkeypatch.undo()
+
+    client.put(f"/api/v1/configurations/{ids['default']}", json={"config": {"db": {"pool": 20}}})
+    second = _resolve(app_id, "default", "prod")
+    assert second.json()["config"] == {"db": {"host": "db.prod", "pool": 20}, "features": ["a", "b"], "debug": False}
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+def test_resolve_follows_writes_from_other_workers(seed):
+    assert get_change_listener().wait_ready(timeout=5)
+    app_id, ids = _layers(seed)
+    _resolve(app_id, "default", "prod")
+    # A service without caches stands in for another worker process.
+    ConfigurationsService(get_pool()).update(ids["prod"], ConfigurationUpdate(config={"debug": True}))
+    deadline = time.monotonic() + 2
+    while get_resolve_cache().get(app_id) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _resolve(app_id, "default", "prod").json()["config"]["debug"] is True
+
+
+def test_resolve_missing_layer(seed):
+    app_id, _ = _layers(seed)
+    r = _resolve(app_id, "default", "qa")
+    assert r.status_code == 404
+    assert "qa" in r.json()["detail"]
+    assert _resolve(str(ULID()), "default").status_code == 404
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import copy
+import json
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_pool
+from app.core.jsondiff import apply_diff
+from app.main import app
+
+client = TestClient(app)
+
+
+def _sql_diff(old: dict, new: dict) -> dict:
+    with get_pool().cursor() as (conn, cur):
+        cur.execute("SELECT config_jsonb_diff(%s::jsonb, %s::jsonb) AS d", (json.dumps(old), json.dumps(new)))
+        return cur.fetchone()["d"]
+
+
+def test_sql_diff_round_trips_through_apply_diff():
+    cases = [
+        ({}, {"a": 1}),
+        ({"a": 1, "b": {"c": [1, 2], "d": None}}, {"a": 1, "b": {"c": [1, 2, 3]}}),
+        ({"a": {"b": {"c": 1}}, "x": True}, {"a": {"b": {"c": 2, "e": {}}}, "y": None}),
+        ({"a": {"b": 1}}, {"a": [1]}),
+        ({"a": 1}, {"a": 1}),
+    ]
+    for old, new in cases:
+        diff = _sql_diff(old, new)
+        assert apply_diff(old, diff) == new
+    assert _sql_diff({"a": 1, "big": list(range(100))}, {"a": 2, "big": list(range(100))}) == {"s": {"a": 2}}
+
+
+def test_every_revision_is_reconstructed_across_checkpoints(seed):
+    doc = {"limits": {"qps": 0}, "flags": {}, "hosts": ["a"]}
+    _, conf_id = seed.app_with_config("rev-app", "prod", doc)
+    history = {1: copy.deepcopy(doc)}
+    for v in range(2, 71):
+        doc["limits"]["qps"] = v
+        if v % 5 == 0:
+            doc["flags"][f"f{v}"] = True
+        if v % 7 == 0:
+            doc["flags"].pop(f"f{v - 2}", None)
+        r = client.put(f"/api/v1/configurations/{conf_id}", json={"config": doc})
+        assert r.json()["version"] == v
+        history[v] = copy.deepcopy(doc)
+    client.put(f"/api/v1/configurations/{conf_id}", json={"comments": "no config change"})
+    history[71] = copy.deepcopy(doc)
+
+    for v, expected in history.items():
+        r = client.get(f"/api/v1/configurations/{conf_id}/revisions/{v}")
+        assert r.status_code == 200, v
+        assert r.json()["config"] == expected, v
+
+    with get_pool().cursor() as (conn, cur):
+        cur.execute("SELECT revision FROM configuration_revisions WHERE configuration_id = %s AND depth = 0", (conf_id,))
+        assert sorted(r["revision"] for r in cur.fetchall()) == [1, 33, 65]
+
+
+def test_revision_list_is_paginated_newest_first(seed):
+    _, conf_id = seed.app_with_config("rev-app", "prod", {"n": 0})
+    for n in range(1, 6):
+        client.put(f"/api/v1/configurations/{conf_id}", json={"config": {"n": n}})
+
+    first = client.get(f"/api/v1/configurations/{conf_id}/revisions", params={"limit": 4}).json()
+    assert [r["revision"] for r in first["revisions"]] == [6, 5, 4, 3]
+    assert first["next_before"] == 3
+    second = client.get(
+        f"/api/v1/configurations/{conf_id}/revisions", params={"limit": 4, "before": first["next_before"]}
+    ).json()
+    assert [r["revision"] for r in second["revisions"]] == [2, 1]
+    assert second["revisions"][-1]["checkpoint"] is True
+    assert second["next_before"] is None
+
+
+def test_revision_not_found(seed):
+    _, conf_id = seed.app_with_config("rev-app", "prod", {})
+    assert client.get(f"/api/v1/configurations/{conf_id}/revisions/2").status_code == 404
+    assert client.get(f"/api/v1/configurations/{str(ULID())}/revisions/1").status_code == 404
+    assert client.get(f"/api/v1/configurations/{str(ULID())}/revisions").status_code == 404
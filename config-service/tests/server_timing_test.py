@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.core import timing
+from app.core.config import get_settings
+from app.main import app, create_app
+
+ENTRY = re.compile(r"^([a-z-]+);dur=(\d+\.\d{3})$")
+
+
+@pytest.fixture
+def timed_client(monkeypatch):
+    monkeypatch.setattr(get_settings(), "SERVER_TIMING_ENABLED", True)
+    return TestClient(create_app())
+
+
+def _metrics(header: str) -> dict[str, float]:
+    out = {}
+    for entry in header.split(", "):
+        match = ENTRY.match(entry)
+        assert match, entry
+        out[match.group(1)] = float(match.group(2))
+    return out
+
+
+def test_read_reports_db_model_encode_and_total(timed_client, seed):
+    app_id, _ = seed.app_with_config("timed", "prod", {"a": 1})
+
+    res = timed_client.get(f"/api/v1/applications/{app_id}")
+    assert res.status_code == 200
+    metrics = _metrics(res.headers["server-timing"])
+    assert {"db-wait", "db", "model", "encode", "total"} <= metrics.keys()
+    assert metrics["total"] >= metrics["db"]
+
+
+def test_header_is_off_by_default():
+    res = TestClient(app).get(f"/api/v1/applications/{ULID()}")
+    assert res.status_code == 404
+    assert "server-timing" not in res.headers
+
+
+def test_hooks_are_noops_outside_a_timed_request():
+    with timing.timed("db"):
+        pass
+    timing.record("db", 1.0)
+    assert timing.timed_factory("model", dict)(a=1) == {"a": 1}
+
+    timings, token = timing.begin()
+    try:
+        timing.record("db", 0.002)
+        timing.record("db", 0.001)
+    finally:
+        timing.end(token)
+    assert timing.header_value(timings) == "db;dur=3.000"
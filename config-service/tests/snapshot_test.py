@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_pool
+from app.core.cache import LRUCache
+from app.main import app
+from app.services.configurations_service import ConfigurationsService
+from app.services.snapshot_service import SnapshotService
+
+client = TestClient(app)
+
+
+def _sql(statement: str, params: tuple = ()) -> None:
+    with get_pool().cursor() as (conn, cur):
+        cur.execute(statement, params)
+        conn.commit()
+
+
+def _wait_for_lock_waiters(count: int) -> None:
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with get_pool().cursor() as (conn, cur):
+            cur.execute("SELECT count(*) AS n FROM pg_locks WHERE NOT granted")
+            waiting = cur.fetchone()["n"]
+            conn.rollback()
+        if waiting >= count:
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"expected {count} blocked transactions")
+
+
+def test_full_snapshot_is_tagged_with_the_database_snapshot(seed):
+    app_id = seed.app("snap-app")
+    config_id = seed.config(app_id, "base", {"a": 1})
+    r = client.get("/api/v1/snapshot")
+    assert r.status_code == 200
+    bundle = r.json()
+    assert bundle["since"] is None
+    assert r.headers["etag"].startswith('"s')
+    assert bundle["applications"] == [{"id": app_id, "name": "snap-app", "comments": None}]
+    assert bundle["configurations"] == [
+        {"id": config_id, "application_id": app_id, "name": "base", "comments": None, "version": 1, "config": {"a": 1}}
+    ]
+    assert bundle["deleted"] == {"applications": [], "configurations": []}
+
+    r = client.get("/api/v1/snapshot", headers={"If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+
+
+def test_delta_returns_only_changes_and_deletions(seed):
+    app_id = seed.app("delta-app")
+    kept = seed.config(app_id, "kept", {"a": 1})
+    changed = seed.config(app_id, "changed", {"a": 1})
+    gone = seed.config(app_id, "gone", {})
+    seq = client.get("/api/v1/snapshot").json()["seq"]
+
+    client.put(f"/api/v1/configurations/{changed}", json={"config": {"a": 2}})
+    added = seed.app("delta-added")
+    _sql("DELETE FROM configurations WHERE id = %s", (gone,))
+
+    delta = client.get("/api/v1/snapshot", params={"since": seq}).json()
+    assert delta["since"] == seq and delta["seq"] > seq
+    assert [a["id"] for a in delta["applications"]] == [added]
+    assert [(c["id"], c["version"], c["config"]) for c in delta["configurations"]] == [(changed, 2, {"a": 2})]
+    assert delta["deleted"] == {"applications": [], "configurations": [gone]}
+    assert kept not in json.dumps(delta)
+
+    latest = client.get("/api/v1/snapshot", params={"since": delta["seq"]}).json()
+    assert latest["seq"] == delta["seq"] and latest["configurations"] == [] and latest["deleted"]["configurations"] == []
+
+
+def test_writers_do_not_wait_for_each_other_and_deltas_catch_up(seed):
+    app_id = seed.app("mvcc")
+    slow, fast = seed.config(app_id, "slow", {"a": 1}), seed.config(app_id, "fast", {"a": 1})
+    seq = client.get("/api/v1/snapshot").json()["seq"]
+    with get_pool().cursor() as (writer, cur), ThreadPoolExecutor(max_workers=1) as pool:
+        cur.execute("UPDATE configurations SET config = '{\"a\": 2}' WHERE id = %s", (slow,))
+        cur.execute("SELECT pg_current_xact_id()::text::bigint AS xid")
+        open_xid = cur.fetchone()["xid"]
+        # Neither another write nor a read waits for the open transaction.
+        put = pool.submit(client.put, f"/api/v1/configurations/{fast}", json={"config": {"a": 2}})
+        assert put.result(timeout=5).status_code == 200
+        assert client.get("/api/v1/snapshot").status_code == 200
+        delta = client.get("/api/v1/snapshot", params={"since": seq}).json()
+        assert [c["id"] for c in delta["configurations"]] == [fast]
+        assert delta["seq"] <= open_xid
+        writer.commit()
+    caught_up = client.get("/api/v1/snapshot", params={"since": delta["seq"]}).json()
+    assert (slow, {"a": 2}) in [(c["id"], c["config"]) for c in caught_up["configurations"]]
+
+
+def test_delta_before_a_truncate_falls_back_to_a_full_snapshot(seed):
+    seed.app("before-truncate")
+    seq = client.get("/api/v1/snapshot").json()["seq"]
+    _sql("TRUNCATE configurations, applications CASCADE")
+    fresh = seed.app("after-truncate")
+    for since in (seq, 10**12):  # before the floor; not a sequence of this database
+        bundle = client.get("/api/v1/snapshot", params={"since": since}).json()
+        assert bundle["since"] is None
+        assert [a["id"] for a in bundle["applications"]] == [fresh]
+
+
+def test_full_bundle_is_built_once_per_snapshot(seed):
+    seed.app("cached")
+    svc = SnapshotService(get_pool(), cache=LRUCache(max_entries=8, max_bytes=1 << 20))
+    builds = []
+    stream = svc.repo.stream
+    svc.repo.stream = lambda since, itersize: builds.append(since) or stream(since, itersize)
+    first = svc.snapshot()
+    assert svc.snapshot() == first and len(builds) == 1
+    seed.app("cached-2")
+    assert svc.snapshot()[0] != first[0] and len(builds) == 2
+
+
+def test_snapshot_is_served_compressed_from_the_cache(seed):
+    app_id = seed.app("compressed")
+    for i in range(20):
+        seed.config(app_id, f"c{i}", {"payload": "x" * 200})
+    r = client.get("/api/v1/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["etag"].startswith('W/"s')
+    assert len(r.json()["configurations"]) == 20
+    again = client.get("/api/v1/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert again.headers["etag"] == r.headers["etag"] and again.content == r.content
+
+
+def test_bundle_is_rendered_in_batches(seed):
+    app_id = seed.app("batched")
+    ids = sorted(seed.config(app_id, f"c{i}", {"i": i}) for i in range(5))
+    seq = client.get("/api/v1/snapshot").json()["seq"]
+    _sql("DELETE FROM configurations WHERE id = ANY(%s)", (ids[:3],))
+    svc = SnapshotService(get_pool(), itersize=2)
+    bundle = json.loads(b"".join(svc.snapshot()[1].chunks()))
+    assert [c["id"] for c in bundle["configurations"]] == ids[3:]
+    delta = json.loads(b"".join(svc.delta(seq).chunks()))
+    assert delta["configurations"] == [] and delta["deleted"] == {"applications": [], "configurations": ids[:3]}
+
+
+def test_oversized_bundle_is_refused(seed):
+    app_id = seed.app("oversized")
+    seed.config(app_id, "big", {"payload": "x" * 4096})
+    svc = SnapshotService(get_pool(), max_bytes=1024)
+    with pytest.raises(HTTPException) as e:
+        svc.snapshot()
+    assert e.value.status_code == 507
+
+
+def test_import_and_patch_on_the_same_rows_do_not_deadlock(seed):
+    app_id = seed.app("deadlock")
+    first, held, patched = (seed.config(app_id, name, {"a": 1}) for name in ("first", "held", "patched"))
+    lines = [
+        json.dumps({"id": id, "application_id": app_id, "name": name, "config": {"a": 2}})
+        for id, name in ((first, "first"), (held, "held"), (patched, "patched"))
+    ]
+    with get_pool().cursor() as (blocker, cur), ThreadPoolExecutor(max_workers=2) as pool:
+        # Stall the import on its second row, after it has written the first.
+        cur.execute("SELECT 1 FROM configurations WHERE id = %s FOR UPDATE", (held,))
+        imported = pool.submit(ConfigurationsService(get_pool()).bulk_import, lines)
+        _wait_for_lock_waiters(1)
+        # The patch targets a row the import has yet to reach, so it need not wait.
+        merged = pool.submit(ConfigurationsService(get_pool()).merge_patch, patched, {"b": 1})
+        assert merged.result(timeout=10).config == {"a": 1, "b": 1}
+        blocker.rollback()
+        assert imported.result(timeout=10).updated == 3
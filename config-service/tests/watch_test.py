@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from pydantic_extra_types.ulid import ULID
+
+from app.api.deps import get_change_listener, get_pool, get_watch_hub
+from app.main import app
+from app.repositories.configurations_repo import ConfigurationsRepo
+
+client = TestClient(app)
+
+
+def test_watch_returns_immediately_when_already_newer(seed):
+    _, conf_id = seed.app_with_config("watch-app", "w", {"n": 1})
+    r = client.get(f"/api/v1/configurations/{conf_id}/watch", params={"version": 0, "timeout": 5})
+    assert r.status_code == 200
+    assert r.json()["version"] == 1
+
+
+def test_watch_times_out_with_304(seed):
+    _, conf_id = seed.app_with_config("watch-app", "w", {"n": 1})
+    started = time.monotonic()
+    r = client.get(f"/api/v1/configurations/{conf_id}/watch", params={"version": 1, "timeout": 0.2})
+    assert r.status_code == 304
+    assert r.headers["etag"] == '"v1"'
+    assert time.monotonic() - started < 2
+    assert get_watch_hub().waiting() == 0
+
+
+def test_watch_wakes_on_change_from_another_worker(seed):
+    assert get_change_listener().wait_ready(timeout=5)
+    _, conf_id = seed.app_with_config("watch-app", "w", {"n": 1})
+    result = {}
+
+    def watch():
+        result["r"] = client.get(f"/api/v1/configurations/{conf_id}/watch", params={"version": 1, "timeout": 10})
+
+    t = threading.Thread(target=watch)
+    t.start()
+    deadline = time.monotonic() + 5
+    while get_watch_hub().waiting() == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    ConfigurationsRepo(get_pool()).update(conf_id, None, None, {"n": 2})
+    t.join(timeout=10)
+    assert time.monotonic() - started < 2
+    assert result["r"].status_code == 200
+    assert result["r"].json()["version"] == 2
+    assert result["r"].json()["config"] == {"n": 2}
+
+
+def test_watch_missing_configuration():
+    r = client.get(f"/api/v1/configurations/{ULID()}/watch", params={"version": 0, "timeout": 1})
+    assert r.status_code == 404
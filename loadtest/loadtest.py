@@ -0,0 +1,477 @@
+#!/usr/bin/env python
+"""HTTP load generator for config-service and config-service-b.
+
+Both services expose the same `/api/v1` resources, so one scenario drives
+either on equal footing: data is seeded through the public API, then a
+weighted mix of operations runs for a fixed duration, and latency
+percentiles, throughput and error rates are written as JSON.
+
+Two load models:
+- closed loop (`--concurrency N`): N workers each send the next request as
+  soon as the previous one completes; throughput is an output.
+- open loop (`--rps R`): requests start on a fixed schedule regardless of
+  how fast responses arrive. Latency is measured from the scheduled start,
+  so a stalled server shows up as queueing delay (no coordinated omission).
+
+Usage:
+  python loadtest/loadtest.py run loadtest/scenarios/read_heavy.json \\
+      --base-url http://localhost:8000 --label a --out results/a.json
+  python loadtest/loadtest.py run loadtest/scenarios/mixed.json --rps 500 --out results/b.json
+  python loadtest/loadtest.py compare results/a.json results/b.json --threshold 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+API = "/api/v1"
+
+
+# --------------------------------------------------------------------------
+# Scenarios and seeding
+# --------------------------------------------------------------------------
+
+
+@dataclass
+class Scenario:
+    """A weighted operation mix plus the dataset it runs against."""
+
+    name: str
+    mix: dict[str, float]
+    description: str = ""
+    applications: int = 20
+    configurations_per_application: int = 5
+    config_kb: float = 1.0
+    duration: float = 30.0
+    warmup: float = 5.0
+    concurrency: int = 16
+    rps: float | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> "Scenario":
+        """Read a scenario JSON file (see `loadtest/scenarios/`)."""
+        raw = json.loads(path.read_text())
+        seed = raw.pop("seed", {})
+        scenario = cls(**raw, **seed)
+        unknown = set(scenario.mix) - set(OPERATIONS)
+        if unknown:
+            raise SystemExit(f"{path}: unknown operations {sorted(unknown)}; known: {sorted(OPERATIONS)}")
+        return scenario
+
+
+def make_config(kb: float, rng: random.Random) -> dict:
+    """Build a nested configuration document of roughly `kb` KiB of JSON."""
+    doc: dict = {}
+    i = 0
+    while len(json.dumps(doc)) < kb * 1024:
+        doc[f"section_{i}"] = {
+            "enabled": rng.random() < 0.5,
+            "threshold": round(rng.uniform(0, 100), 3),
+            "targets": [f"host-{i}-{j}.example.internal" for j in range(3)],
+            "limits": {"qps": rng.randint(1, 10_000), "burst": rng.randint(1, 100)},
+        }
+        i += 1
+    return doc
+
+
+@dataclass
+class Dataset:
+    """Ids created by `seed`, sampled by operations."""
+
+    run_id: str
+    applications: list[str] = field(default_factory=list)
+    configurations: list[tuple[str, str, str]] = field(default_factory=list)  # (id, application id, name)
+    etags: dict[str, str] = field(default_factory=dict)
+
+
+def _check(res: httpx.Response, what: str) -> dict:
+    if res.status_code >= 400:
+        raise SystemExit(f"seeding failed creating {what}: HTTP {res.status_code} {res.text[:200]}")
+    return res.json()
+
+
+async def seed(client: httpx.AsyncClient, scenario: Scenario, rng: random.Random, parallel: int = 16) -> Dataset:
+    """Create the scenario's applications and configurations through the API.
+
+    Ids are taken from responses, since config-service-b generates its own.
+    """
+    data = Dataset(run_id=uuid.uuid4().hex[:8])
+    sem = asyncio.Semaphore(parallel)
+    body = make_config(scenario.config_kb, rng)
+
+    async def create_app(i: int) -> None:
+        async with sem:
+            res = await client.post(
+                f"{API}/applications",
+                json={"id": _ulid(rng), "name": f"lt-{data.run_id}-{i}", "comments": ""},
+            )
+            app = _check(res, "an application")
+            data.applications.append(str(app["id"]))
+
+    async def create_config(app_id: str, j: int) -> None:
+        async with sem:
+            res = await client.post(
+                f"{API}/configurations",
+                json={"id": _ulid(rng), "application_id": app_id, "name": f"cfg-{j}", "comments": "", "config": body},
+            )
+            conf = _check(res, "a configuration")
+            data.configurations.append((str(conf["id"]), app_id, conf["name"]))
+
+    await asyncio.gather(*(create_app(i) for i in range(scenario.applications)))
+    await asyncio.gather(
+        *(create_config(a, j) for a in data.applications for j in range(scenario.configurations_per_application))
+    )
+    return data
+
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def _ulid(rng: random.Random) -> str:
+    """Return a ULID-shaped id (time prefix plus seeded randomness)."""
+    value = (int(time.time() * 1000) << 80) | rng.getrandbits(80)
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+# --------------------------------------------------------------------------
+# Operations
+# --------------------------------------------------------------------------
+
+Operation = Callable[[httpx.AsyncClient, Dataset, random.Random], Awaitable[httpx.Response]]
+
+
+async def get_configuration(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    conf_id = rng.choice(data.configurations)[0]
+    return await client.get(f"{API}/configurations/{conf_id}")
+
+
+async def poll_configuration(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    """Conditional GET as a polling client would send it; 304 counts as success."""
+    conf_id = rng.choice(data.configurations)[0]
+    etag = data.etags.get(conf_id)
+    res = await client.get(f"{API}/configurations/{conf_id}", headers={"If-None-Match": etag} if etag else None)
+    if res.status_code == 200 and "etag" in res.headers:
+        data.etags[conf_id] = res.headers["etag"]
+    return res
+
+
+async def get_application(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    return await client.get(f"{API}/applications/{rng.choice(data.applications)}")
+
+
+async def list_applications(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    return await client.get(f"{API}/applications")
+
+
+async def update_configuration(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    conf_id, app_id, name = rng.choice(data.configurations)
+    # Full-document bodies are accepted by both services' PUT.
+    body = {
+        "application_id": app_id,
+        "name": name,
+        "comments": "",
+        "config": {"rev": rng.getrandbits(32), "flags": {f"f{i}": rng.random() < 0.5 for i in range(8)}},
+    }
+    return await client.put(f"{API}/configurations/{conf_id}", json=body)
+
+
+async def create_configuration(client: httpx.AsyncClient, data: Dataset, rng: random.Random) -> httpx.Response:
+    app_id = rng.choice(data.applications)
+    name = f"new-{uuid.uuid4().hex[:12]}"
+    body = {
+        "id": _ulid(rng),
+        "application_id": app_id,
+        "name": name,
+        "comments": "",
+        "config": {"created": True, "n": rng.getrandbits(16)},
+    }
+    res = await client.post(f"{API}/configurations", json=body)
+    if res.status_code < 300:
+        data.configurations.append((str(res.json()["id"]), app_id, name))
+    return res
+
+
+OPERATIONS: dict[str, Operation] = {
+    "get_configuration": get_configuration,
+    "poll_configuration": poll_configuration,
+    "get_application": get_application,
+    "list_applications": list_applications,
+    "update_configuration": update_configuration,
+    "create_configuration": create_configuration,
+}
+
+
+# --------------------------------------------------------------------------
+# Running and reporting
+# --------------------------------------------------------------------------
+
+
+@dataclass
+class Sample:
+    op: str
+    started: float
+    latency: float
+    status: int  # 0 for transport errors
+
+
+def _is_error(status: int) -> bool:
+    return status == 0 or status >= 400
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values (0 for none)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    """Aggregate samples into latency (ms), throughput and error figures."""
+    latencies = sorted(s.latency * 1000 for s in samples)
+    errors = sum(1 for s in samples if _is_error(s.status))
+    statuses: dict[str, int] = {}
+    for s in samples:
+        statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        },
+        "status_codes": dict(sorted(statuses.items())),
+    }
+
+
+async def _timed(op: str, client: httpx.AsyncClient, data: Dataset, rng: random.Random, started: float) -> Sample:
+    try:
+        res = await OPERATIONS[op](client, data, rng)
+        status = res.status_code
+    except httpx.HTTPError:
+        status = 0
+    return Sample(op, started, time.perf_counter() - started, status)
+
+
+async def closed_loop(client, data, scenario, rng, stop_at) -> list[Sample]:
+    """Run `scenario.concurrency` workers back to back until `stop_at`."""
+    ops, weights = list(scenario.mix), list(scenario.mix.values())
+    samples: list[Sample] = []
+
+    async def worker(seed: int) -> None:
+        local = random.Random(seed)
+        while time.perf_counter() < stop_at:
+            op = local.choices(ops, weights)[0]
+            samples.append(await _timed(op, client, data, local, time.perf_counter()))
+
+    await asyncio.gather(*(worker(rng.getrandbits(32)) for _ in range(scenario.concurrency)))
+    return samples
+
+
+async def open_loop(client, data, scenario, rng, stop_at, max_inflight: int) -> tuple[list[Sample], int]:
+    """Start requests at `scenario.rps` until `stop_at`; returns samples and dropped arrivals."""
+    ops, weights = list(scenario.mix), list(scenario.mix.values())
+    samples: list[Sample] = []
+    tasks: set[asyncio.Task] = set()
+    interval = 1.0 / scenario.rps
+    dropped = 0
+    next_at = time.perf_counter()
+    while next_at < stop_at:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_inflight:
+            dropped += 1
+        else:
+            op = rng.choices(ops, weights)[0]
+            task = asyncio.create_task(_timed(op, client, data, random.Random(rng.getrandbits(32)), next_at))
+            task.add_done_callback(lambda t: (tasks.discard(t), samples.append(t.result())))
+            tasks.add(task)
+        next_at += interval
+    if tasks:
+        await asyncio.wait(tasks)
+    return samples, dropped
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    scenario = Scenario.load(Path(args.scenario))
+    for name in ("duration", "warmup", "concurrency", "rps"):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(scenario, name, value)
+    if args.concurrency is not None:
+        scenario.rps = None  # an explicit closed loop overrides a scenario's rps
+    rng = random.Random(args.seed)
+    parallel = scenario.concurrency if scenario.rps is None else args.max_inflight
+    limits = httpx.Limits(max_connections=parallel, max_keepalive_connections=parallel)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        data = await seed(client, scenario, rng)
+        print(
+            f"seeded {len(data.applications)} applications, {len(data.configurations)} configurations",
+            file=sys.stderr,
+        )
+        dropped = 0
+        started = time.perf_counter()
+        stop_at = started + scenario.warmup + scenario.duration
+        if scenario.rps is None:
+            samples = await closed_loop(client, data, scenario, rng, stop_at)
+        else:
+            samples, dropped = await open_loop(client, data, scenario, rng, stop_at, args.max_inflight)
+
+    measured_from = started + scenario.warmup
+    measured = [s for s in samples if s.started >= measured_from]
+    elapsed = min(scenario.duration, time.perf_counter() - measured_from)
+    by_op: dict[str, list[Sample]] = {}
+    for s in measured:
+        by_op.setdefault(s.op, []).append(s)
+    result = {
+        "label": args.label or args.base_url,
+        "base_url": args.base_url,
+        "scenario": scenario.name,
+        "mode": "closed" if scenario.rps is None else "open",
+        "concurrency": scenario.concurrency if scenario.rps is None else None,
+        "target_rps": scenario.rps,
+        "duration_s": scenario.duration,
+        "warmup_s": scenario.warmup,
+        "seed": args.seed,
+        "dataset": {
+            "applications": scenario.applications,
+            "configurations_per_application": scenario.configurations_per_application,
+            "config_kb": scenario.config_kb,
+        },
+        **summarize(measured, elapsed),
+        "dropped": dropped,
+        "operations": {op: summarize(ss, elapsed) for op, ss in sorted(by_op.items())},
+    }
+    return result
+
+
+# --------------------------------------------------------------------------
+# Comparison
+# --------------------------------------------------------------------------
+
+
+def _change(base: float, new: float) -> float:
+    if base == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - base) / base * 100
+
+
+def compare(base: dict, new: dict, threshold: float, error_threshold: float, min_requests: int = 100) -> list[str]:
+    """Print a side-by-side table and return regression descriptions.
+
+    Regressions: a latency percentile or mean more than `threshold` percent
+    higher, throughput more than `threshold` percent lower (closed loop
+    only, since open-loop throughput is fixed by the schedule), or an error
+    rate more than `error_threshold` percentage points higher. Operations
+    with fewer than `min_requests` samples in either run are not checked.
+    """
+    regressions: list[str] = []
+    rows: list[tuple[str, float, float]] = []
+
+    def check(scope: str, b: dict, n: dict) -> None:
+        for key in ("p50", "p95", "p99", "mean"):
+            bv, nv = b["latency_ms"][key], n["latency_ms"][key]
+            rows.append((f"{scope} {key} ms", bv, nv))
+            if _change(bv, nv) > threshold:
+                regressions.append(f"{scope} {key} latency {bv:.2f} -> {nv:.2f} ms ({_change(bv, nv):+.1f}%)")
+        rows.append((f"{scope} throughput rps", b["throughput_rps"], n["throughput_rps"]))
+        if base["mode"] == "closed" and _change(b["throughput_rps"], n["throughput_rps"]) < -threshold:
+            regressions.append(
+                f"{scope} throughput {b['throughput_rps']:.1f} -> {n['throughput_rps']:.1f} rps "
+                f"({_change(b['throughput_rps'], n['throughput_rps']):+.1f}%)"
+            )
+        rows.append((f"{scope} error rate %", b["error_rate"] * 100, n["error_rate"] * 100))
+        if (n["error_rate"] - b["error_rate"]) * 100 > error_threshold:
+            regressions.append(f"{scope} error rate {b['error_rate']:.2%} -> {n['error_rate']:.2%}")
+
+    if (base["scenario"], base["mode"]) != (new["scenario"], new["mode"]):
+        print(
+            f"warning: comparing {base['scenario']}/{base['mode']} with {new['scenario']}/{new['mode']}",
+            file=sys.stderr,
+        )
+    check("overall", base, new)
+    for op in sorted(set(base["operations"]) & set(new["operations"])):
+        b, n = base["operations"][op], new["operations"][op]
+        if min(b["requests"], n["requests"]) >= min_requests:
+            check(op, b, n)
+
+    width = max(len(r[0]) for r in rows)
+    print(f"{'metric':<{width}}  {base['label']:>14}  {new['label']:>14}  {'change':>8}")
+    for name, bv, nv in rows:
+        print(f"{name:<{width}}  {bv:>14.2f}  {nv:>14.2f}  {_change(bv, nv):>+7.1f}%")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="seed data and drive a service with a scenario")
+    run_p.add_argument("scenario", help="scenario JSON file")
+    run_p.add_argument("--base-url", default="http://localhost:8000")
+    run_p.add_argument("--label", help="name for this run in reports (default: base URL)")
+    run_p.add_argument("--concurrency", type=int, help="closed loop with N workers (overrides scenario)")
+    run_p.add_argument("--rps", type=float, help="open loop at R requests/second (overrides scenario)")
+    run_p.add_argument("--duration", type=float, help="measured seconds (overrides scenario)")
+    run_p.add_argument("--warmup", type=float, help="unmeasured seconds before measuring (overrides scenario)")
+    run_p.add_argument("--max-inflight", type=int, default=512, help="open loop: cap on outstanding requests")
+    run_p.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    run_p.add_argument("--seed", type=int, default=1, help="random seed for data and operation choice")
+    run_p.add_argument("--out", help="write the JSON result here (default: stdout)")
+
+    cmp_p = sub.add_parser("compare", help="compare two result files and flag regressions")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("candidate")
+    cmp_p.add_argument("--threshold", type=float, default=10.0, help="allowed latency/throughput change in percent")
+    cmp_p.add_argument("--error-threshold", type=float, default=0.5, help="allowed error rate increase in points")
+    cmp_p.add_argument("--min-requests", type=int, default=100, help="skip operations with fewer samples")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.concurrency is not None and args.rps is not None:
+            parser.error("--concurrency and --rps are mutually exclusive")
+        result = asyncio.run(run(args))
+        text = json.dumps(result, indent=2)
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.out).write_text(text + "\n")
+        else:
+            print(text)
+        print(
+            f"{result['requests']} requests, {result['throughput_rps']:.1f} rps, "
+            f"p50 {result['latency_ms']['p50']:.2f} ms, p99 {result['latency_ms']['p99']:.2f} ms, "
+            f"errors {result['error_rate']:.2%}",
+            file=sys.stderr,
+        )
+        return 0
+
+    base = json.loads(Path(args.baseline).read_text())
+    new = json.loads(Path(args.candidate).read_text())
+    regressions = compare(base, new, args.threshold, args.error_threshold, args.min_requests)
+    if regressions:
+        print("\nregressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"  - {line}", file=sys.stderr)
+        return 1
+    print("\nno regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())